@@ -0,0 +1,59 @@
+"""
+Время холодного запуска команд main.py.
+
+Каждая команда выполняется в новом процессе интерпретатора; выводится
+медиана времени по нескольким запускам. Для сравнения измеряется запуск
+меню (полная загрузка библиотеки) с немедленным выходом.
+
+Запуск: python -m benchmarks.bench_cli [количество книг] [количество запусков]
+Файл с каталогом создается во временном каталоге.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.catalog import write_catalog
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def cold_start(args, runs: int, stdin: str = "") -> float:
+    """Медиана времени выполнения python main.py args в новом процессе, секунды."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN, *args], input=stdin, text=True, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "library.json")
+        write_catalog(path, count)
+        print(f"Книг: {count}, запусков: {runs}")
+        commands = {
+            "--help": (["--help"], ""),
+            "search --author (exact, limit 10)": (["search", "--author", "Лев Толстой", "--limit", "10"], ""),
+            "search --author (exact, все)": (["search", "--author", "Лев Толстой"], ""),
+            "search --mode token": (["search", "--mode", "token", "--author", "толстой", "--limit", "10"], ""),
+            "get 777": (["get", "777"], ""),
+            "status 777 выдана": (["status", "777", "выдана"], ""),
+            "script (100 команд status)": (["script"], "".join(f"status {book_id} в\\ наличии\n"
+                                                                for book_id in range(1, 101))),
+            "меню (полная загрузка)": ([], "6\n"),
+        }
+        for name, (args, stdin) in commands.items():
+            elapsed = cold_start(["--data-file", path, *args], runs, stdin)
+            print(f"{name:36} {elapsed:8.3f} с")
+
+
+if __name__ == "__main__":
+    main()
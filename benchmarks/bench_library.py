@@ -0,0 +1,139 @@
+"""
+Набор бенчмарков основных операций Library на синтетических каталогах.
+
+Для каждого размера каталога измеряются среднее время операции и пиковая
+память (tracemalloc, отдельным проходом). Результаты сравниваются с
+сохраненной базовой линией benchmarks/baseline.json: если операция стала
+медленнее более чем в --threshold раз, скрипт завершается с кодом 1.
+
+Запуск:
+    python -m benchmarks.bench_library --sizes 10000 100000 1000000
+    python -m benchmarks.bench_library --sizes 10000 --save-baseline
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+from library.library import Library
+from benchmarks.catalog import AUTHORS, write_catalog
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def operations(path: str) -> Dict[str, Tuple[Callable[[], object], Callable[[object, int], None]]]:
+    """
+    Возвращает измеряемые операции: имя -> (подготовка, операция(состояние, номер повтора)).
+    """
+    def open_library():
+        return Library(path)
+
+    def add_book(library, number):
+        library.add_book(f"Бенчмарк {number}", "Тест Бенчмарков", 2000)
+
+    def remove_book(library, number):
+        library.remove_book(number + 1)
+
+    def update_status(library, number):
+        library.update_status(number + 1, "выдана" if number % 2 else "в наличии")
+
+    def search_exact(library, number):
+        library.search_books(author=AUTHORS[number % len(AUTHORS)])
+
+    def search_prefix(library, number):
+        library.search_books(mode="prefix", author=AUTHORS[number % len(AUTHORS)].split()[1][:4])
+
+    def save_books(library, number):
+        library.save_books()
+
+    return {
+        "load_books": (lambda: None, lambda state, number: Library(path)),
+        "add_book": (open_library, add_book),
+        "remove_book": (open_library, remove_book),
+        "update_status": (open_library, update_status),
+        "search_books_exact": (open_library, search_exact),
+        "search_books_prefix": (open_library, search_prefix),
+        "save_books": (open_library, save_books),
+    }
+
+
+def measure(setup, operation, repeat: int) -> Dict[str, float]:
+    """Измеряет среднее время операции и пиковую память одного её выполнения."""
+    state = setup()
+    start = time.perf_counter()
+    for number in range(repeat):
+        operation(state, number)
+    seconds = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    operation(state, repeat)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_bytes": peak}
+
+
+def run(sizes, repeat: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Выполняет все операции для каждого размера каталога."""
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "library.json")
+            results[str(size)] = {}
+            for name, (setup, operation) in operations(path).items():
+                write_catalog(path, size)
+                results[str(size)][name] = measure(setup, operation, repeat)
+    return results
+
+
+def compare(results, baseline, threshold: float) -> bool:
+    """Печатает результаты рядом с базовой линией и возвращает True, если регрессий нет."""
+    ok = True
+    for size, measurements in results.items():
+        print(f"\nКниг: {size}")
+        print(f"{'операция':22} {'время, мс':>12} {'база, мс':>12} {'пик, МиБ':>10}")
+        for name, values in measurements.items():
+            base = baseline.get(size, {}).get(name)
+            base_text = f"{base['seconds'] * 1000:12.3f}" if base else f"{'-':>12}"
+            marker = ""
+            if base and values["seconds"] > base["seconds"] * threshold:
+                marker = "  РЕГРЕССИЯ"
+                ok = False
+            print(f"{name:22} {values['seconds'] * 1000:12.3f} {base_text} "
+                  f"{values['peak_bytes'] / 2 ** 20:10.2f}{marker}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки операций библиотеки.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов каждой операции.")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="Допустимое замедление относительно базовой линии (во сколько раз).")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результаты как базовую линию.")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+    ok = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=4)
+        print(f"\nБазовая линия сохранена в {args.baseline}")
+    elif not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Сравнение памяти, занимаемой каталогом при разных способах хранения книг.
+
+Запуск: python -m benchmarks.bench_memory [количество книг]
+"""
+import sys
+import tracemalloc
+
+from library.columnar import ColumnarBooks
+from benchmarks.catalog import generate_books
+
+
+def measure(build) -> int:
+    """Возвращает объем памяти в байтах, удерживаемый результатом build()."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    layouts = {
+        "objects (dict id -> Book)": lambda: {book.id: book for book in generate_books(count)},
+        "columnar (ColumnarBooks)": lambda: ColumnarBooks(generate_books(count)),
+    }
+    print(f"Книг: {count}")
+    for name, build in layouts.items():
+        size = measure(build)
+        print(f"{name:28} {size / 2 ** 20:8.1f} МиБ  {size / count:6.1f} байт/книга")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Запросы по столбцам (Library.query, count_by) в сравнении с простым просмотром списка книг.
+
+Для каждого запроса выводится медиана времени: простого просмотра,
+повторного запроса и запроса сразу после изменения статуса одной книги
+(столбцы изменяются на месте и не перестраиваются). В конце выводится
+медиана времени update_status до первого запроса и после всех запросов:
+поддержка столбцов не должна делать изменение зависящим от количества книг.
+
+Запуск: python -m benchmarks.bench_query [количество книг] [повторов]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from itertools import cycle
+from typing import Callable
+
+from library.library import Library
+from library.query import Eq, Range
+from benchmarks.catalog import write_catalog
+
+
+def median_time(function: Callable, repeats: int, before: Callable = None) -> float:
+    """Медиана времени выполнения function, секунды; before выполняется перед каждым замером."""
+    times = []
+    for _ in range(repeats):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "library.json")
+        write_catalog(path, count)
+        library = Library(path, persistence="on_exit")
+        books = library.books
+        author = books[0].author
+        statuses = ["выдана", "в наличии"]
+        book_ids = cycle(range(1, count + 1, 7))
+
+        def flip():
+            statuses.reverse()
+            library.update_status(1, statuses[0])
+
+        def flip_other():
+            book_id = next(book_ids)
+            library.update_status(book_id, "в наличии" if library.get_book_by_id(book_id).status == "выдана"
+                                  else "выдана")
+
+        mutations = 1000
+        update_before = median_time(flip_other, mutations)
+
+        queries = {
+            "автор и год": (Eq("author", author) & Eq("year", 1900),
+                            lambda: [book for book in books if book.author == author and book.year == 1900]),
+            "статус": (Eq("status", "выдана"), lambda: [book for book in books if book.status == "выдана"]),
+            "годы и не выдана": (Range("year", 1860, 1880) & ~Eq("status", "выдана"),
+                                 lambda: [book for book in books
+                                          if 1860 <= book.year <= 1880 and book.status != "выдана"]),
+        }
+        library.query(Eq("status", "выдана"))
+        print(f"Книг: {count}, повторов: {repeats}")
+        print(f"{'запрос':24} {'просмотр, с':>12} {'query, с':>10} {'после изменения, с':>20}")
+        for name, (where, scan) in queries.items():
+            scanned = median_time(scan, repeats)
+            warm = median_time(lambda: library.query(where), repeats)
+            changed = median_time(lambda: library.query(where), repeats, before=flip)
+            print(f"{name:24} {scanned:12.4f} {warm:10.4f} {changed:20.4f}")
+
+        def count_scan():
+            counts = {}
+            for book in books:
+                if book.author == author:
+                    counts[book.status] = counts.get(book.status, 0) + 1
+            return counts
+
+        scanned = median_time(count_scan, repeats)
+        warm = median_time(lambda: library.count_by("status", Eq("author", author)), repeats)
+        changed = median_time(lambda: library.count_by("status", Eq("author", author)), repeats, before=flip)
+        print(f"{'count_by статус, автор':24} {scanned:12.4f} {warm:10.4f} {changed:20.4f}")
+        library.query(Eq("year", 1900) | Eq("author", author))
+        update_after = median_time(flip_other, mutations)
+        print(f"update_status, мс: до запросов {update_before * 1000:.4f}, после запросов {update_after * 1000:.4f}")
+        library.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Время запуска и пиковая память при загрузке библиотеки разными способами.
+
+Запуск: python -m benchmarks.bench_startup [количество книг]
+Файл с каталогом создается во временном каталоге.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from library.binary import json_to_binary
+from library.book import Book
+from library.library import Library
+from benchmarks.catalog import write_catalog
+
+
+def run(load):
+    """Возвращает время выполнения load() в секундах и пиковую память в байтах."""
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def json_load(path: str):
+    """Прежний способ загрузки: json.load всего файла."""
+    with open(path, "r", encoding="utf-8") as file:
+        return [Book.from_dict(book) for book in json.load(file)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "library.json")
+        write_catalog(path, count)
+        binary_path = os.path.join(tmp_dir, "library.bin")
+        json_to_binary(path, binary_path)
+        print(f"Книг: {count}, размер файла: {os.path.getsize(path) / 2 ** 20:.1f} МиБ")
+        loaders = {
+            "json.load": lambda: json_load(path),
+            "Library (потоково)": lambda: Library(path),
+            "Library (columnar)": lambda: Library(path, layout="columnar"),
+            "Library (lazy)": lambda: Library(path, lazy=True),
+            "Library (binary, lazy)": lambda: Library(binary_path, storage_mode="binary", lazy=True),
+        }
+        for name, load in loaders.items():
+            elapsed, peak = run(load)
+            print(f"{name:24} {elapsed:8.2f} с  пик {peak / 2 ** 20:8.1f} МиБ")
+
+
+if __name__ == "__main__":
+    main()
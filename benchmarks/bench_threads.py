@@ -0,0 +1,90 @@
+"""
+Пропускная способность чтения библиотеки из нескольких потоков.
+
+Потоки выполняют смесь запросов (get_book_by_id, поиск по префиксу,
+страница, отсортированная по году) в течение заданного времени;
+выводится количество запросов в секунду для 1, 2, 4 и 8 потоков,
+без записи и с фоновым потоком, который добавляет книги (каждое
+добавление сбрасывает кэш поиска, поэтому чтение с записью медленнее).
+
+Чтение выполняется под общей блокировкой чтения, поэтому потоки не
+ждут друг друга; на CPython прирост ограничен GIL и заметен, когда
+чтение ждет ввода-вывода (ленивое хранилище, SQLite) или на сборках
+без GIL.
+
+Запуск: python -m benchmarks.bench_threads [количество книг] [секунд на замер]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from itertools import count as count_from
+from typing import Iterator, Optional, Tuple
+
+from library.library import Library
+from benchmarks.catalog import AUTHORS, write_catalog
+
+
+def reader(library: Library, count: int, deadline: float, seed: int, done: list):
+    """Выполняет запросы на чтение до deadline и добавляет их количество в done."""
+    rng = random.Random(seed)
+    requests = 0
+    while time.perf_counter() < deadline:
+        choice = rng.random()
+        if choice < 0.5:
+            library.get_book_by_id(rng.randint(1, count))
+        elif choice < 0.8:
+            library.search_books("prefix", author=rng.choice(AUTHORS).split()[1][:4])
+        else:
+            library.display_books(rng.randint(0, count - 20), 20, "year")
+        requests += 1
+    done.append(requests)
+
+
+def writer(library: Library, deadline: float, numbers: Iterator[int], added: list):
+    """Добавляет книги с новыми названиями до deadline и записывает их количество в added."""
+    count = 0
+    while time.perf_counter() < deadline:
+        if library.add_book(f"Поток записи {next(numbers)}", "Тест Потоков", 2000) is None:
+            count += 1
+        time.sleep(0.001)
+    added.append(count)
+
+
+def measure(library: Library, count: int, threads: int, seconds: float,
+            numbers: Optional[Iterator[int]] = None) -> Tuple[float, float]:
+    """Запросов на чтение и добавленных книг в секунду для threads читающих потоков (и писателя, если numbers)."""
+    deadline = time.perf_counter() + seconds
+    done, added = [], []
+    workers = [threading.Thread(target=reader, args=(library, count, deadline, seed, done))
+               for seed in range(threads)]
+    if numbers is not None:
+        workers.append(threading.Thread(target=writer, args=(library, deadline, numbers, added)))
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(done) / seconds, sum(added) / seconds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "library.json")
+        write_catalog(path, count)
+        library = Library(path, storage_mode="journal", persistence="debounced")
+        print(f"Книг: {count}, секунд на замер: {seconds}, процессоров: {os.cpu_count()}")
+        print(f"{'потоков':>8} {'чтение, запр/с':>16} {'с записью, запр/с':>19} {'записей/с':>11}")
+        numbers = count_from(1)
+        for threads in (1, 2, 4, 8):
+            alone, _ = measure(library, count, threads, seconds)
+            mixed, writes = measure(library, count, threads, seconds, numbers)
+            print(f"{threads:>8} {alone:>16.0f} {mixed:>19.0f} {writes:>11.0f}")
+        library.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Сравнение скорости проверки данных книг.
+
+Исходная validate_book_data (с поиском дубликата перебором списка книг)
+сравнивается с текущей validate_book_data, BookValidator.check и
+пакетной BookValidator.check_batch. Проверяются новые строки на фоне
+библиотеки из --existing книг.
+
+Запуск: python -m benchmarks.bench_validators --existing 10000 --rows 1000
+"""
+import argparse
+import time
+from datetime import datetime
+
+from benchmarks.catalog import generate_books
+from validators import BookValidator, book_key, validate_book_data
+
+
+def original_validate_book_data(title, author, year, books):
+    """Исходная реализация validate_book_data (до кэширования и множества ключей)."""
+    if not title.strip() and not author.strip() and not year:
+        return "Укажите название книги, автора и год издания."
+
+    if not title.strip() or not author.strip() or not year:
+        return "Все поля (название, автор, год) должны быть заполнены."
+
+    current_year = datetime.now().year
+
+    if not isinstance(year, int) or year <= 0 or year < 1000 or year > current_year:
+        return "Год издания должен быть 4-значным положительным числом и не превышать текущий год."
+
+    if len(title) < 2 or len(title) > 200:
+        return "Название книги должно содержать от 2 до 200 символов."
+
+    if len(author) < 2 or len(author) > 100:
+        return "Имя автора должно содержать от 2 до 100 символов."
+
+    if any(char.isdigit() for char in author):
+        return "Имя автора не должно содержать цифры."
+
+    invalid_chars = set("!@#$%^&*()_+=[]{}|;:'\",<>?/\\")
+    if any(char in invalid_chars for char in title) or any(char in invalid_chars for char in author):
+        return "Название книги или имя автора содержит недопустимые символы."
+
+    if books:
+        if any(book.title.lower() == title.lower() and book.author.lower() == author.lower() for book in books):
+            return "Книга с таким названием и автором уже существует в библиотеке."
+
+    return None
+
+
+def measure(name: str, function, rows: int):
+    """Выполняет function() и печатает время на одну строку."""
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"{name:40} {elapsed * 1e6 / rows:12.2f} мкс/строка")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение скорости проверки данных книг.")
+    parser.add_argument("--existing", type=int, default=10_000, help="Количество книг в библиотеке.")
+    parser.add_argument("--rows", type=int, default=1_000, help="Количество проверяемых строк.")
+    args = parser.parse_args()
+
+    books = list(generate_books(args.existing, seed=1))
+    rows = [{"title": f"{book.title} - новое издание", "author": book.author, "year": book.year}
+            for book in generate_books(args.rows, seed=2)]
+    validator = BookValidator({book_key(book.title, book.author) for book in books})
+
+    print(f"Книг в библиотеке: {args.existing}, строк: {args.rows}")
+    measure("исходная validate_book_data", lambda: [
+        original_validate_book_data(row["title"], row["author"], row["year"], books) for row in rows], args.rows)
+    measure("validate_book_data", lambda: [
+        validate_book_data(row["title"], row["author"], row["year"], validator.keys) for row in rows], args.rows)
+    measure("BookValidator.check", lambda: [
+        validator.check(row["title"], row["author"], row["year"]) for row in rows], args.rows)
+    measure("BookValidator.check_batch", lambda: validator.check_batch(rows), args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import json
+import random
+from typing import Iterator
+
+from library.book import Book
+
+
+FIRST_NAMES = ["Лев", "Фёдор", "Антон", "Иван", "Александр", "Михаил", "Николай", "Анна", "Марина", "Борис"]
+LAST_NAMES = ["Толстой", "Достоевский", "Чехов", "Тургенев", "Пушкин", "Булгаков", "Гоголь", "Ахматова",
+              "Цветаева", "Пастернак", "Лермонтов", "Бунин", "Куприн", "Шолохов", "Набоков"]
+TITLE_WORDS = ["война", "мир", "преступление", "наказание", "отцы", "дети", "мастер", "маргарита", "тихий",
+               "дон", "белая", "гвардия", "мёртвые", "души", "герой", "нашего", "времени", "вишнёвый", "сад",
+               "тёмные", "аллеи", "поединок", "доктор", "живаго", "дар", "идиот", "бесы", "записки", "охотника"]
+AUTHORS = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+
+
+def generate_books(count: int, seed: int = 42) -> Iterator[Book]:
+    """
+    Генерирует синтетический каталог книг с русскими названиями и авторами.
+
+    Аргументы:
+        count (int): Количество книг.
+        seed (int, optional): Начальное значение генератора случайных чисел.
+    """
+    rng = random.Random(seed)
+    for book_id in range(1, count + 1):
+        words = rng.sample(TITLE_WORDS, rng.randint(1, 4))
+        title = " ".join(words).capitalize() + f" {book_id}"
+        status = "выдана" if rng.random() < 0.3 else "в наличии"
+        yield Book(book_id, title, rng.choice(AUTHORS), rng.randint(1800, 2024), status)
+
+
+def write_catalog(path: str, count: int, seed: int = 42):
+    """Записывает синтетический каталог в формате library.json."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump([book.to_dict() for book in generate_books(count, seed)], file, ensure_ascii=False, indent=4)
@@ -0,0 +1,92 @@
+"""
+Генератор нагрузки для сервера библиотеки (library.server).
+
+Запускает несколько клиентов, которые отправляют смесь запросов на чтение
+и запись, и выводит количество запросов в секунду и задержки p50/p99.
+
+Запуск:
+    python -m benchmarks.loadgen --port 8765
+    python -m benchmarks.loadgen            # сервер запускается в этом же процессе на временном файле
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from library.library import Library
+from library.server import STREAM_LIMIT, LibraryServer
+from benchmarks.catalog import AUTHORS, generate_books
+
+
+async def client(reader_writer, requests: int, write_ratio: float, seed: int, latencies: list):
+    """Отправляет запросы по одному и записывает задержку каждого."""
+    reader, writer = reader_writer
+    rng = random.Random(seed)
+    for number in range(requests):
+        if rng.random() < write_ratio:
+            if rng.random() < 0.5:
+                request = {"op": "add", "title": f"Нагрузка {seed} {number}", "author": "Тест Нагрузкин", "year": 2000}
+            else:
+                request = {"op": "status", "id": rng.randint(1, 1000), "status": rng.choice(["в наличии", "выдана"])}
+        else:
+            request = rng.choice([
+                {"op": "get", "id": rng.randint(1, 1000)},
+                {"op": "search", "mode": "prefix", "criteria": {"author": rng.choice(AUTHORS).split()[1][:4]},
+                 "limit": 20},
+                {"op": "list", "offset": rng.randint(0, 900), "limit": 20, "sort_by": "year"},
+            ])
+        start = time.perf_counter()
+        writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+        await reader.readline()
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def run(args: argparse.Namespace):
+    server = None
+    tmp_dir = None
+    host, port = args.host, args.port
+    if port is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        library = Library(os.path.join(tmp_dir.name, "library.json"))
+        library.books = list(generate_books(args.catalog))
+        library.save_books()
+        server = LibraryServer(library)
+        await server.start(host, 0)
+        host, port = server.address[:2]
+
+    connections = [await asyncio.open_connection(host, port, limit=STREAM_LIMIT) for _ in range(args.clients)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(connection, args.requests, args.write_ratio, seed, latencies)
+                           for seed, connection in enumerate(connections)))
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        await server.stop()
+        tmp_dir.cleanup()
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"Клиентов: {args.clients}, запросов: {len(latencies)}, доля записи: {args.write_ratio:.0%}")
+    print(f"Запросов в секунду: {len(latencies) / elapsed:.0f}")
+    print(f"p50: {quantiles[49] * 1000:.2f} мс, p99: {quantiles[98] * 1000:.2f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генератор нагрузки для сервера библиотеки.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Порт запущенного сервера; без него сервер запускается локально.")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на одного клиента.")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--catalog", type=int, default=10_000, help="Размер каталога для локального сервера.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# commands.py
+"""
+Неинтерактивные команды main.py: search, get, status и script.
+
+Книги выводятся в stdout строками JSON, ошибки - в stderr. Каждая команда
+возвращает код завершения процесса (0 - успех). Модули библиотеки
+импортируются внутри команд, чтобы запуск не тратил время на лишний импорт.
+"""
+import json
+import shlex
+import sys
+from argparse import ArgumentParser, Namespace
+from contextlib import closing
+from itertools import islice
+from typing import Dict, Iterator, Optional, TextIO
+
+
+def open_library(data_file: str, lazy: bool = True):
+    """
+    Открывает библиотеку. При ленивой загрузке (по умолчанию) файл просматривается
+    один раз, а записи разбираются только при обращении к книгам.
+    """
+    from library.library import Library
+    return Library(data_file, lazy=lazy)
+
+
+def print_book(book):
+    """Печатает книгу строкой JSON."""
+    print(json.dumps(book.to_dict(), ensure_ascii=False))
+
+
+def search_criteria(args: Namespace) -> Dict:
+    """Критерии поиска из аргументов команды (пустые поля не учитываются)."""
+    criteria = {"title": args.title, "author": args.author, "year": args.year}
+    return {key: value for key, value in criteria.items() if value}
+
+
+def stream_search(data_file: str, criteria: Dict) -> Iterator:
+    """
+    Точный поиск потоковым чтением файла (как search_books в режиме "exact").
+
+    Книги разбираются по одной и не сохраняются, поэтому в памяти находятся только найденные.
+    """
+    from library.streaming import iter_books
+    expected = {key: str(value).lower() for key, value in criteria.items()}
+    try:
+        for book in iter_books(data_file):
+            if all(str(getattr(book, key)).lower() == value for key, value in expected.items()):
+                yield book
+    except FileNotFoundError:
+        return
+
+
+def run_search(args: Namespace, library=None) -> int:
+    """
+    Выводит книги, найденные по критериям.
+
+    Точный поиск без открытой библиотеки читает файл потоково. Для остальных режимов
+    нужны индексы по всем книгам, поэтому библиотека загружается полностью: ленивая
+    загрузка все равно разобрала бы каждую запись, но дольше.
+    """
+    criteria = search_criteria(args)
+    if not criteria:
+        print("Укажите хотя бы один критерий поиска (--title, --author, --year).", file=sys.stderr)
+        return 2
+    if library is not None:
+        results = library.search_books(mode=args.mode, **criteria)
+    elif args.mode == "exact":
+        results = stream_search(args.data_file, criteria)
+    else:
+        with closing(open_library(args.data_file, lazy=False)) as library:
+            results = library.search_books(mode=args.mode, **criteria)
+    for book in islice(results, args.limit):
+        print_book(book)
+    return 0
+
+
+def run_get(args: Namespace, library=None) -> int:
+    """Выводит книгу по ID; читается только её запись."""
+    if library is None:
+        with closing(open_library(args.data_file)) as library:
+            return run_get(args, library)
+    try:
+        print_book(library.get_book_by_id(args.id))
+    except KeyError:
+        print("Книги с заданным ID не существует.", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_status(args: Namespace, library=None) -> int:
+    """Изменяет статус книги; с --patron выдает книгу читателю (только для статуса "выдана")."""
+    if args.patron and args.status != "выдана":
+        print(f"Книга {args.id}: читатель (--patron) указывается только для статуса 'выдана'.", file=sys.stderr)
+        return 2
+    if library is None:
+        with closing(open_library(args.data_file)) as library:
+            return run_status(args, library)
+    if args.patron:
+        error = library.checkout(args.id, args.patron)
+    else:
+        error = library.update_status(args.id, args.status)
+    if error:
+        print(f"Книга {args.id}: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+SCRIPT_COMMANDS = {
+    "search": run_search,
+    "get": run_get,
+    "status": run_status,
+}
+
+
+def run_script(args: Namespace, parser: ArgumentParser, stream: Optional[TextIO] = None) -> int:
+    """
+    Выполняет команды search, get и status, по одной в строке (пустые строки и строки с # пропускаются).
+
+    Библиотека загружается один раз, а все изменения сохраняются одной записью.
+    Возвращает 1, если хотя бы одна команда не выполнена.
+    """
+    stream = stream or sys.stdin
+    failures = 0
+    with closing(open_library(args.data_file)) as library, library.batch():
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                command_args = parser.parse_args(shlex.split(line))
+                command = SCRIPT_COMMANDS[command_args.command]
+            except (ValueError, KeyError, SystemExit):
+                print(f"Строка {number}: неверная команда: {line}", file=sys.stderr)
+                failures += 1
+                continue
+            if command(command_args, library):
+                failures += 1
+    return 1 if failures else 0
@@ -1,7 +1,10 @@
 # handlers.py
 from library.library import Library
+from library.metrics import instrumented
+from library.transfer import read_rows, write_books
 
 
+@instrumented("handle_add_book")
 def handle_add_book(library: Library):
     """
     Обрабатывает добавление книги в библиотеку.
@@ -25,6 +28,7 @@ def handle_add_book(library: Library):
         print(f"Книга '{title}' успешно добавлена.")
 
 
+@instrumented("handle_remove_book")
 def handle_remove_book(library: Library):
     """
     Обрабатывает удаление книги из библиотеки.
@@ -45,11 +49,15 @@ def handle_remove_book(library: Library):
         print(f"Книга с ID {book_id} успешно удалена.")
 
 
+SUGGESTIONS = 3
+
+
+@instrumented("handle_search_books")
 def handle_search_books(library: Library):
     """
     Обрабатывает поиск книг в библиотеке.
 
-    Запрашивает у пользователя критерии поиска (название, автора, год).
+    Запрашивает у пользователя критерии поиска (название, автора, год) и режим сравнения.
     Выполняет поиск книг по заданным критериям и выводит результат.
 
     Аргументы:
@@ -60,39 +68,69 @@ def handle_search_books(library: Library):
     author = input("Автор: ").strip() or None
     year = input("Год: ").strip() or None
     criteria = {key: value for key, value in {"title": title, "author": author, "year": year}.items() if value}
+    modes = {"1": "exact", "2": "token", "3": "prefix", "4": "substring", "5": "fuzzy"}
+    mode_input = input("Режим (1 - точное совпадение, 2 - по словам, 3 - по началу слова, 4 - по подстроке, "
+                       "5 - с учетом опечаток) [1]: ")
+    mode = modes.get(mode_input.strip(), "exact")
 
-    results = library.search_books(**criteria)
+    results = library.search_books(mode=mode, **criteria)
     if results:
         print("Найденные книги:")
         for book in results:
             print(book.to_dict())
     else:
         print("Книги не найдены по заданным критериям.")
+        if mode != "fuzzy" and (title or author):
+            suggestions = library.search_books(mode="fuzzy", **criteria)[:SUGGESTIONS]
+            if suggestions:
+                print("Возможно, вы имели в виду:")
+                for book in suggestions:
+                    print(f"  {book.title} - {book.author} ({book.year})")
+
 
+PAGE_SIZE = 20
 
+
+@instrumented("handle_display_books")
 def handle_display_books(library: Library):
     """
-    Отображает все книги в библиотеке.
+    Отображает все книги в библиотеке постранично.
 
+    Запрашивает порядок сортировки и выводит книги страницами по PAGE_SIZE,
+    поэтому в памяти одновременно находится не больше одной страницы.
     Если библиотека пуста, выводит соответствующее сообщение.
 
     Аргументы:
         library (Library): Объект библиотеки для отображения книг.
     """
-    books = library.display_books()
-    if books:
-        print("Список книг в библиотеке:")
-        for book in books:
+    sort_fields = {"1": None, "2": "title", "3": "author", "4": "year"}
+    sort_input = input("Сортировка (1 - по порядку добавления, 2 - по названию, 3 - по автору, 4 - по году) [1]: ")
+    sort_by = sort_fields.get(sort_input.strip())
+
+    offset = 0
+    while True:
+        page = library.display_books(offset, PAGE_SIZE + 1, sort_by)
+        if not page and offset == 0:
+            print("Библиотека пуста.")
+            return
+        if offset == 0:
+            print("Список книг в библиотеке:")
+        for book in page[:PAGE_SIZE]:
             print(book)
-    else:
-        print("Библиотека пуста.")
+        if len(page) <= PAGE_SIZE:
+            return
+        offset += PAGE_SIZE
+        if input("Нажмите Enter для следующей страницы или введите q для выхода: ").strip().lower() == "q":
+            return
 
 
+@instrumented("handle_update_status")
 def handle_update_status(library: Library):
     """
     Обрабатывает обновление статуса книги в библиотеке.
 
-    Запрашивает у пользователя ID книги и новый статус.
+    Запрашивает у пользователя ID книги и новый статус. При выдаче книги
+    можно указать читателя - тогда выдача записывается со сроком возврата.
     Проверяет корректность данных и обновляет статус книги.
     Выводит сообщение об успешном обновлении или ошибке.
 
@@ -102,9 +140,62 @@ def handle_update_status(library: Library):
     book_id_input = input("Введите ID книги: ").strip()
     book_id = int(book_id_input) if book_id_input.isdigit() else book_id_input
     new_status = input("Введите новый статус ('в наличии' или 'выдана'): ").strip().lower()
-    error = library.update_status(book_id, new_status)
+    patron = input("Введите читателя (оставьте пустым, если не нужно): ").strip() if new_status == "выдана" else ""
+    if patron:
+        error = library.checkout(book_id, patron)
+    else:
+        error = library.update_status(book_id, new_status)
     if error:
         print(f"Ошибка при обновлении статуса книги: {error}")
     else:
         print(f"Статус книги с ID {book_id} успешно обновлен.")
 
+
+@instrumented("handle_loans")
+def handle_loans(library: Library):
+    """
+    Показывает выдачи читателя или, если читатель не указан, просроченные выдачи.
+
+    Аргументы:
+        library (Library): Объект библиотеки.
+    """
+    patron = input("Введите читателя (оставьте пустым, чтобы показать просроченные книги): ").strip()
+    loans = library.loans_of(patron, history=True) if patron else library.overdue()
+    if not loans:
+        print("Выдачи не найдены.")
+        return
+    for loan in loans:
+        print(loan.to_dict())
+
+
+@instrumented("handle_import")
+def handle_import(library: Library, path: str):
+    """
+    Импортирует книги из файла CSV или JSON Lines.
+
+    Строки читаются потоково и добавляются методом add_books, поэтому
+    библиотека сохраняется один раз. Выводит количество добавленных книг
+    и ошибки по отдельным строкам.
+
+    Аргументы:
+        library (Library): Объект библиотеки для добавления книг.
+        path (str): Путь к файлу (.csv или .jsonl).
+    """
+    count_before = len(library.books)
+    errors = library.add_books(read_rows(path))
+    for number, error in errors:
+        print(f"Строка {number}: {error}")
+    print(f"Импортировано книг: {len(library.books) - count_before}, ошибок: {len(errors)}.")
+
+
+@instrumented("handle_export")
+def handle_export(library: Library, path: str):
+    """
+    Экспортирует все книги библиотеки в файл CSV или JSON Lines.
+
+    Аргументы:
+        library (Library): Объект библиотеки.
+        path (str): Путь к файлу (.csv или .jsonl).
+    """
+    count = write_books(path, library.iter_books())
+    print(f"Экспортировано книг: {count}.")
@@ -0,0 +1,306 @@
+"""
+Двоичный снимок библиотеки, открываемый через mmap.
+
+Структура файла (little-endian):
+    заголовок HEADER: сигнатура, версия формата, количество книг,
+        наименьший и наибольший ID и смещения разделов;
+    таблица статусов: (смещение, длина) названия статуса в куче строк;
+    столбец ID: int64 для каждой книги в порядке возрастания ID;
+    записи RECORD фиксированной длины: год, код статуса и (смещение, длина)
+        названия и автора в куче строк;
+    таблица ID: для каждого ID от наименьшего до наибольшего - номер записи + 1
+        (0 - книги нет); не записывается, если ID слишком разрежены;
+    куча строк в UTF-8 (одинаковые имена авторов хранятся один раз).
+
+Книга по ID находится вычислением смещения без разбора остального файла.
+
+Преобразование: python -m library.binary library.json library.bin
+(и обратно: python -m library.binary library.bin library.json).
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, MutableMapping, Optional
+
+from .book import Book
+from .storage import Storage
+from .streaming import LazyBooks, iter_books
+
+
+MAGIC = b"LIBB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQqqQQQQQQ")
+STATUS = struct.Struct("<QI")
+RECORD = struct.Struct("<iB3xQIQI")
+ROW = struct.Struct("<I")
+DIRECT_TABLE_FACTOR = 4
+
+
+def write_snapshot(path: str, books: Iterable[Book]) -> int:
+    """
+    Записывает книги в двоичный снимок атомарно (временный файл и переименование).
+
+    Возвращает количество записанных книг.
+    """
+    books = sorted(books, key=lambda book: book.id)
+    heap = bytearray()
+    strings: Dict[str, tuple] = {}
+    status_codes: Dict[str, int] = {}
+
+    def place(text: str, shared: bool) -> tuple:
+        if shared and text in strings:
+            return strings[text]
+        data = text.encode("utf-8")
+        location = (len(heap), len(data))
+        heap.extend(data)
+        if shared:
+            strings[text] = location
+        return location
+
+    ids = array("q")
+    records = bytearray(RECORD.size * len(books))
+    for row, book in enumerate(books):
+        ids.append(book.id)
+        code = status_codes.setdefault(book.status, len(status_codes))
+        title = place(book.title, shared=False)
+        author = place(book.author, shared=True)
+        RECORD.pack_into(records, row * RECORD.size, book.year, code, *title, *author)
+    statuses = b"".join(STATUS.pack(*place(status, shared=True)) for status in status_codes)
+
+    min_id = ids[0] if books else 0
+    max_id = ids[-1] if books else 0
+    span = max_id - min_id + 1 if books else 0
+    if span > DIRECT_TABLE_FACTOR * len(books):
+        span = 0
+    table = bytearray(ROW.size * span)
+    if span:
+        for row, book_id in enumerate(ids):
+            ROW.pack_into(table, (book_id - min_id) * ROW.size, row + 1)
+
+    status_offset = HEADER.size
+    ids_offset = status_offset + len(statuses)
+    records_offset = ids_offset + len(ids) * ids.itemsize
+    table_offset = records_offset + len(records)
+    heap_offset = table_offset + len(table)
+
+    if sys.byteorder != "little":
+        ids.byteswap()
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(status_codes), len(books), min_id, max_id, span,
+                               status_offset, ids_offset, records_offset, table_offset, heap_offset))
+        file.write(statuses)
+        file.write(ids.tobytes())
+        file.write(records)
+        file.write(table)
+        file.write(heap)
+    os.replace(tmp_file, path)
+    return len(books)
+
+
+class Snapshot:
+    """
+    Двоичный снимок, отображенный в память.
+
+    Атрибуты:
+        ids (Sequence[int]): ID книг в порядке возрастания (без копирования из файла).
+        min_id (int), max_id (int): Наименьший и наибольший ID (0, если книг нет).
+    """
+
+    def __init__(self, path: str):
+        """
+        Открывает снимок и проверяет заголовок.
+
+        Аргументы:
+            path (str): Путь к файлу снимка.
+
+        Вызывает ValueError, если файл не является снимком поддерживаемой версии.
+        """
+        self._mmap = None
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap is None or len(self._mmap) < HEADER.size:
+            self.close()
+            raise ValueError(f"Файл {path} не является двоичным снимком библиотеки.")
+        (magic, version, status_count, self.count, self.min_id, self.max_id, self._span, status_offset,
+         ids_offset, self._records, self._table, self._heap) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Файл {path} не является двоичным снимком библиотеки.")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Неподдерживаемая версия двоичного снимка: {version} (ожидается {VERSION}).")
+        self._statuses: List[str] = [self._string(*STATUS.unpack_from(self._mmap, status_offset + code * STATUS.size))
+                                     for code in range(status_count)]
+        self._authors: Dict[int, str] = {}
+        ids = memoryview(self._mmap)[ids_offset:self._records]
+        if sys.byteorder == "little":
+            self.ids = ids.cast("q")
+        else:
+            self.ids = array("q", ids.tobytes())
+            self.ids.byteswap()
+            ids.release()
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._heap + offset
+        return self._mmap[start:start + length].decode("utf-8")
+
+    def row(self, book_id: int) -> Optional[int]:
+        """Возвращает номер записи книги или None."""
+        if not self.count or book_id < self.min_id or book_id > self.max_id:
+            return None
+        if self._span:
+            row = ROW.unpack_from(self._mmap, self._table + (book_id - self.min_id) * ROW.size)[0]
+            return row - 1 if row else None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.ids[middle] < book_id:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self.count and self.ids[low] == book_id else None
+
+    def read(self, row: int) -> Book:
+        """Возвращает книгу по номеру записи."""
+        year, status, title_offset, title_length, author_offset, author_length = RECORD.unpack_from(
+            self._mmap, self._records + row * RECORD.size)
+        author = self._authors.get(author_offset)
+        if author is None:
+            author = self._authors[author_offset] = self._string(author_offset, author_length)
+        return Book(self.ids[row], self._string(title_offset, title_length), author, year, self._statuses[status])
+
+    def get(self, book_id: int) -> Optional[Book]:
+        """Возвращает книгу по ID или None."""
+        row = self.row(book_id)
+        return None if row is None else self.read(row)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Book]:
+        return (self.read(row) for row in range(self.count))
+
+    def close(self):
+        """Закрывает отображение файла."""
+        ids = getattr(self, "ids", None)
+        if isinstance(ids, memoryview):
+            ids.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+class MappedBooks(LazyBooks):
+    """
+    Словарь "ID -> книга" поверх двоичного снимка (см. LazyBooks).
+
+    Книга читается из отображенного в память файла при первом обращении;
+    номер записи вычисляется по таблице ID. После close файл снова
+    открывается при следующем обращении к непрочитанной книге.
+    """
+
+    def __init__(self, path: str):
+        """
+        Аргументы:
+            path (str): Путь к файлу снимка; если файла нет, словарь пуст.
+        """
+        self.data_file = path
+        self._loaded: Dict[int, Book] = {}
+        self._added: Dict[int, None] = {}
+        self._deleted = set()
+        self._order = None
+        self._snapshot: Optional[Snapshot] = None
+        self._ids = array("q")
+        self._max_id = 0
+        try:
+            self._open()
+        except FileNotFoundError:
+            pass
+
+    def _open(self) -> Snapshot:
+        """Отображает файл снимка в память, если он еще не открыт."""
+        if self._snapshot is None:
+            self._snapshot = Snapshot(self.data_file)
+            self._ids = self._snapshot.ids
+            self._max_id = self._snapshot.max_id
+        return self._snapshot
+
+    @property
+    def max_id(self) -> int:
+        return max(self._max_id, max(self._added, default=0))
+
+    def _row(self, book_id: int) -> Optional[int]:
+        if not self._ids:
+            return None
+        return self._open().row(book_id)
+
+    def _read(self, row: int) -> Book:
+        return self._open().read(row)
+
+    def close(self):
+        """Закрывает файл снимка."""
+        if self._snapshot is not None:
+            self._ids = array("q", self._ids)
+            self._snapshot.close()
+            self._snapshot = None
+
+
+class BinaryStorage(Storage):
+    """Хранение всех книг в двоичном снимке, который перезаписывается при каждом изменении."""
+
+    def __init__(self, data_file: str):
+        """
+        Аргументы:
+            data_file (str): Путь к файлу снимка.
+        """
+        self.data_file = data_file
+
+    def load(self) -> Iterator[Book]:
+        try:
+            snapshot = Snapshot(self.data_file)
+        except FileNotFoundError:
+            return
+        try:
+            yield from snapshot
+        finally:
+            snapshot.close()
+
+    def open_lazy(self) -> MutableMapping[int, Book]:
+        return MappedBooks(self.data_file)
+
+    def commit(self, ops: List[Dict], books: Callable[[], Iterable[Book]]):
+        self.save(books())
+
+    def save(self, books: Iterable[Book]):
+        write_snapshot(self.data_file, books)
+
+
+def json_to_binary(json_file: str, binary_file: str) -> int:
+    """Преобразует JSON-файл библиотеки в двоичный снимок. Возвращает количество книг."""
+    return write_snapshot(binary_file, iter_books(json_file))
+
+
+def binary_to_json(binary_file: str, json_file: str) -> int:
+    """Преобразует двоичный снимок в JSON-файл библиотеки. Возвращает количество книг."""
+    from .storage import JsonStorage
+
+    snapshot = Snapshot(binary_file)
+    try:
+        JsonStorage(json_file).save(snapshot)
+        return len(snapshot)
+    finally:
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Использование: python -m library.binary <library.json> <library.bin>\n"
+              "           или python -m library.binary <library.bin> <library.json>")
+        sys.exit(1)
+    source, target = sys.argv[1:]
+    convert = json_to_binary if source.endswith(".json") else binary_to_json
+    print(f"Преобразовано книг: {convert(source, target)}")
@@ -12,6 +12,8 @@ class Book:
         year (int): Год издания книги.
         status (str): Статус книги ("в наличии" или "выдана").
     """
+    __slots__ = ("id", "title", "author", "year", "status")
+
     def __init__(self, book_id: int, title: str, author: str, year: int, status: str = "в наличии"):
         """
         Инициализирует новый экземпляр книги.
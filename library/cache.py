@@ -0,0 +1,115 @@
+"""
+Кэш результатов поиска.
+
+Запись кэша помнит общий номер поколения (его увеличивают добавление и
+удаление книг) и номера поколений полей, по которым выполнялся поиск
+(их увеличивает изменение поля существующей книги), поэтому смена
+статуса не сбрасывает результаты поиска по названию и автору.
+Устаревшие записи обнаруживаются и удаляются при обращении.
+
+Методы get и put можно вызывать одновременно из нескольких потоков
+(они выполняются параллельно под блокировкой чтения библиотеки).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from .metrics import metrics
+
+
+class QueryCache:
+    """
+    Кэш LRU с необязательным временем жизни записей.
+
+    Атрибуты:
+        max_entries (int): Максимальное количество записей.
+        max_result (int): Результаты длиннее этого значения не кэшируются.
+        ttl (float): Время жизни записи в секундах или None.
+        hits (int): Количество попаданий.
+        misses (int): Количество промахов.
+    """
+
+    def __init__(self, max_entries: int = 256, max_result: int = 10000, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Аргументы:
+            max_entries (int, optional): Максимальное количество записей; 0 отключает кэш.
+            max_result (int, optional): Максимальная длина кэшируемого результата, ограничивает
+                память, занимаемую одной записью.
+            ttl (float, optional): Время жизни записи в секундах. По умолчанию не ограничено.
+            clock (Callable[[], float], optional): Источник времени для ttl.
+        """
+        self.max_entries = max_entries
+        self.max_result = max_result
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[int, ...], Optional[float], object]]" = OrderedDict()
+        self._generation = 0
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(mode: str, criteria: Dict) -> Tuple:
+        """Ключ запроса: режим и отсортированные пары (поле, значение в нижнем регистре) без пустых полей."""
+        return mode, tuple(sorted((field, str(value).lower()) for field, value in criteria.items() if value is not None))
+
+    def _stamp(self, fields: Iterable[str]) -> Tuple[int, ...]:
+        return (self._generation, *(self._generations.get(field, 0) for field in fields))
+
+    def get(self, key: Tuple):
+        """Возвращает закэшированный результат запроса или None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stamp, expires, value = entry
+                if stamp == self._stamp(field for field, _ in key[1]) and (expires is None or self._clock() < expires):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if metrics.enabled:
+                        metrics.increment("cache_hits_total")
+                    return value
+                del self._entries[key]
+            self.misses += 1
+        if metrics.enabled:
+            metrics.increment("cache_misses_total")
+        return None
+
+    def put(self, key: Tuple, value, size: int):
+        """Запоминает результат запроса размером size, вытесняя самые давно использованные записи."""
+        if self.max_entries <= 0 or size > self.max_result:
+            return
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (self._stamp(field for field, _ in key[1]), expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def bump(self, *fields: str):
+        """Отмечает изменение полей существующих книг; без аргументов - добавление или удаление книг."""
+        with self._lock:
+            if not fields:
+                self._generation += 1
+            for field in fields:
+                self._generations[field] = self._generations.get(field, 0) + 1
+
+    def clear(self):
+        """Удаляет все записи; статистика сохраняется."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Статистика кэша: попадания, промахи, доля попаданий и количество записей."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
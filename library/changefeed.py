@@ -0,0 +1,222 @@
+"""
+Лента изменений библиотеки.
+
+Каждое сохраненное изменение становится событием с возрастающим
+номером seq, например {"seq": 5, "op": "status", "id": 3, "status": "выдана"}
+(поля операции те же, что в журнале: "add", "remove", "status").
+События передаются подписчикам в том же процессе и, если указан файл,
+дописываются в него строками JSON. Потребитель запоминает номер
+последнего обработанного события и продолжает с него:
+
+    for event in read_changes("library.json.changes", since=last_seq):
+        ...
+
+События публикуются после записи изменений в хранилище. Чтобы завершение
+процесса между этими шагами не теряло события, перед записью операции
+сохраняются в <файл ленты>.pending (prepare), а при следующем открытии
+библиотеки уже сохраненные, но не опубликованные операции публикуются (recover).
+Подписчики в процессе такие события, разумеется, не получают.
+"""
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .journal import Journal
+
+
+TAIL_CHUNK = 1 << 16
+
+
+def _last_sequence(path: str) -> Tuple[int, int]:
+    """
+    Возвращает номер последнего события в файле и размер файла без недописанной строки.
+
+    Файл читается с конца, поэтому время не зависит от количества событий.
+    """
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return 0, 0
+    with file:
+        end = file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            position = max(0, position - TAIL_CHUNK)
+            file.seek(position)
+            tail = file.read(end - position)
+            line_end = tail.rfind(b"\n")
+            if line_end == -1:
+                continue
+            line_start = tail.rfind(b"\n", 0, line_end) + 1
+            if line_start == 0 and position > 0:
+                continue
+            return json.loads(tail[line_start:line_end])["seq"], position + line_end + 1
+        return 0, 0
+
+
+def _offset_after(file, since: int) -> int:
+    """
+    Находит двоичным поиском смещение первой строки с seq > since.
+
+    Номера событий в файле возрастают, поэтому разбираются только O(log n) строк.
+    """
+    def line_start(offset: int) -> int:
+        if offset == 0:
+            return 0
+        file.seek(offset - 1)
+        file.readline()
+        return file.tell()
+
+    low, high = 0, file.seek(0, os.SEEK_END)
+    while low < high:
+        middle = (low + high) // 2
+        file.seek(line_start(middle))
+        line = file.readline()
+        if not line.endswith(b"\n") or json.loads(line)["seq"] > since:
+            high = middle
+        else:
+            low = middle + 1
+    return line_start(low)
+
+
+def read_changes(path: str, since: int = 0) -> Iterator[Dict]:
+    """
+    Возвращает события из файла ленты с номером больше since.
+
+    Недописанная последняя строка (запись еще идет) не возвращается;
+    файл не изменяется, поэтому читать можно из другого процесса.
+    """
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with file:
+        file.seek(_offset_after(file, since) if since else 0)
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            event = json.loads(line)
+            if event["seq"] > since:
+                yield event
+
+
+class ChangeFeed:
+    """
+    Упорядоченная лента изменений с подписчиками и необязательным файлом на диске.
+
+    Атрибуты:
+        path (str): Файл ленты или None (только подписчики в процессе).
+        sequence (int): Номер последнего опубликованного события.
+    """
+
+    def __init__(self, path: Optional[str] = None, fsync: str = "batch"):
+        """
+        Аргументы:
+            path (str, optional): Файл, в который дописываются события. Если не указан,
+                события получают только подписчики.
+            fsync (str, optional): Режим fsync файла ("always", "batch", "never").
+        """
+        self.path = path
+        self.pending_file = path + ".pending" if path else None
+        self._journal = Journal(path, fsync=fsync) if path else None
+        self.sequence = _last_sequence(path)[0] if path else 0
+        self._subscribers: List[Callable[[Dict], None]] = []
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """
+        Подписывает callback(событие) на новые события и возвращает функцию отписки.
+
+        Подписчики вызываются после сохранения изменений в порядке номеров событий.
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def prepare(self, ops: List[Dict]):
+        """
+        Запоминает операции, которые будут опубликованы после записи в хранилище.
+
+        Файл заменяется атомарно и удаляется в publish; fsync выполняется в режиме "always".
+        """
+        if self.pending_file is None or not ops:
+            return
+        tmp_file = self.pending_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump(ops, file, ensure_ascii=False)
+            if self._journal.fsync == "always":
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(tmp_file, self.pending_file)
+
+    @property
+    def pending(self) -> bool:
+        """Остались ли операции, подготовленные к публикации, от прерванной записи."""
+        return self.pending_file is not None and os.path.exists(self.pending_file)
+
+    def recover(self, stored: Callable[[List[Dict]], bool]) -> List[Dict]:
+        """
+        Публикует операции, оставшиеся от прерванной записи, и возвращает новые события.
+
+        Аргументы:
+            stored (Callable): Функция, проверяющая, что операции записаны в хранилище.
+                Если нет, они не публикуются.
+
+        Уже опубликованная часть операций (конец файла ленты) повторно не публикуется.
+        """
+        try:
+            with open(self.pending_file, "r", encoding="utf-8") as file:
+                ops = json.load(file)
+        except FileNotFoundError:
+            return []
+        events = []
+        if stored(ops):
+            events = self.publish(ops[self._published(ops):])
+        if os.path.exists(self.pending_file):
+            os.remove(self.pending_file)
+        return events
+
+    def _published(self, ops: List[Dict]) -> int:
+        """Возвращает, сколько первых операций уже записано в конец файла ленты."""
+        sequence = _last_sequence(self.path)[0]
+        tail = [{key: value for key, value in event.items() if key != "seq"}
+                for event in read_changes(self.path, since=max(0, sequence - len(ops)))]
+        for count in range(min(len(tail), len(ops)), 0, -1):
+            if tail[-count:] == ops[:count]:
+                return count
+        return 0
+
+    def publish(self, ops: List[Dict]) -> List[Dict]:
+        """Присваивает операциям номера, записывает их в файл и передает подписчикам."""
+        if not ops:
+            return []
+        if self._journal is not None:
+            # Файл может дописывать и другой процесс (Library с shared=True).
+            sequence, valid_size = _last_sequence(self.path)
+            if os.path.exists(self.path) and valid_size != os.path.getsize(self.path):
+                self._journal.close()
+                with open(self.path, "r+b") as file:
+                    file.truncate(valid_size)
+            self.sequence = max(self.sequence, sequence)
+        events = []
+        for op in ops:
+            self.sequence += 1
+            event = {"seq": self.sequence, **op}
+            if self._journal is not None:
+                self._journal.append(event)
+            events.append(event)
+        if self.pending:
+            os.remove(self.pending_file)
+        for event in events:
+            for callback in list(self._subscribers):
+                callback(event)
+        return events
+
+    def read(self, since: int = 0) -> Iterator[Dict]:
+        """Возвращает события из файла с номером больше since (см. read_changes)."""
+        if self.path is None:
+            raise ValueError("Лента изменений не сохраняется в файл.")
+        return read_changes(self.path, since)
+
+    def close(self):
+        """Закрывает файл ленты."""
+        if self._journal is not None:
+            self._journal.close()
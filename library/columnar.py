@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, MutableMapping
+
+from .book import Book
+
+
+STATUSES = ["в наличии", "выдана"]
+
+
+class BookView:
+    """
+    Представление книги, хранящейся в ColumnarBooks.
+
+    Поддерживает те же атрибуты и метод to_dict, что и Book; чтение и
+    изменение атрибутов выполняется напрямую в столбцах хранилища.
+    """
+    __slots__ = ("_store", "_id", "_row")
+
+    def __init__(self, store: "ColumnarBooks", book_id: int, row: int):
+        self._store = store
+        self._id = book_id
+        self._row = row
+
+    def _locate(self) -> int:
+        """Возвращает актуальный номер строки книги в хранилище."""
+        ids = self._store._ids
+        if self._row >= len(ids) or ids[self._row] != self._id:
+            self._row = self._store._row(self._id)
+        return self._row
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def title(self) -> str:
+        return self._store._titles[self._locate()]
+
+    @title.setter
+    def title(self, value: str):
+        self._store._titles[self._locate()] = value
+
+    @property
+    def author(self) -> str:
+        return self._store._authors[self._locate()]
+
+    @author.setter
+    def author(self, value: str):
+        self._store._authors[self._locate()] = self._store._intern(value)
+
+    @property
+    def year(self) -> int:
+        return self._store._years[self._locate()]
+
+    @year.setter
+    def year(self, value: int):
+        self._store._years[self._locate()] = value
+
+    @property
+    def status(self) -> str:
+        return self._store._status_names[self._store._statuses[self._locate()]]
+
+    @status.setter
+    def status(self, value: str):
+        self._store._statuses[self._locate()] = self._store._status_code(value)
+
+    def to_dict(self) -> Dict:
+        """Преобразует книгу в словарь."""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "author": self.author,
+            "year": self.year,
+            "status": self.status
+        }
+
+
+class ColumnarBooks(MutableMapping):
+    """
+    Компактное хранилище книг по столбцам: словарь "ID -> книга".
+
+    ID и годы хранятся в массивах array, статус - одним байтом,
+    одинаковые имена авторов хранятся в одном экземпляре строки.
+    Строки упорядочены по ID, поэтому книга находится двоичным поиском
+    без отдельного словаря. Значения выдаются в виде BookView.
+    """
+
+    def __init__(self, books: Iterable[Book] = ()):
+        """
+        Заполняет хранилище переданными книгами.
+
+        Аргументы:
+            books (Iterable[Book], optional): Начальный набор книг.
+        """
+        self._ids = array("q")
+        self._years = array("h")
+        self._statuses = bytearray()
+        self._titles: List[str] = []
+        self._authors: List[str] = []
+        self._author_pool: Dict[str, str] = {}
+        self._status_names: List[str] = list(STATUSES)
+        for book in sorted(books, key=lambda item: item.id):
+            self[book.id] = book
+
+    def _intern(self, author: str) -> str:
+        """Возвращает общий экземпляр строки с именем автора."""
+        return self._author_pool.setdefault(author, author)
+
+    def _status_code(self, status: str) -> int:
+        """Возвращает однобайтовый код статуса."""
+        try:
+            return self._status_names.index(status)
+        except ValueError:
+            self._status_names.append(status)
+            return len(self._status_names) - 1
+
+    def _row(self, book_id: int) -> int:
+        """Возвращает номер строки книги или вызывает KeyError."""
+        row = bisect_left(self._ids, book_id)
+        if row == len(self._ids) or self._ids[row] != book_id:
+            raise KeyError(book_id)
+        return row
+
+    def __getitem__(self, book_id: int) -> BookView:
+        return BookView(self, book_id, self._row(book_id))
+
+    def __setitem__(self, book_id: int, book: Book):
+        row = bisect_left(self._ids, book_id)
+        if row < len(self._ids) and self._ids[row] == book_id:
+            self._titles[row] = book.title
+            self._authors[row] = self._intern(book.author)
+            self._years[row] = book.year
+            self._statuses[row] = self._status_code(book.status)
+            return
+        self._ids.insert(row, book_id)
+        self._titles.insert(row, book.title)
+        self._authors.insert(row, self._intern(book.author))
+        self._years.insert(row, book.year)
+        self._statuses.insert(row, self._status_code(book.status))
+
+    def __delitem__(self, book_id: int):
+        row = self._row(book_id)
+        del self._ids[row]
+        del self._titles[row]
+        del self._authors[row]
+        del self._years[row]
+        del self._statuses[row]
+
+    def pop(self, book_id: int, *default) -> Book:
+        """Удаляет книгу и возвращает её копию в виде Book."""
+        try:
+            row = self._row(book_id)
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        book = Book(book_id, self._titles[row], self._authors[row], self._years[row],
+                    self._status_names[self._statuses[row]])
+        del self[book_id]
+        return book
+
+    def __contains__(self, book_id) -> bool:
+        row = bisect_left(self._ids, book_id)
+        return row < len(self._ids) and self._ids[row] == book_id
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def values(self) -> Iterator[BookView]:
+        """Возвращает представления всех книг в порядке ID."""
+        return (BookView(self, book_id, row) for row, book_id in enumerate(self._ids))
@@ -0,0 +1,377 @@
+"""
+Проверка и восстановление файла library.json.
+
+Файл просматривается через mmap и делится на фрагменты по границам
+записей. Граница ставится перед записью, ID которой оканчивается на 000,
+поэтому она зависит только от содержимого рядом с ней: изменение записи
+меняет лишь её фрагмент, даже если длина файла изменилась. Для каждого
+фрагмента запоминается crc32 и результат проверки (ошибки записей, ID и
+хеши ключей "название + автор") в файле <data_file>.fsck. При следующей
+проверке разбираются только фрагменты с новой контрольной суммой.
+Общие проверки (повторяющиеся ID и ключи, пропуски ID) выполняются по
+компактным массивам ID и хешей всех записей.
+
+Проверка: python -m library.fsck library.json
+Восстановление: python -m library.fsck library.json --repair [--renumber]
+"""
+import argparse
+import base64
+import json
+import mmap
+import os
+import re
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+from hashlib import blake2b
+from itertools import islice
+from operator import eq
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from validators import ERROR_MESSAGES, STATUSES, check_book_data, current_year
+from .locking import FileLock, VersionFile
+
+
+CACHE_VERSION = 1
+REQUIRED_FIELDS = frozenset(("id", "title", "author", "year", "status"))
+FSCK_MESSAGES: Dict[str, str] = {
+    **ERROR_MESSAGES,
+    "id": "ID книги должен быть положительным числом.",
+    "duplicate_id": "Книга с таким ID уже встречалась в файле.",
+}
+
+# Разделитель записей перед записью с ID, оканчивающимся на 000 (в среднем 1000 записей во фрагменте).
+_BOUNDARY = re.compile(rb'\}\s*,(?=\s*\{\s*"id"\s*:\s*\d*000\s*[,}])')
+_ARRAY_START = re.compile(rb"\s*\[")
+_ARRAY_END = re.compile(rb"\]\s*\Z")
+_WHITESPACE = re.compile(rb"\s*")
+
+Problem = Tuple[int, int, str]
+
+
+class FsckReport:
+    """
+    Результат проверки файла.
+
+    Атрибуты:
+        records (int): Количество записей.
+        problems (List[Tuple[int, int, str]]): Ошибки (номер записи с 0, ID или 0, код из FSCK_MESSAGES).
+        gaps (List[Tuple[int, int]]): Пропуски ID - диапазоны (первый, последний) отсутствующих ID.
+        max_id (int): Наибольший ID.
+        chunks (int): Количество фрагментов файла.
+        reused (int): Количество фрагментов, результат проверки которых взят из кэша.
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.problems: List[Problem] = []
+        self.gaps: List[Tuple[int, int]] = []
+        self.max_id = 0
+        self.chunks = 0
+        self.reused = 0
+
+    @property
+    def ok(self) -> bool:
+        """Нет ли в файле ошибок (пропуски ID ошибкой не считаются)."""
+        return not self.problems
+
+    def messages(self) -> Iterator[str]:
+        """Описания ошибок для вывода пользователю."""
+        for row, book_id, code in self.problems:
+            where = f"запись {row + 1}" + (f", ID {book_id}" if book_id else "")
+            yield f"{where}: {FSCK_MESSAGES[code]}"
+
+
+def _key_hash(title: str, author: str) -> int:
+    """64-битный хеш ключа book_key (название и автор без учета регистра) для поиска повторов без хранения строк."""
+    key = f"{title.casefold()}\0{author.casefold()}".encode("utf-8")
+    return int.from_bytes(blake2b(key, digest_size=8).digest(), "little")
+
+
+def _check_record(data) -> Tuple[int, int, Optional[str]]:
+    """
+    Проверяет запись по правилам validators.py (кроме повторов, которые проверяются по всему файлу).
+
+    Возвращает (ID или 0, хеш ключа или 0, код ошибки или None).
+    """
+    if not isinstance(data, dict):
+        return 0, 0, "json"
+    if not data.keys() >= REQUIRED_FIELDS:
+        book_id = data.get("id")
+        return (book_id if type(book_id) is int and book_id > 0 else 0), 0, "missing_field"
+    book_id, title, author = data["id"], data["title"], data["author"]
+    if type(book_id) is not int or book_id <= 0:
+        book_id, code = 0, "id"
+    else:
+        code = None
+    if not isinstance(title, str) or not isinstance(author, str):
+        return book_id, 0, code or "field_type"
+    code = code or check_book_data(title, author, data["year"], ())
+    if code is None and data["status"] not in STATUSES:
+        code = "status"
+    return book_id, _key_hash(title, author), code
+
+
+def _parse_chunk(chunk: bytes) -> List:
+    """
+    Разбирает фрагмент (записи через запятую). Если фрагмент не является
+    корректным JSON, разбирает записи по отдельности; нераспознанные места
+    возвращаются как None.
+    """
+    try:
+        return json.loads(b"[" + chunk + b"]")
+    except ValueError:
+        pass
+    text = chunk.decode("utf-8", errors="replace")
+    decoder = json.JSONDecoder()
+    records = []
+    position = 0
+    while True:
+        start = text.find("{", position)
+        if start == -1:
+            if text[position:].strip(" \t\r\n,"):
+                records.append(None)
+            return records
+        if text[position:start].strip(" \t\r\n,"):
+            records.append(None)
+        try:
+            data, position = decoder.raw_decode(text, start)
+        except ValueError:
+            # Нераспознанная запись пропускается до начала следующей.
+            records.append(None)
+            following = text.find("{", start + 1)
+            position = len(text) if following == -1 else following
+            continue
+        records.append(data)
+
+
+def _check_chunk(chunk: bytes) -> Dict:
+    """Проверяет записи фрагмента и возвращает результат для кэша."""
+    results = [_check_record(data) for data in _parse_chunk(chunk)]
+    return {
+        "count": len(results),
+        "problems": [(row, book_id, code) for row, (book_id, _, code) in enumerate(results) if code],
+        "ids": array("q", [book_id for book_id, _, _ in results]),
+        "keys": array("Q", [key for _, key, _ in results]),
+    }
+
+
+def _chunks(view) -> Iterator[Tuple[int, int]]:
+    """Возвращает границы (начало, конец) фрагментов записей между скобками JSON-массива."""
+    start = _ARRAY_START.match(view)
+    end = _ARRAY_END.search(view)
+    if start is None or end is None or end.start() < start.end():
+        raise ValueError("Файл данных должен содержать JSON-массив.")
+    position = start.end()
+    if _WHITESPACE.match(view, position, end.start()).end() == end.start():
+        return
+    for match in _BOUNDARY.finditer(view, position, end.start()):
+        yield position, match.start() + 1
+        position = match.end()
+    yield position, end.start()
+
+
+def _load_cache(path: str) -> Dict[str, Dict]:
+    """Читает кэш результатов проверки фрагментов ("crc32:длина" -> результат)."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION or cache.get("year") != current_year():
+        return {}
+    chunks = {}
+    for key, entry in cache["chunks"].items():
+        chunks[key] = {
+            "count": entry["count"],
+            "problems": [tuple(problem) for problem in entry["problems"]],
+            "ids": array("q", base64.b64decode(entry["ids"])),
+            "keys": array("Q", base64.b64decode(entry["keys"])),
+        }
+    return chunks
+
+
+def _save_cache(path: str, chunks: Dict[str, Dict]):
+    """Атомарно записывает кэш результатов проверки фрагментов."""
+    data = {
+        "version": CACHE_VERSION,
+        "year": current_year(),
+        "chunks": {
+            key: {
+                "count": entry["count"],
+                "problems": entry["problems"],
+                "ids": base64.b64encode(entry["ids"].tobytes()).decode("ascii"),
+                "keys": base64.b64encode(entry["keys"].tobytes()).decode("ascii"),
+            }
+            for key, entry in chunks.items()
+        },
+    }
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    os.replace(tmp_file, path)
+
+
+def _repeated(ordered: List[int]) -> Dict[int, bool]:
+    """Значения (кроме 0), встречающиеся в отсортированном списке больше одного раза."""
+    if not any(map(eq, ordered, islice(ordered, 1, None))):
+        return {}
+    return {value: False for previous, value in zip(ordered, ordered[1:]) if value == previous and value}
+
+
+def check(data_file: str, use_cache: bool = True) -> FsckReport:
+    """
+    Проверяет файл библиотеки.
+
+    Аргументы:
+        data_file (str): Путь к library.json.
+        use_cache (bool, optional): Использовать и обновлять кэш <data_file>.fsck,
+            чтобы повторно разбирать только измененные фрагменты.
+    """
+    report = FsckReport()
+    cache_file = data_file + ".fsck"
+    cached = _load_cache(cache_file) if use_cache else {}
+    chunks: Dict[str, Dict] = {}
+    ids = array("q")
+    keys = array("Q")
+    with open(data_file, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise ValueError("Файл данных должен содержать JSON-массив.")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            for start, end in _chunks(view):
+                chunk = view[start:end]
+                key = f"{zlib.crc32(chunk)}:{len(chunk)}"
+                entry = chunks.get(key) or cached.get(key)
+                if entry is None:
+                    entry = _check_chunk(chunk)
+                else:
+                    report.reused += 1
+                chunks[key] = entry
+                for row, book_id, code in entry["problems"]:
+                    report.problems.append((report.records + row, book_id, code))
+                report.records += entry["count"]
+                ids.extend(entry["ids"])
+                keys.extend(entry["keys"])
+                report.chunks += 1
+    if use_cache and chunks.keys() != cached.keys():
+        _save_cache(cache_file, chunks)
+
+    ordered_ids = sorted(ids)
+    repeated_ids = _repeated(ordered_ids)
+    repeated_keys = _repeated(sorted(keys))
+    if repeated_ids or repeated_keys:
+        for row, (book_id, key) in enumerate(zip(ids, keys)):
+            if book_id in repeated_ids:
+                if repeated_ids[book_id]:
+                    report.problems.append((row, book_id, "duplicate_id"))
+                repeated_ids[book_id] = True
+            if key in repeated_keys:
+                if repeated_keys[key]:
+                    report.problems.append((row, book_id, "duplicate"))
+                repeated_keys[key] = True
+        report.problems.sort()
+
+    valid_ids = [0, *islice(ordered_ids, bisect_right(ordered_ids, 0), None)]
+    report.gaps = [(previous + 1, book_id - 1)
+                   for previous, book_id in zip(valid_ids, islice(valid_ids, 1, None)) if book_id > previous + 1]
+    report.max_id = valid_ids[-1]
+    return report
+
+
+def _write_array(path: str, records: Iterator[Dict]) -> int:
+    """Записывает записи в формате JsonStorage (json.dump с indent=4), не собирая их в список."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        for data in records:
+            text = json.dumps(data, ensure_ascii=False, indent=4).replace("\n", "\n    ")
+            file.write(("[\n    " if count == 0 else ",\n    ") + text)
+            count += 1
+        file.write("\n]" if count else "[]")
+    return count
+
+
+def repair(data_file: str, renumber: bool = False) -> Tuple[FsckReport, int]:
+    """
+    Исправляет файл библиотеки и возвращает (отчет проверки до исправления, количество удаленных записей).
+
+    Исправления:
+        - записи, которые не удалось разобрать или без названия, автора или года, удаляются;
+        - записи с повторяющимся или некорректным ID получают новые ID после наибольшего;
+        - неизвестный статус заменяется на "в наличии";
+        - с renumber=True ID назначаются заново подряд с 1 (без пропусков). ID, сохраненные
+          вне файла (выдачи, лента изменений), при этом перестают соответствовать книгам.
+    Остальные ошибки (год, длина названия и т. п.) только сообщаются.
+    Файл заменяется атомарно. Если есть <data_file>.lock, замена выполняется под ним
+    с увеличением номера поколения <data_file>.version, поэтому открытые библиотеки
+    с shared=True перечитывают исправленный файл; другие не должны быть открыты для записи.
+    """
+    report = check(data_file, use_cache=False)
+    lock_file = data_file + ".lock"
+    removed = 0
+
+    def fixed_records(view) -> Iterator[Dict]:
+        nonlocal removed
+        seen = set()
+        next_id = report.max_id + 1
+        number = 0
+        for start, end in _chunks(view):
+            for data in _parse_chunk(view[start:end]):
+                if not isinstance(data, dict) or not data.keys() >= {"title", "author", "year"}:
+                    removed += 1
+                    continue
+                book_id = data.get("id")
+                if type(book_id) is not int or book_id <= 0 or book_id in seen:
+                    book_id, next_id = next_id, next_id + 1
+                seen.add(book_id)
+                number += 1
+                status = data.get("status")
+                yield {
+                    "id": number if renumber else book_id,
+                    "title": data["title"],
+                    "author": data["author"],
+                    "year": data["year"],
+                    "status": status if status in STATUSES else "в наличии",
+                }
+
+    def rewrite():
+        tmp_file = data_file + ".tmp"
+        with open(data_file, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                _write_array(tmp_file, fixed_records(view))
+        os.replace(tmp_file, data_file)
+
+    if os.path.exists(lock_file):
+        # Библиотеки с shared=True перечитают исправленный файл до своей следующей записи.
+        with FileLock(lock_file).acquire():
+            rewrite()
+            VersionFile(data_file + ".version").bump()
+    else:
+        rewrite()
+    return report, removed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Проверка и восстановление файла библиотеки.")
+    parser.add_argument("data_file")
+    parser.add_argument("--repair", action="store_true", help="Исправить повторяющиеся ID, статусы и битые записи.")
+    parser.add_argument("--renumber", action="store_true", help="При исправлении назначить ID подряд с 1.")
+    parser.add_argument("--no-cache", action="store_true", help="Не использовать кэш результатов <data_file>.fsck.")
+    args = parser.parse_args(argv)
+
+    if args.repair:
+        report, removed = repair(args.data_file, renumber=args.renumber)
+    else:
+        report, removed = check(args.data_file, use_cache=not args.no_cache), 0
+    for message in report.messages():
+        print(message)
+    print(f"Записей: {report.records}, ошибок: {len(report.problems)}, пропусков ID: {len(report.gaps)}, "
+          f"фрагментов: {report.chunks} (из кэша: {report.reused}).")
+    if args.repair:
+        print(f"Файл исправлен, удалено записей: {removed}.")
+        return 0
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
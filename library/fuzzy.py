@@ -0,0 +1,52 @@
+from typing import Optional, Set
+
+
+def fold(text: str) -> str:
+    """Приводит текст к виду для нечеткого сравнения: без учета регистра, "ё" как "е"."""
+    return text.casefold().replace("ё", "е")
+
+
+def trigrams(token: str) -> Set[str]:
+    """Возвращает триграммы слова с границами ("^" в начале, "$" в конце)."""
+    padded = f"^{token}$"
+    return {padded[position:position + 3] for position in range(len(padded) - 2)}
+
+
+def max_typos(length: int) -> int:
+    """Допустимое количество опечаток в слове заданной длины."""
+    if length <= 2:
+        return 0
+    if length <= 5:
+        return 1
+    return 2
+
+
+def bounded_distance(first: str, second: str, limit: int) -> Optional[int]:
+    """
+    Возвращает расстояние Левенштейна между строками или None, если оно больше limit.
+
+    Вычисляется только полоса шириной 2 * limit + 1 вокруг диагонали, и
+    вычисление прекращается, как только вся строка таблицы превышает limit.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return None
+    if first == second:
+        return 0
+    beyond = limit + 1
+    previous = list(range(len(second) + 1))
+    for row, first_char in enumerate(first, start=1):
+        low = max(1, row - limit)
+        high = min(len(second), row + limit)
+        current = [beyond] * (len(second) + 1)
+        current[0] = row if row <= limit else beyond
+        row_min = current[0]
+        for column in range(low, high + 1):
+            value = min(previous[column] + 1, current[column - 1] + 1,
+                        previous[column - 1] + (first_char != second[column - 1]))
+            current[column] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
@@ -0,0 +1,143 @@
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+
+from .metrics import metrics
+
+
+FSYNC_MODES = ("always", "batch", "never")
+
+
+class Journal:
+    """
+    Журнал изменений библиотеки (write-ahead log).
+
+    Каждое изменение записывается отдельной строкой JSON в конец файла,
+    поэтому стоимость записи не зависит от размера каталога.
+    Операции журнала идемпотентны ("add" записывает книгу целиком,
+    "remove" удаляет её, "status" устанавливает статус), поэтому повторное
+    применение журнала к уже сжатому снимку даёт то же состояние.
+
+    Атрибуты:
+        path (str): Путь к файлу журнала.
+        fsync (str): Режим сброса на диск: "always", "batch" или "never".
+        batch_size (int): Количество записей между fsync в режиме "batch".
+        count (int): Количество записей в журнале.
+    """
+
+    def __init__(self, path: str, fsync: str = "batch", batch_size: int = 64):
+        """
+        Открывает журнал для дозаписи.
+
+        Аргументы:
+            path (str): Путь к файлу журнала.
+            fsync (str, optional): Режим сброса на диск. По умолчанию "batch".
+            batch_size (int, optional): Размер пакета для режима "batch".
+        """
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"Неизвестный режим fsync: {fsync}")
+        self.path = path
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self.count = 0
+        self._unsynced = 0
+        self._file = None
+
+    def replay(self) -> Iterator[Dict]:
+        """
+        Последовательно возвращает операции из журнала.
+
+        Недописанная последняя строка (сбой во время записи) отбрасывается,
+        а файл усекается до последней целой записи.
+        """
+        self.count = 0
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        valid_size = 0
+        with file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break
+                valid_size += len(line)
+                self.count += 1
+                yield op
+        if valid_size != os.path.getsize(self.path):
+            with open(self.path, "r+b") as file:
+                file.truncate(valid_size)
+
+    def read_from(self, offset: int) -> Optional[List[Dict]]:
+        """
+        Возвращает целые записи, дописанные после смещения offset (см. size).
+
+        Возвращает None, если файл короче offset, то есть журнал был очищен.
+        """
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return None if offset else []
+        ops = []
+        with file:
+            if os.fstat(file.fileno()).st_size < offset:
+                return None
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    ops.append(json.loads(line))
+                except ValueError:
+                    break
+        self.count += len(ops)
+        return ops
+
+    def size(self) -> int:
+        """Размер файла журнала в байтах (0, если файла нет)."""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, op: Dict):
+        """Дописывает операцию в журнал с учетом режима fsync."""
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        record = json.dumps(op, ensure_ascii=False).encode("utf-8") + b"\n"
+        self._file.write(record)
+        if metrics.enabled:
+            metrics.increment("bytes_written_total", len(record), target="journal")
+        self.count += 1
+        self._unsynced += 1
+        if self.fsync == "always" or (self.fsync == "batch" and self._unsynced >= self.batch_size):
+            self.sync()
+        else:
+            self._file.flush()
+
+    def sync(self):
+        """Принудительно сбрасывает журнал на диск."""
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def reset(self):
+        """Очищает журнал после сжатия в снимок."""
+        self.close()
+        with open(self.path, "wb") as file:
+            file.flush()
+            os.fsync(file.fileno())
+        self.count = 0
+
+    def close(self):
+        """Сбрасывает и закрывает файл журнала."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -1,8 +1,95 @@
-import json
-from typing import List, Optional
+import atexit
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from datetime import date
+from functools import wraps
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
 
-from validators import validate_book_data, validate_status, validate_book_id
+from validators import (ERROR_MESSAGES, BookValidator, book_key, validate_book_data, validate_status,
+                        validate_book_id)
 from .book import Book
+from .cache import QueryCache
+from .changefeed import ChangeFeed
+from .columnar import ColumnarBooks
+from .loans import Loan, Loans
+from .locking import FileLock, VersionFile
+from .metrics import SIZE_BUCKETS, instrumented, metrics
+from .query import Columns, Predicate
+from .rwlock import RWLock
+from .search_index import INDEXED_FIELDS, MATCH_MODES, SearchIndex
+from .sorted_index import SortedIndex
+from .storage import Storage, create_storage
+
+
+PERSISTENCE_MODES = ("immediate", "debounced", "on_exit")
+
+# Количество книг, которое iter_books читает за одно взятие блокировки чтения.
+ITER_CHUNK = 1000
+
+# Библиотеки с отложенным сохранением, у которых есть несохраненные изменения; они сохраняются
+# при выходе. Ссылки сильные, поэтому изменения библиотеки, брошенной без close(), не теряются.
+_deferred: Set["Library"] = set()
+
+
+@atexit.register
+def _flush_deferred():
+    """Сохраняет незаписанные изменения всех библиотек с отложенным сохранением."""
+    for library in list(_deferred):
+        library.flush()
+
+
+def _exit_on_sigterm(signum, frame):
+    """
+    Завершает процесс по SIGTERM через SystemExit.
+
+    Открытые блоки batch() при этом завершаются, а изменения сохраняет _flush_deferred.
+    """
+    raise SystemExit(128 + signum)
+
+
+def _catch_sigterm():
+    """Перехватывает SIGTERM, если он не занят, чтобы изменения сохранились и при нем."""
+    if (threading.current_thread() is threading.main_thread()
+            and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL):
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
+
+
+def _mutation(method):
+    """Выполняет изменяющий метод библиотеки внутри блока batch()."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.batch():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _reading(method):
+    """
+    Выполняет читающий метод под блокировкой чтения.
+
+    Перед чтением подгружает изменения других процессов (для shared=True).
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._rwlock.held():
+            return method(self, *args, **kwargs)
+        self.refresh()
+        with self._rwlock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _apply_op(records: Dict[int, Book], op: Dict):
+    """Применяет операцию хранилища к словарю "ID -> книга"."""
+    if op["op"] == "add":
+        records[op["book"]["id"]] = Book.from_dict(op["book"])
+    elif op["op"] == "remove":
+        records.pop(op["id"], None)
+    elif op["op"] == "status" and op["id"] in records:
+        records[op["id"]].status = op["status"]
 
 
 class Library:
@@ -11,87 +98,876 @@ class Library:
 
     """
 
-    def __init__(self, data_file: str):
+    def __init__(self, data_file: str, storage_mode: str = "json", fsync: str = "batch",
+                 compact_every: int = 1000, layout: str = "objects", lazy: bool = False,
+                 storage: Optional[Storage] = None, shared: bool = False, change_feed: Optional[str] = None,
+                 persistence: str = "immediate", flush_delay: float = 0.5, flush_every: int = 100,
+                 cache_size: int = 256, cache_ttl: Optional[float] = None):
         """
         Инициализирует библиотеку с указанным файлом данных.
 
         Аргументы:
             data_file (str): Путь к файлу, содержащему данные о книгах.
+            storage_mode (str, optional): "json" - перезапись файла при каждом изменении,
+                "journal" - дозапись изменений в журнал со сжатием в снимок,
+                "sqlite" - база SQLite (data_file - путь к базе), "binary" - двоичный
+                снимок, открываемый через mmap (см. library.binary). По умолчанию "json".
+            fsync (str, optional): Режим fsync журнала ("always", "batch", "never").
+            compact_every (int, optional): Количество записей журнала, после которого
+                журнал сжимается в снимок.
+            layout (str, optional): "objects" - книги хранятся объектами Book,
+                "columnar" - компактное хранение по столбцам (ColumnarBooks). По умолчанию "objects".
+            lazy (bool, optional): Если True, записи файла разбираются при первом обращении
+                к книге (LazyBooks), а индексы поиска строятся при первой необходимости.
+            storage (Storage, optional): Готовое хранилище; если передано, storage_mode не используется.
+            shared (bool, optional): Если True, файл данных используется несколькими процессами:
+                запись выполняется под блокировкой <data_file>.lock, а номер поколения в
+                <data_file>.version позволяет подгружать только изменения других процессов.
+            change_feed (str, optional): Файл, в который дописывается лента изменений
+                (см. library.changefeed). Без него события получают только подписчики
+                changes.subscribe(...) в этом процессе.
+            persistence (str, optional): Когда сохранять изменения: "immediate" - сразу после
+                каждой операции, "debounced" - в фоновом потоке не позже чем через flush_delay
+                секунд после первого несохраненного изменения или сразу после flush_every
+                изменений, "on_exit" - только при вызове flush()/close() и при выходе из
+                программы. В отложенных режимах несохраненные изменения записываются при
+                обычном завершении и по SIGTERM. Несовместимо с shared=True.
+            flush_delay (float, optional): Задержка сохранения в режиме "debounced", секунды.
+            flush_every (int, optional): Количество изменений, после которого режим
+                "debounced" сохраняет их сразу.
+            cache_size (int, optional): Количество запоминаемых результатов поиска
+                (см. library.cache); 0 отключает кэш.
+            cache_ttl (float, optional): Время жизни результата в кэше, секунды.
             books (List[Book]): Список книг в библиотеке.
+
+        Индексы, поддерживаемые вместе со списком книг:
+            _by_id (Dict[int, Book]): Книги по ID в порядке добавления (ColumnarBooks - в порядке ID).
+            _keys (Set[Tuple[str, str]]): Ключи book_key(название, автор) для поиска дубликатов.
+            _next_id (int): Следующий свободный ID (монотонно возрастает).
+            _index (SearchIndex): Инвертированный индекс по словам названий и авторов.
+            _sorted (Dict[str, SortedIndex]): Отсортированные индексы, создаются при первой
+                сортировке по полю.
+            _columns (Columns): Книги по столбцам для query и count_by; строятся при
+                первом запросе и далее изменяются вместе с книгами.
+            cache (QueryCache): Результаты search_books; изменения книг увеличивают номера
+                поколений затронутых полей, и устаревшие результаты не используются.
+
+        Изменения накапливаются в _pending и передаются хранилищу методом flush:
+        сразу после операции или при выходе из блока batch(). После сохранения
+        они публикуются в ленте изменений changes с возрастающими номерами.
+        Пока хранилище записывает изменения (_committing), поиск не передается
+        хранилищу и его результаты не кэшируются.
+
+        Выдачи читателям (checkout, return_book) хранятся в <data_file>.loans
+        (см. library.loans); файл создается при первой выдаче. Записи выдач
+        сохраняются в flush вместе с изменениями статусов, после них.
+
+        Библиотеку можно использовать из нескольких потоков: методы чтения
+        выполняются параллельно под блокировкой чтения _rwlock (см. library.rwlock),
+        изменения (batch) - под блокировкой записи, поэтому ID новых книг не
+        повторяются. Запись на диск (flush, save_books, compact) выполняется
+        по одной под _io_lock и не задерживает чтение. Ленивые индексы
+        строятся под _build_lock.
         """
+        if layout not in ("objects", "columnar"):
+            raise ValueError(f"Неизвестный способ хранения книг: {layout}")
+        if lazy and layout != "objects":
+            raise ValueError("Ленивая загрузка поддерживается только для layout='objects'.")
+        if persistence not in PERSISTENCE_MODES:
+            raise ValueError(f"Неизвестный режим сохранения: {persistence}")
+        if shared and persistence != "immediate":
+            raise ValueError("Отложенное сохранение несовместимо с shared=True.")
         self.data_file = data_file
-        self.books: List[Book] = self.load_books()
-
-    def load_books(self) -> List[Book]:
-        """Загружает книги из JSON-файла."""
-        try:
-            with open(self.data_file, "r", encoding="utf-8") as file:
-                return [Book.from_dict(book) for book in json.load(file)]
-        except FileNotFoundError:
-            return []
+        self.layout = layout
+        self.lazy = lazy
+        self.storage_mode = storage_mode
+        self.storage = storage or create_storage(data_file, storage_mode, fsync=fsync, compact_every=compact_every)
+        self._by_id = {}
+        self.cache = QueryCache(cache_size, ttl=cache_ttl)
+        self._pending: List[Dict] = []
+        self._committing = False
+        self.changes = ChangeFeed(change_feed, fsync=fsync)
+        self.loans_file = data_file + ".loans"
+        self._loans: Optional[Loans] = None
+        self._fsync = fsync
+        self._batch_depth = 0
+        self.persistence = persistence
+        self.flush_delay = flush_delay
+        self.flush_every = flush_every
+        self._rwlock = RWLock()
+        self._io_lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._lock: Optional[FileLock] = None
+        self._lock_owner: Optional[int] = None
+        self._version: Optional[VersionFile] = None
+        self._generation = 0
+        self._signature = None
+        self._position = None
+        self._reset()
+        if shared:
+            self._lock = FileLock(data_file + ".lock")
+            self._version = VersionFile(data_file + ".version")
+            with self._lock.acquire(shared=True):
+                self._signature = self._version.signature()
+                self._generation = self._version.read()
+                self.load_books()
+        else:
+            self.load_books()
+        if self.changes.pending:
+            with self._io_lock, self._exclusive():
+                self.changes.recover(self._stored)
+        if persistence != "immediate":
+            _catch_sigterm()
+
+    @property
+    def shared(self) -> bool:
+        """Используется ли файл данных несколькими процессами."""
+        return self._lock is not None
+
+    @property
+    def loans(self) -> Loans:
+        """Выдачи книг читателям; журнал выдач загружается при первом обращении."""
+        if self._loans is None:
+            with self._build_lock:
+                if self._loans is None:
+                    self._loans = Loans(self.loans_file, fsync=self._fsync)
+        return self._loans
+
+    def _active_loans(self) -> Optional[Loans]:
+        """Выдачи, если они уже использовались (загружены или есть файл), иначе None."""
+        if self._loans is None and not os.path.exists(self.loans_file):
+            return None
+        return self.loans
+
+    @property
+    def books(self) -> List[Book]:
+        """
+        Список книг библиотеки в порядке добавления.
+
+        Возвращается новый список; книги следует изменять через методы библиотеки
+        или присваиванием нового списка, чтобы индексы оставались согласованными.
+        """
+        with self._rwlock.read():
+            return list(self._by_id.values())
+
+    @books.setter
+    def books(self, books: List[Book]):
+        """Заменяет все книги библиотеки и перестраивает индексы."""
+        with self._rwlock.write():
+            self._reset()
+            for book in books:
+                self._insert(book)
+
+    def _reset(self, by_id: Optional[Dict[int, Book]] = None):
+        """Очищает книги и индексы. Если передан by_id, индексы поиска будут построены позже."""
+        if by_id is not None:
+            self._by_id = by_id
+        elif self.layout == "columnar":
+            self._by_id = ColumnarBooks()
+        else:
+            self._by_id = {}
+        self._indexed = by_id is None
+        self._keys: Set[Tuple[str, str]] = set()
+        self._index = SearchIndex()
+        self._sorted: Dict[str, SortedIndex] = {}
+        self._columns: Optional[Columns] = None
+        self.cache.clear()
+        self._next_id = 1
+
+    def _ensure_indexed(self):
+        """
+        Строит индексы поиска, если книги были загружены лениво.
 
+        Может вызываться одновременно из нескольких читающих потоков,
+        поэтому индексы строит только один из них.
+        """
+        if self._indexed:
+            return
+        with self._build_lock:
+            if self._indexed:
+                return
+            for book in self._by_id.values():
+                self._keys.add(book_key(book.title, book.author))
+                self._index.add(book)
+            self._indexed = True
+
+    def _insert(self, book: Book):
+        """Добавляет книгу в хранилище и индексы."""
+        self._by_id[book.id] = book
+        if self._columns is not None:
+            self._columns.add(book)
+        self.cache.bump()
+        if self._indexed:
+            self._keys.add(book_key(book.title, book.author))
+            self._index.add(book)
+        for index in self._sorted.values():
+            index.add(book)
+        if book.id >= self._next_id:
+            self._next_id = book.id + 1
+
+    def _discard(self, book_id: int) -> Book:
+        """Удаляет книгу из хранилища и индексов и возвращает её."""
+        book = self._by_id.pop(book_id)
+        if self._columns is not None:
+            self._columns.remove(book_id)
+            if self._columns.dead * 2 > self._columns.size:
+                self._columns = None
+        self.cache.bump()
+        if self._indexed:
+            self._keys.discard(book_key(book.title, book.author))
+            self._index.remove(book)
+        for index in self._sorted.values():
+            index.remove(book)
+        return book
+
+    def _set_status(self, book: Book, status: str):
+        """Изменяет статус книги."""
+        book.status = status
+        if self._columns is not None:
+            self._columns.update(book.id, "status", status)
+        self.cache.bump("status")
+
+    @instrumented("load_books")
+    def load_books(self):
+        """
+        Загружает книги из хранилища и применяет к ним операции из журнала.
+
+        Записи читаются потоково, индексы строятся по мере чтения.
+        """
+        with self._io_lock, self._rwlock.write():
+            self._close_lazy()
+            if self.lazy:
+                self._reset(self.storage.open_lazy())
+                self._next_id = self._by_id.max_id + 1
+            else:
+                self._reset()
+                for book in self.storage.load():
+                    self._insert(book)
+
+            for op in self.storage.replay():
+                self._apply_stored(op)
+            if self._version is not None:
+                self._position = self.storage.position()
+
+    def _apply_stored(self, op: Dict):
+        """Применяет операцию из хранилища к книгам и индексам."""
+        if op["op"] == "add":
+            if op["book"]["id"] in self._by_id:
+                self._discard(op["book"]["id"])
+            self._insert(Book.from_dict(op["book"]))
+        elif op["op"] == "remove":
+            if op["id"] in self._by_id:
+                self._discard(op["id"])
+        elif op["op"] == "status" and op["id"] in self._by_id:
+            self._set_status(self._by_id[op["id"]], op["status"])
+
+    def _stored(self, ops: List[Dict]) -> bool:
+        """
+        Проверяет, отражены ли операции в загруженных книгах.
+
+        Сравнивается итоговое состояние затронутых книг: наличие и статус.
+        """
+        expected: Dict[int, Optional[str]] = {}
+        for op in ops:
+            if op["op"] == "add":
+                expected[op["book"]["id"]] = op["book"]["status"]
+            elif op["op"] == "remove":
+                expected[op["id"]] = None
+            elif op["op"] == "status" and expected.get(op["id"], "") is not None:
+                expected[op["id"]] = op["status"]
+        for book_id, status in expected.items():
+            book = self._by_id.get(book_id)
+            if (book.status if book is not None else None) != status:
+                return False
+        return True
+
+    def _snapshot(self) -> List[Book]:
+        """
+        Возвращает книги библиотеки для записи в хранилище без удержания блокировки.
+
+        Представления ColumnarBooks ссылаются на строки столбцов, поэтому копируются.
+        """
+        if self.layout == "columnar":
+            return [Book(book.id, book.title, book.author, book.year, book.status) for book in self._by_id.values()]
+        return list(self._by_id.values())
+
+    @instrumented("save_books")
     def save_books(self):
-        """Сохраняет текущий список книг в JSON-файл."""
-        with open(self.data_file, "w", encoding="utf-8") as file:
-            json.dump([book.to_dict() for book in self.books], file, ensure_ascii=False, indent=4)
+        """Сохраняет все книги в хранилище целиком."""
+        with self._io_lock, self._exclusive():
+            with self._rwlock.read():
+                books = self._snapshot()
+            self.storage.save(books)
+            self._bump_generation()
+
+    @instrumented("compact")
+    def compact(self):
+        """Сжимает накопленные изменения хранилища (например, журнал) в снимок."""
+        with self._io_lock, self._exclusive():
+            with self._rwlock.read():
+                books = self._snapshot()
+            self.storage.compact(books)
+            self._bump_generation()
+
+    def close(self):
+        """Сбрасывает на диск незаписанные изменения и закрывает файлы."""
+        with self._io_lock:
+            self.flush()
+            with self._rwlock.write():
+                _deferred.discard(self)
+                self.storage.close()
+                self.changes.close()
+                if self._loans is not None:
+                    self._loans.close()
+                self._close_lazy()
+
+    def _close_lazy(self):
+        """Закрывает файл ленивого хранилища книг, если оно используется."""
+        if hasattr(self._by_id, "close"):
+            self._by_id.close()
+
+    @property
+    def dirty(self) -> bool:
+        """Есть ли изменения (в том числе записи выдач), еще не переданные хранилищу."""
+        return bool(self._pending) or self._loans is not None and self._loans.dirty
+
+    def _persist(self, op: Dict):
+        """Запоминает изменение и передает его хранилищу, если нет открытого блока batch()."""
+        self._pending.append(op)
+        self._keep_for_exit()
+        if self._batch_depth == 0:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Сохраняет накопленные изменения в соответствии с режимом persistence."""
+        if self.persistence == "immediate" or len(self._pending) >= self.flush_every:
+            self.flush()
+        elif self.persistence == "debounced" and self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @instrumented("flush")
+    def flush(self):
+        """
+        Передает хранилищу все накопленные изменения одной записью.
+
+        Под блокировкой записи только забираются накопленные операции и, если
+        хранилищу нужны все книги, их снимок; запись на диск выполняется под
+        _io_lock, поэтому чтение в это время не ждет. Если запись не удалась,
+        операции и записи выдач возвращаются в начало очереди и будут записаны
+        следующим flush, а исключение передается вызывающему.
+
+        События ленты публикуются после записи. Если процесс завершится между
+        ними, операции остаются в файле <ленты>.pending и публикуются при
+        следующем открытии библиотеки (ChangeFeed.recover).
+        """
+        with self._io_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.dirty:
+                return
+            with self._exclusive():
+                with self._rwlock.write():
+                    ops, self._pending = self._pending, []
+                    loan_records = self._loans.take_unsaved() if self._loans is not None else []
+                    books = self._snapshot() if self.storage.needs_books(len(ops)) else None
+                    self._committing = True
+                    _deferred.discard(self)
+                try:
+                    if ops:
+                        self.changes.prepare(ops)
+                        self.storage.commit(ops, lambda: books)
+                except BaseException:
+                    with self._rwlock.write():
+                        self._pending[:0] = ops
+                        if loan_records:
+                            self._loans.restore(loan_records)
+                        self._keep_for_exit()
+                    raise
+                finally:
+                    self._committing = False
+                if loan_records:
+                    try:
+                        self._loans.save(loan_records)
+                    except BaseException:
+                        self._loans.restore(loan_records)
+                        self._keep_for_exit()
+                        raise
+                self._bump_generation()
+                self.changes.publish(ops)
+
+    def _keep_for_exit(self):
+        """Оставляет библиотеку с отложенным сохранением в списке сохраняемых при выходе."""
+        if self.persistence != "immediate":
+            _deferred.add(self)
+
+    @contextmanager
+    def batch(self, flush: bool = True) -> Iterator["Library"]:
+        """
+        Откладывает сохранение изменений до выхода из блока.
+
+        Для shared=True весь блок выполняется под блокировкой файла данных,
+        а перед его началом подгружаются изменения других процессов.
+        Если flush=False, изменения остаются в очереди до явного вызова flush()
+        (например, чтобы записать их на диск в другом потоке). При отложенном
+        сохранении (persistence) изменения блока сохраняются по правилам режима.
+        Блокировка записи удерживается только внутри блока: изменения
+        сохраняются уже после ее освобождения.
+
+        Пример:
+            with library.batch():
+                library.add_book(...)
+                library.update_status(...)
+        """
+        with self._io_lock, self._exclusive():
+            self._batch_depth += 1
+            try:
+                with self._rwlock.write():
+                    yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and flush and self._pending:
+                    self._schedule_flush()
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """
+        Удерживает исключающую блокировку файла данных (для shared=True), допускает повторный вход.
+
+        Вызывается под _io_lock, поэтому блокировку файла удерживает не больше одного потока.
+        """
+        if self._lock is None or self._lock_owner is not None:
+            yield
+            return
+        with self._lock.acquire():
+            self._lock_owner = threading.get_ident()
+            try:
+                with self._rwlock.write():
+                    self._sync()
+                yield
+            finally:
+                self._lock_owner = None
 
+    def _bump_generation(self):
+        """Увеличивает номер поколения данных после записи и запоминает положение в хранилище (для shared=True)."""
+        if self._version is not None:
+            self._generation = self._version.bump()
+            self._signature = self._version.signature()
+            self._position = self.storage.position()
+
+    def refresh(self) -> bool:
+        """
+        Подгружает изменения, сделанные другими процессами (для shared=True).
+
+        Сначала сравнивается подпись файла поколения (os.stat), поэтому
+        если данные не менялись, файл библиотеки не читается.
+        Возвращает True, если данные были перечитаны.
+        """
+        if self._version is None or self._version.signature() == self._signature:
+            return False
+        if self._lock_owner == threading.get_ident():
+            with self._rwlock.write():
+                return self._sync()
+        with self._lock.acquire(shared=True), self._rwlock.write():
+            return self._sync()
+
+    def _sync(self) -> bool:
+        """
+        Сверяет номер поколения и применяет изменения из хранилища (под блокировкой).
+
+        Если хранилище возвращает только новые операции (хвост журнала, пока снимок
+        не перезаписан), применяются они; иначе хранилище читается целиком.
+        """
+        signature = self._version.signature()
+        if signature == self._signature:
+            return False
+        generation = self._version.read()
+        changed = generation != self._generation
+        if changed:
+            ops = self.storage.changes_since(self._position)
+            if ops is None:
+                self._merge(self._read_stored())
+            else:
+                for op in ops:
+                    self._apply_stored(op)
+            self._position = self.storage.position()
+            self._generation = generation
+        self._signature = signature
+        return changed
+
+    def _read_stored(self) -> Dict[int, Book]:
+        """Читает из хранилища все книги с учетом журнала."""
+        records = {book.id: book for book in self.storage.load()}
+        for op in self.storage.replay():
+            _apply_op(records, op)
+        return records
+
+    def _merge(self, records: Dict[int, Book]):
+        """Приводит книги в памяти к состоянию хранилища, изменяя только отличающиеся записи."""
+        for book_id in [book_id for book_id in self._by_id if book_id not in records]:
+            self._discard(book_id)
+        for book_id, book in records.items():
+            current = self._by_id.get(book_id)
+            if current is None:
+                self._insert(book)
+            elif (current.title, current.author, current.year) != (book.title, book.author, book.year):
+                self._discard(book_id)
+                self._insert(book)
+            elif current.status != book.status:
+                self._set_status(current, book.status)
+
+    @instrumented("get_book_by_id")
+    @_reading
     def get_book_by_id(self, book_id: int) -> Book:
         """Возвращает книгу по её ID."""
-        return next((book for book in self.books if book.id == book_id))
+        return self._by_id[book_id]
 
-    def add_book(self, title: str, author: str, year: int) -> Optional[str]:
+    @instrumented("add_book")
+    @_mutation
+    def add_book(self, title: str, author: str, year: int, status: str = "в наличии") -> Optional[str]:
         """Добавляет новую книгу в библиотеку, если данные корректны."""
-        validation_error = validate_book_data(title, author, year, self.books)
+        self._ensure_indexed()
+        validation_error = validate_book_data(title, author, year, self._keys) or validate_status(status)
         if validation_error:
             return validation_error
-        new_id = max((book.id for book in self.books), default=0) + 1
-        new_book = Book(new_id, title, author, year)
-        self.books.append(new_book)
-        self.save_books()
+        self._add_checked(title, author, year, status)
         return None
 
+    def _add_checked(self, title: str, author: str, year: int, status: str):
+        """Добавляет книгу с уже проверенными данными."""
+        new_book = Book(self._next_id, title, author, year, status)
+        self._insert(new_book)
+        self._persist({"op": "add", "book": new_book.to_dict()})
+
+    @instrumented("remove_book")
+    @_mutation
     def remove_book(self, book_id: int) -> Optional[str]:
         """Удаляет книгу из библиотеки по её ID. Возвращает ошибку, если удаление не удалось"""
-        validation_error = validate_book_id(book_id, self.books)
+        validation_error = validate_book_id(book_id, self._by_id)
         if validation_error:
             return validation_error
         else:
-            book = self.get_book_by_id(book_id)
-            self.books.remove(book)
-            self.save_books()
+            self._discard(book_id)
+            self._persist({"op": "remove", "id": book_id})
+            loans = self._active_loans()
+            if loans is not None:
+                loans.check_in(book_id, save=False)
             return None
 
-    def search_books(self, **criteria) -> List[Book]:
-        """Ищет книги, соответствующие заданным критериям."""
+    @instrumented("search_books")
+    @_reading
+    def search_books(self, mode: str = "exact", **criteria) -> List[Book]:
+        """
+        Ищет книги, соответствующие заданным критериям.
+
+        Режимы сравнения названия и автора (mode):
+            "exact" - значение поля совпадает целиком без учета регистра;
+            "token" - поле содержит каждое слово запроса;
+            "prefix" - в поле есть слова, начинающиеся с каждого слова запроса;
+            "substring" - в поле есть слова, содержащие каждое слово запроса;
+            "fuzzy" - в поле есть слова, похожие на каждое слово запроса с учетом
+                опечаток (без учета регистра, "ё" и "е" не различаются).
+        Остальные поля (год, статус) всегда сравниваются целиком.
+        В режиме "exact" книги возвращаются в порядке ID, в остальных - по убыванию релевантности.
+        Если хранилище умеет искать само (SQLite), точный поиск выполняется в нем.
+        Результаты запоминаются в кэше cache до изменения полей, по которым выполнялся поиск.
+        """
+        results, _ = self._search(mode, criteria)
+        if metrics.enabled:
+            metrics.observe("search_results", len(results), SIZE_BUCKETS, mode=mode)
+        return results
+
+    @_reading
+    def search_ranked(self, mode: str = "exact", **criteria) -> List[Tuple[float, Book]]:
+        """
+        Выполняет search_books и возвращает пары (релевантность, книга) в том же порядке.
+
+        В режиме "exact" релевантность всех книг равна 0.
+        """
+        results, scores = self._search(mode, criteria)
+        if mode == "exact" or scores is None:
+            return [(0.0, book) for book in results]
+        return [(scores[book.id], book) for book in results]
+
+    def _search(self, mode: str, criteria: Dict) -> Tuple[List[Book], Optional[Dict[int, float]]]:
+        """Ищет книги (см. search_books) и возвращает их вместе с релевантностью по ID."""
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Неизвестный режим поиска: {mode}")
         if not any(criteria.values()):
-            return []
+            return [], None
+        key = QueryCache.key(mode, criteria)
+        cached = self.cache.get(key)
+        if cached is None:
+            committing = self._committing
+            results, scores = self._find(mode, criteria)
+            cached = (results, None if mode == "exact" else scores)
+            if not committing:
+                self.cache.put(key, cached, len(results) + len(cached[1] or ()))
+        return list(cached[0]), cached[1]
+
+    def _find(self, mode: str, criteria: Dict) -> Tuple[List[Book], Optional[Dict[int, float]]]:
+        """Выполняет поиск без кэша (см. _search)."""
+        if mode == "exact" and not self._pending and not self._committing:
+            found_ids = self.storage.search({key: value for key, value in criteria.items() if value is not None})
+            if found_ids is not None:
+                return [self._by_id[book_id] for book_id in found_ids], None
+        self._ensure_indexed()
 
-        results = self.books
+        scores: Optional[Dict[int, float]] = None
+        exact_criteria = {}
         for key, value in criteria.items():
-            if value is not None:
-                results = [book for book in results if str(getattr(book, key)).lower() == str(value).lower()]
+            if value is None:
+                continue
+            field_scores = self._index.search(key, value, mode) if key in INDEXED_FIELDS else None
+            if field_scores is not None:
+                if scores is None:
+                    scores = field_scores
+                else:
+                    scores = {book_id: score + field_scores[book_id]
+                              for book_id, score in scores.items() if book_id in field_scores}
+                if mode != "exact":
+                    continue
+            exact_criteria[key] = str(value).lower()
 
-        return results
+        candidates = self._by_id.values() if scores is None else (self._by_id[book_id] for book_id in scores)
+        results = [book for book in candidates
+                   if all(str(getattr(book, key)).lower() == value for key, value in exact_criteria.items())]
+        if mode == "exact":
+            if scores is not None:
+                results.sort(key=lambda book: book.id)
+        elif scores is not None:
+            results.sort(key=lambda book: (-scores[book.id], book.id))
+        return results, scores
+
+    def _query_columns(self) -> Columns:
+        """Возвращает снимок книг по столбцам, построенный по текущему состоянию библиотеки."""
+        columns = self._columns
+        if columns is None:
+            with self._build_lock:
+                columns = self._columns
+                if columns is None:
+                    columns = self._columns = Columns(self._by_id.values(), keep_books=self.layout == "objects")
+        return columns
+
+    @instrumented("query")
+    @_reading
+    def query(self, where: Optional[Predicate] = None) -> List[Book]:
+        """
+        Ищет книги по условию из library.query (In, Eq, Range и их сочетания через &, | и ~).
+
+        Аргументы:
+            where (Predicate, optional): Условие отбора; без условия возвращаются все книги.
+
+        Возвращает книги в порядке ID.
+        """
+        columns = self._query_columns()
+        if columns.books is not None:
+            books = columns.select_books(where)
+        else:
+            books = list(map(self._by_id.__getitem__, columns.select(where)))
+        if metrics.enabled:
+            metrics.observe("search_results", len(books), SIZE_BUCKETS, mode="query")
+        return books
+
+    @instrumented("count_by")
+    @_reading
+    def count_by(self, aggregate: str, where: Optional[Predicate] = None) -> Dict:
+        """
+        Считает книги по группам: "status", "author", "year" или "decade".
+
+        Аргументы:
+            aggregate (str): Поле группировки ("decade" - год, округленный до десятилетия).
+            where (Predicate, optional): Условие отбора книг.
+        """
+        return self._query_columns().count_by(aggregate, where)
 
+    @instrumented("update_status")
+    @_mutation
     def update_status(self, book_id: int, new_status: str) -> Optional[str]:
         """Обновляет статус книги по её ID. Возвращает ошибку, если обновление не удалось"""
-        validation_error = validate_book_id(book_id, self.books)
+        validation_error = validate_book_id(book_id, self._by_id)
         if validation_error:
             return validation_error
         else:
-            book = self.get_book_by_id(book_id)
+            book = self._by_id[book_id]
             status_error = validate_status(new_status)
             if status_error:
                 return status_error
             else:
-                book.status = new_status
-                self.save_books()
+                self._set_status(book, new_status)
+                self._persist({"op": "status", "id": book_id, "status": new_status})
+                loans = self._active_loans() if new_status == "в наличии" else None
+                if loans is not None:
+                    loans.check_in(book_id, save=False)
                 return None
 
-    def display_books(self):
-        """Отображает все книги в библиотеке."""
-        if not self.books:
+    @instrumented("checkout")
+    @_mutation
+    def checkout(self, book_id: int, patron: str, due: Optional[date] = None) -> Optional[str]:
+        """
+        Выдает книгу читателю: статус книги становится "выдана", выдача записывается в журнал выдач.
+
+        Аргументы:
+            book_id (int): ID книги.
+            patron (str): Читатель.
+            due (date, optional): Срок возврата. По умолчанию - через LOAN_DAYS дней.
+
+        Возвращает ошибку, если выдача не удалась.
+        """
+        validation_error = validate_book_id(book_id, self._by_id)
+        if validation_error:
+            return validation_error
+        if not patron or not patron.strip():
+            return ERROR_MESSAGES["patron"]
+        if self._by_id[book_id].status == "выдана":
+            return ERROR_MESSAGES["on_loan"]
+        self._set_status(self._by_id[book_id], "выдана")
+        self._persist({"op": "status", "id": book_id, "status": "выдана"})
+        self.loans.checkout(book_id, patron.strip(), due, save=False)
+        return None
+
+    @instrumented("return_book")
+    @_mutation
+    def return_book(self, book_id: int) -> Optional[str]:
+        """Принимает книгу у читателя: статус становится "в наличии", выдача закрывается."""
+        validation_error = validate_book_id(book_id, self._by_id)
+        if validation_error:
+            return validation_error
+        if self._by_id[book_id].status != "выдана":
+            return ERROR_MESSAGES["not_on_loan"]
+        return self.update_status(book_id, "в наличии")
+
+    @_reading
+    def overdue(self, today: Optional[date] = None) -> List[Loan]:
+        """Возвращает просроченные на дату today (по умолчанию - сегодня) выдачи, начиная с самых давних."""
+        loans = self._active_loans()
+        return [] if loans is None else [loan for loan in loans.overdue(today) if self._on_loan(loan.book_id)]
+
+    @_reading
+    def loans_of(self, patron: str, history: bool = False) -> List[Loan]:
+        """
+        Возвращает выдачи читателя в порядке выдачи.
+
+        Аргументы:
+            patron (str): Читатель.
+            history (bool, optional): Включать уже возвращенные книги.
+        """
+        loans = self._active_loans()
+        if loans is None:
             return []
-        else:
-            for book in self.books:
-                return book.to_dict()
+        return [loan for loan in loans.of_patron(patron, history)
+                if loan.returned is not None or self._on_loan(loan.book_id)]
+
+    def _on_loan(self, book_id: int) -> bool:
+        """
+        Выдана ли книга. Выдача книги, которая в наличии или удалена, не учитывается:
+        так бывает, если процесс завершился после сохранения статуса, но до записи возврата.
+        """
+        book = self._by_id.get(book_id)
+        return book is not None and book.status == "выдана"
+
+    @instrumented("add_books")
+    def add_books(self, rows: Iterable[Mapping]) -> List[Tuple[int, str]]:
+        """
+        Добавляет книги из последовательности словарей с ключами title, author, year
+        и необязательным status. Все добавленные книги сохраняются одной записью.
+
+        Строки проверяются по ITER_CHUNK методом BookValidator.check_batch, поэтому
+        последовательность читается один раз и целиком в памяти не хранится.
+
+        Возвращает список пар (номер строки с 1, ошибка) для строк, которые не были добавлены.
+        """
+        errors = []
+        rows = iter(rows)
+        with self.batch():
+            self._ensure_indexed()
+            validator = BookValidator(self._keys)
+            start = 1
+            while True:
+                chunk = list(islice(rows, ITER_CHUNK))
+                if not chunk:
+                    break
+                failed = dict(validator.check_batch(chunk))
+                for number, row in enumerate(chunk, start=start):
+                    code = failed.get(number - start + 1)
+                    if code:
+                        errors.append((number, ERROR_MESSAGES[code]))
+                    else:
+                        self._add_checked(row["title"], row["author"], row["year"], row.get("status") or "в наличии")
+                start += len(chunk)
+        return errors
+
+    @instrumented("remove_books")
+    def remove_books(self, book_ids: Iterable[int]) -> List[Tuple[int, str]]:
+        """
+        Удаляет книги по ID с сохранением одной записью.
+
+        Возвращает список пар (ID, ошибка) для книг, которые не были удалены.
+        """
+        errors = []
+        with self.batch():
+            for book_id in book_ids:
+                error = self.remove_book(book_id)
+                if error:
+                    errors.append((book_id, error))
+        return errors
+
+    @instrumented("update_statuses")
+    def update_statuses(self, statuses: Mapping[int, str]) -> List[Tuple[int, str]]:
+        """
+        Обновляет статусы книг по словарю "ID -> новый статус" с сохранением одной записью.
+
+        Возвращает список пар (ID, ошибка) для книг, статус которых не был обновлен.
+        """
+        errors = []
+        with self.batch():
+            for book_id, new_status in statuses.items():
+                error = self.update_status(book_id, new_status)
+                if error:
+                    errors.append((book_id, error))
+        return errors
+
+    def iter_books(self, offset: int = 0, limit: Optional[int] = None, sort_by: Optional[str] = None,
+                   descending: bool = False) -> Iterator[Book]:
+        """
+        Последовательно возвращает книги библиотеки, не создавая полный список книг.
+
+        Запоминается только список ID страницы; книги читаются частями по
+        ITER_CHUNK под блокировкой чтения, которая не удерживается между
+        итерациями. Книги, удаленные другим потоком во время обхода, пропускаются.
+
+        Аргументы:
+            offset (int, optional): Количество пропускаемых книг.
+            limit (int, optional): Максимальное количество книг.
+            sort_by (str, optional): Поле сортировки ("id", "title", "author", "year");
+                по умолчанию - порядок добавления.
+            descending (bool, optional): Сортировка по убыванию (без sort_by - по убыванию ID).
+        """
+        page = self._page_ids(offset, limit, sort_by, descending)
+        for start in range(0, len(page), ITER_CHUNK):
+            yield from self._books_by_ids(page[start:start + ITER_CHUNK])
+
+    @_reading
+    def _page_ids(self, offset: int, limit: Optional[int], sort_by: Optional[str], descending: bool) -> List[int]:
+        """Возвращает ID книг страницы (см. iter_books)."""
+        if sort_by is None and descending:
+            sort_by = "id"
+        if sort_by is None:
+            return list(islice(self._by_id, offset, None if limit is None else offset + limit))
+        index = self._sorted.get(sort_by)
+        if index is None:
+            index = self._sorted[sort_by] = SortedIndex(sort_by, self._by_id.values())
+        return list(index.ids(offset, limit, descending))
+
+    @_reading
+    def _books_by_ids(self, ids: List[int]) -> List[Book]:
+        """Возвращает книги с указанными ID, пропуская отсутствующие."""
+        return [self._by_id[book_id] for book_id in ids if book_id in self._by_id]
+
+    @instrumented("display_books")
+    def display_books(self, offset: int = 0, limit: Optional[int] = None, sort_by: Optional[str] = None) -> List[Dict]:
+        """Возвращает страницу книг библиотеки в виде словарей (пустой список, если книг нет)."""
+        return [book.to_dict() for book in self.iter_books(offset, limit, sort_by)]
@@ -0,0 +1,239 @@
+"""
+Выдача книг читателям.
+
+Выдачи и возвраты дописываются строками JSON в файл <data_file>.loans,
+который создается при первой выдаче. В памяти поддерживаются:
+
+    - активные выдачи по ID книги;
+    - история выдач каждого читателя;
+    - отсортированный по сроку возврата список (срок, ID книги),
+
+поэтому просроченные книги и книги читателя находятся без просмотра
+всех выдач: за O(log N + k), где k - размер ответа. Индексы изменяются
+под блокировкой, поэтому выдачи можно читать и записывать из нескольких потоков.
+
+Запись в журнал можно отложить (save=False): выдача сразу видна в индексах,
+а в файл попадает при вызове save вместе с другими отложенными записями.
+"""
+import json
+import os
+import threading
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .journal import Journal
+
+
+LOAN_DAYS = 14
+
+
+class Loan:
+    """
+    Выдача книги читателю.
+
+    Атрибуты:
+        book_id (int): ID выданной книги.
+        patron (str): Читатель.
+        checked_out (date): Дата выдачи.
+        due (date): Срок возврата.
+        returned (date): Дата возврата или None, если книга еще у читателя.
+    """
+    __slots__ = ("book_id", "patron", "checked_out", "due", "returned")
+
+    def __init__(self, book_id: int, patron: str, checked_out: date, due: date, returned: Optional[date] = None):
+        self.book_id = book_id
+        self.patron = patron
+        self.checked_out = checked_out
+        self.due = due
+        self.returned = returned
+
+    def is_overdue(self, today: date) -> bool:
+        """Просрочен ли возврат на дату today."""
+        return self.returned is None and self.due < today
+
+    def to_dict(self) -> Dict:
+        """Преобразует выдачу в словарь (даты - строки ISO)."""
+        return {
+            "book_id": self.book_id,
+            "patron": self.patron,
+            "checked_out": self.checked_out.isoformat(),
+            "due": self.due.isoformat(),
+            "returned": self.returned.isoformat() if self.returned else None,
+        }
+
+
+class Loans:
+    """
+    Активные выдачи, история читателей и индекс сроков возврата.
+
+    Атрибуты:
+        path (str): Файл журнала выдач.
+    """
+
+    def __init__(self, path: str, fsync: str = "batch"):
+        """
+        Загружает выдачи из журнала, если он существует.
+
+        Аргументы:
+            path (str): Путь к журналу выдач.
+            fsync (str, optional): Режим fsync журнала ("always", "batch", "never").
+        """
+        self.path = path
+        self._journal = Journal(path, fsync=fsync)
+        self._active: Dict[int, Loan] = {}
+        self._by_patron: Dict[str, List[Loan]] = {}
+        self._due: List[Tuple[int, int]] = []
+        self._size = 0
+        self._unsaved: List[Dict] = []
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def refresh(self) -> bool:
+        """
+        Применяет записи, дописанные в журнал другими процессами.
+
+        Читается только новая часть файла. Возвращает True, если были новые записи.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            if size == self._size:
+                return False
+            with open(self.path, "rb") as file:
+                file.seek(self._size)
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    self._apply(json.loads(line))
+                    self._size += len(line)
+            return True
+
+    def _apply(self, record: Dict):
+        """Применяет запись журнала к индексам."""
+        if record["op"] == "checkout":
+            self._open(Loan(record["book_id"], record["patron"], date.fromisoformat(record["checked_out"]),
+                            date.fromisoformat(record["due"])))
+        elif record["op"] == "return":
+            self._close(record["book_id"], date.fromisoformat(record["returned"]))
+
+    def _open(self, loan: Loan):
+        if loan.book_id in self._active:
+            self._close(loan.book_id, loan.checked_out)
+        self._active[loan.book_id] = loan
+        self._by_patron.setdefault(loan.patron, []).append(loan)
+        insort(self._due, (loan.due.toordinal(), loan.book_id))
+
+    def _close(self, book_id: int, returned: date) -> Optional[Loan]:
+        loan = self._active.pop(book_id, None)
+        if loan is None:
+            return None
+        loan.returned = returned
+        entry = (loan.due.toordinal(), book_id)
+        position = bisect_left(self._due, entry)
+        if position < len(self._due) and self._due[position] == entry:
+            del self._due[position]
+        return loan
+
+    def _write(self, record: Dict, save: bool):
+        with self._lock:
+            self.refresh()
+            self._apply(record)
+            self._unsaved.append(record)
+            if save:
+                self.save(self.take_unsaved())
+
+    def take_unsaved(self) -> List[Dict]:
+        """Забирает записи, отложенные с save=False, для передачи в save."""
+        with self._lock:
+            records, self._unsaved = self._unsaved, []
+            return records
+
+    def restore(self, records: List[Dict]):
+        """Возвращает в начало отложенных записи, которые не удалось сохранить методом save."""
+        with self._lock:
+            self._unsaved[:0] = records
+
+    @property
+    def dirty(self) -> bool:
+        """Есть ли отложенные записи, еще не записанные в журнал."""
+        return bool(self._unsaved)
+
+    def save(self, records: List[Dict]):
+        """Дописывает записи в журнал и синхронизирует его на диск."""
+        if not records:
+            return
+        with self._lock:
+            for record in records:
+                self._journal.append(record)
+            self._journal.sync()
+            self._size = os.path.getsize(self.path)
+
+    def checkout(self, book_id: int, patron: str, due: Optional[date] = None, today: Optional[date] = None,
+                 save: bool = True) -> Loan:
+        """
+        Записывает выдачу книги читателю.
+
+        Аргументы:
+            book_id (int): ID книги.
+            patron (str): Читатель.
+            due (date, optional): Срок возврата. По умолчанию - через LOAN_DAYS дней.
+            today (date, optional): Дата выдачи. По умолчанию - сегодня.
+            save (bool, optional): Сразу записать выдачу в журнал; если False - запись
+                откладывается до save(take_unsaved()).
+        """
+        today = today or date.today()
+        due = due or today + timedelta(days=LOAN_DAYS)
+        with self._lock:
+            self._write({"op": "checkout", "book_id": book_id, "patron": patron,
+                         "checked_out": today.isoformat(), "due": due.isoformat()}, save)
+            return self._active[book_id]
+
+    def check_in(self, book_id: int, today: Optional[date] = None, save: bool = True) -> Optional[Loan]:
+        """
+        Записывает возврат книги и возвращает закрытую выдачу (None, если книга не была выдана).
+
+        Аргумент save - как в checkout.
+        """
+        with self._lock:
+            loan = self.get(book_id)
+            if loan is None:
+                return None
+            self._write({"op": "return", "book_id": book_id, "returned": (today or date.today()).isoformat()}, save)
+            return loan
+
+    def get(self, book_id: int) -> Optional[Loan]:
+        """Возвращает активную выдачу книги или None."""
+        with self._lock:
+            self.refresh()
+            return self._active.get(book_id)
+
+    def overdue(self, today: Optional[date] = None) -> Iterator[Loan]:
+        """Возвращает активные выдачи со сроком возврата раньше today, начиная с самых давних."""
+        with self._lock:
+            self.refresh()
+            stop = bisect_left(self._due, ((today or date.today()).toordinal(),))
+            loans = [self._active[book_id] for _, book_id in self._due[:stop]]
+        yield from loans
+
+    def of_patron(self, patron: str, history: bool = False) -> List[Loan]:
+        """
+        Возвращает выдачи читателя в порядке выдачи.
+
+        Аргументы:
+            patron (str): Читатель.
+            history (bool, optional): Включать уже возвращенные книги.
+        """
+        with self._lock:
+            self.refresh()
+            loans = self._by_patron.get(patron, [])
+            return list(loans) if history else [loan for loan in loans if loan.returned is None]
+
+    def close(self):
+        """Закрывает журнал выдач."""
+        self._journal.close()
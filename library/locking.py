@@ -0,0 +1,89 @@
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """Возвращает дешевую подпись файла (inode, размер, время изменения) или None, если файла нет."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class FileLock:
+    """
+    Рекомендательная блокировка файла между процессами.
+
+    Использует flock на POSIX-системах (с разделяемым режимом для чтения)
+    и msvcrt.locking в Windows (там обе блокировки исключающие).
+    """
+
+    def __init__(self, path: str):
+        """
+        Аргументы:
+            path (str): Путь к файлу блокировки (создается при необходимости).
+        """
+        self.path = path
+
+    @contextmanager
+    def acquire(self, shared: bool = False) -> Iterator[None]:
+        """Удерживает блокировку на время блока with."""
+        with open(self.path, "a+b") as file:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class VersionFile:
+    """
+    Номер поколения данных, общий для всех процессов.
+
+    Каждая запись в хранилище увеличивает номер. Файл заменяется атомарно,
+    поэтому изменение можно обнаружить по os.stat без чтения содержимого.
+    """
+
+    def __init__(self, path: str):
+        """
+        Аргументы:
+            path (str): Путь к файлу с номером поколения.
+        """
+        self.path = path
+
+    def signature(self) -> Optional[Tuple[int, int, int]]:
+        """Возвращает дешевую подпись файла (inode, размер, время изменения) или None."""
+        return file_signature(self.path)
+
+    def read(self) -> int:
+        """Возвращает текущий номер поколения (0, если файла нет)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return int(file.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def bump(self) -> int:
+        """Увеличивает номер поколения и возвращает новое значение."""
+        generation = self.read() + 1
+        tmp_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            file.write(f"{generation}\n")
+        os.replace(tmp_file, self.path)
+        return generation
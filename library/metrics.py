@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterator, Sequence, Tuple
+
+
+TIME_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+SIZE_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин, суммой и количеством наблюдений."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Добавляет наблюдение."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> Dict:
+        """Возвращает накопленные значения корзин (как в формате Prometheus)."""
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+class Metrics:
+    """
+    Реестр счетчиков и гистограмм.
+
+    По умолчанию сбор выключен: инструментированный код проверяет только
+    атрибут enabled и сразу выполняет исходную функцию. Значения
+    изменяются под блокировкой, поэтому метрики можно собирать из нескольких потоков.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._counters: Dict[Key, float] = {}
+        self._histograms: Dict[Key, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """Включает сбор метрик."""
+        self.enabled = True
+
+    def disable(self):
+        """Выключает сбор метрик."""
+        self.enabled = False
+
+    def reset(self):
+        """Удаляет накопленные значения."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def increment(self, name: str, value: float = 1, **labels: str):
+        """Увеличивает счетчик."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = TIME_BUCKETS, **labels: str):
+        """Добавляет наблюдение в гистограмму."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @staticmethod
+    def _format_key(key: Key) -> str:
+        name, labels = key
+        if not labels:
+            return name
+        return name + "{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}"
+
+    def snapshot(self) -> Dict:
+        """Возвращает текущие значения всех метрик в виде словаря."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+        return {
+            "counters": {self._format_key(key): value for key, value in counters},
+            "histograms": {self._format_key(key): histogram.to_dict() for key, histogram in histograms},
+        }
+
+    def to_json(self) -> str:
+        """Возвращает снимок метрик в формате JSON."""
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=4)
+
+    def to_prometheus(self, prefix: str = "library_") -> str:
+        """Возвращает метрики в текстовом формате Prometheus."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+        lines = []
+        for (name, labels), value in counters:
+            lines.append(f"{self._format_key((prefix + name, labels))} {value}")
+        for (name, labels), histogram in histograms:
+            data = histogram.to_dict()
+            for bound, count in data["buckets"].items():
+                lines.append(f"{self._format_key((prefix + name + '_bucket', labels + (('le', bound),)))} {count}")
+            lines.append(f"{self._format_key((prefix + name + '_sum', labels))} {data['sum']}")
+            lines.append(f"{self._format_key((prefix + name + '_count', labels))} {data['count']}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def instrumented(operation: str):
+    """
+    Декоратор: при включенном сборе метрик считает вызовы, ошибки и время выполнения функции.
+
+    Метрики: calls_total, errors_total и гистограмма duration_seconds с меткой operation.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except BaseException:
+                metrics.increment("errors_total", operation=operation)
+                raise
+            finally:
+                metrics.increment("calls_total", operation=operation)
+                metrics.observe("duration_seconds", time.perf_counter() - start, operation=operation)
+        return wrapper
+    return decorator
+
+
+def write_metrics(path: str):
+    """Сохраняет метрики в файл: в формате Prometheus для расширения .prom, иначе в JSON."""
+    text = metrics.to_prometheus() if path.endswith(".prom") else metrics.to_json()
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+@contextmanager
+def profile_session(directory: str, top: int = 30) -> Iterator[None]:
+    """
+    Профилирует блок with через cProfile и tracemalloc и записывает отчеты в каталог.
+
+    Создаются файлы profile.pstats (для pstats/snakeviz), profile.txt
+    (самые затратные функции) и memory.txt (места наибольшего выделения памяти).
+
+    Аргументы:
+        directory (str): Каталог для отчетов (создается при необходимости).
+        top (int, optional): Количество строк в текстовых отчетах.
+    """
+    os.makedirs(directory, exist_ok=True)
+    # Профилировщики нужны только здесь; импорт откладывается, чтобы не замедлять запуск.
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(os.path.join(directory, "profile.pstats"))
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(top)
+        with open(os.path.join(directory, "profile.txt"), "w", encoding="utf-8") as file:
+            file.write(report.getvalue())
+        with open(os.path.join(directory, "memory.txt"), "w", encoding="utf-8") as file:
+            file.write(f"Текущая память: {current} байт, пик: {peak} байт\n\n")
+            for statistic in snapshot.statistics("lineno")[:top]:
+                file.write(f"{statistic}\n")
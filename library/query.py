@@ -0,0 +1,533 @@
+"""
+Запросы к книгам с несколькими условиями и агрегаты.
+
+Условия строятся из In, Eq и Range и объединяются операторами
+& (И), | (ИЛИ) и ~ (НЕ):
+
+    (Eq("author", "Лев Толстой") | Eq("author", "Федор Достоевский")) & Range("year", 1860, 1880)
+
+Columns хранит книги по столбцам: каждое поле закодировано номерами
+различных значений. Условие превращается в маску строк - массив bool
+NumPy, если библиотека установлена, или строку байтов (1 - строка
+подходит). Маски пересекаются целиком, без обхода книг по одной.
+Условия внутри И выполняются начиная с самого избирательного.
+
+Библиотека изменяет столбцы на месте (add, remove, update), поэтому
+после изменения книги запрос не перестраивает снимок. Строки удаленных
+книг остаются в столбцах и исключаются маской живых строк.
+"""
+import threading
+from array import array
+from collections import Counter
+from itertools import compress, islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .book import Book
+from .search_index import normalize
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+QUERY_FIELDS = ("title", "author", "year", "status")
+AGGREGATES = ("status", "author", "year", "decade")
+# Маски значений полей, у которых не больше SMALL_GROUPS различных значений, кэшируются.
+SMALL_GROUPS = 64
+# Маска считается плотной, если подходит больше 1/DENSE строк.
+DENSE = 16
+
+
+def _key(field: str, value):
+    """Приводит значение поля к виду, в котором значения сравниваются."""
+    if field in ("title", "author"):
+        return normalize(value)
+    return value
+
+
+def _check_field(field: str):
+    if field not in QUERY_FIELDS:
+        raise ValueError(f"Неизвестное поле запроса: {field}")
+
+
+class Predicate:
+    """Условие запроса. Объединяется операторами &, | и ~."""
+
+    def __and__(self, other: "Predicate") -> "And":
+        return And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Or":
+        return Or(self, other)
+
+    def __invert__(self) -> "Not":
+        return Not(self)
+
+
+class In(Predicate):
+    """Значение поля входит в список (для названия и автора - без учета регистра)."""
+
+    def __init__(self, field: str, values: Iterable):
+        _check_field(field)
+        self.field = field
+        self.values = list(values)
+
+    def __repr__(self) -> str:
+        return f"In({self.field!r}, {self.values!r})"
+
+
+class Eq(In):
+    """Значение поля равно заданному."""
+
+    def __init__(self, field: str, value):
+        super().__init__(field, [value])
+
+    def __repr__(self) -> str:
+        return f"Eq({self.field!r}, {self.values[0]!r})"
+
+
+class Range(Predicate):
+    """Значение поля в диапазоне [low, high]; отсутствующая граница не ограничивает."""
+
+    def __init__(self, field: str, low=None, high=None):
+        _check_field(field)
+        self.field = field
+        self.low = low
+        self.high = high
+
+    def __repr__(self) -> str:
+        return f"Range({self.field!r}, {self.low!r}, {self.high!r})"
+
+
+class And(Predicate):
+    """Выполняются все условия."""
+
+    def __init__(self, *parts: Predicate):
+        self.parts = list(parts)
+
+    def __and__(self, other: Predicate) -> "And":
+        return And(*self.parts, other)
+
+    def __repr__(self) -> str:
+        return " & ".join(f"({part!r})" for part in self.parts)
+
+
+class Or(Predicate):
+    """Выполняется хотя бы одно условие."""
+
+    def __init__(self, *parts: Predicate):
+        self.parts = list(parts)
+
+    def __or__(self, other: Predicate) -> "Or":
+        return Or(*self.parts, other)
+
+    def __repr__(self) -> str:
+        return " | ".join(f"({part!r})" for part in self.parts)
+
+
+class Not(Predicate):
+    """Условие не выполняется."""
+
+    def __init__(self, part: Predicate):
+        self.part = part
+
+    def __repr__(self) -> str:
+        return f"~({self.part!r})"
+
+
+class _Column:
+    """
+    Поле, закодированное номерами различных значений.
+
+    Номера строк по кодам (rows) при изменении строки не удаляются из старого
+    списка, чтобы изменение не просматривало все строки со старым значением:
+    такие записи считаются в stale и отбрасываются при чтении (live_rows).
+    Когда их становится больше, чем строк, rows строятся заново при следующем запросе.
+    """
+
+    __slots__ = ("codes", "values", "lookup", "counts", "rows", "stale", "masks")
+
+    def __init__(self):
+        self.codes = array("I")
+        self.values: List = []
+        self.lookup: Dict = {}
+        self.counts: List[int] = []
+        self.rows: Optional[List[array]] = None
+        self.stale = 0
+        self.masks: Dict[int, bytearray] = {}
+
+    def code(self, field: str, value) -> int:
+        """Возвращает код значения, добавляя новое значение при необходимости."""
+        key = _key(field, value)
+        code = self.lookup.get(key)
+        if code is None:
+            code = self.lookup[key] = len(self.values)
+            self.values.append(value)
+            self.counts.append(0)
+            if self.rows is not None:
+                self.rows.append(array("I"))
+        return code
+
+    def append(self, field: str, value):
+        """Добавляет строку со значением value."""
+        code = self.code(field, value)
+        row = len(self.codes)
+        self.codes.append(code)
+        self.counts[code] += 1
+        if self.rows is not None:
+            self.rows[code].append(row)
+        for mask_code, mask in self.masks.items():
+            mask.append(mask_code == code)
+
+    def move(self, row: int, code: Optional[int]):
+        """Переносит строку к коду code; None - строка удалена (ее код больше не учитывается)."""
+        old = self.codes[row]
+        self.counts[old] -= 1
+        if self.rows is not None:
+            self.stale += 1
+            if self.stale > len(self.codes):
+                self.rows = None
+        if old in self.masks:
+            self.masks[old][row] = 0
+        if code is None:
+            return
+        self.codes[row] = code
+        self.counts[code] += 1
+        if self.rows is not None:
+            self.rows[code].append(row)
+        if code in self.masks:
+            self.masks[code][row] = 1
+
+    def code_rows(self, alive: bytearray) -> List[array]:
+        """
+        Возвращает номера живых строк для каждого кода (строится при первом обращении).
+
+        Список сохраняется в rows только полностью построенным.
+        """
+        if self.rows is None:
+            rows = [array("I") for _ in self.values]
+            for row, code in enumerate(self.codes):
+                if alive[row]:
+                    rows[code].append(row)
+            self.stale = 0
+            self.rows = rows
+        return self.rows
+
+    def live_rows(self, code: int, alive: bytearray) -> Iterable[int]:
+        """Номера живых строк с кодом code (после code_rows); строка может повторяться."""
+        rows = self.rows[code]
+        if not self.stale:
+            return rows
+        codes = self.codes
+        return [row for row in rows if codes[row] == code and alive[row]]
+
+
+class Columns:
+    """
+    Снимок книг по столбцам для выполнения запросов.
+
+    Атрибуты:
+        ids (array): ID книг по строкам (включая удаленные строки).
+        size (int): Количество строк, включая удаленные.
+        dead (int): Количество удаленных строк.
+        ordered (bool): ID возрастают по строкам, поэтому результат не нужно сортировать.
+        books (List[Book]): Книги по строкам, если keep_books=True, иначе None.
+        uses_numpy (bool): Маски строятся в NumPy (иначе - строки байтов).
+    """
+
+    def __init__(self, books: Iterable[Book], use_numpy: Optional[bool] = None, keep_books: bool = False):
+        """
+        Аргументы:
+            books (Iterable[Book]): Книги библиотеки.
+            use_numpy (bool, optional): Использовать NumPy; по умолчанию - если он установлен.
+            keep_books (bool, optional): Хранить ссылки на книги, чтобы select_books возвращал
+                их без поиска по ID (только для неизменяемых ссылок, не для представлений ColumnarBooks).
+        """
+        self.ids = array("q")
+        self.books: Optional[List[Book]] = [] if keep_books else None
+        self._columns = {field: _Column() for field in QUERY_FIELDS}
+        columns = [(field, self._columns[field]) for field in QUERY_FIELDS]
+        for book in books:
+            self.ids.append(book.id)
+            if keep_books:
+                self.books.append(book)
+            for field, column in columns:
+                column.append(field, getattr(book, field))
+        self.size = len(self.ids)
+        self.ordered = all(map(int.__lt__, self.ids, islice(self.ids, 1, None)))
+        self.dead = 0
+        self._alive = bytearray(b"\x01") * self.size
+        self._row_of: Optional[Dict[int, int]] = None
+        self.uses_numpy = numpy is not None if use_numpy is None else use_numpy
+        self._build_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Количество книг (без удаленных строк)."""
+        return self.size - self.dead
+
+    # Изменения
+
+    def _row(self, book_id: int) -> int:
+        """Номер строки книги; словарь "ID -> строка" строится при первом изменении."""
+        if self._row_of is None:
+            self._row_of = {book_id: row for row, book_id in enumerate(self.ids) if self._alive[row]}
+        return self._row_of[book_id]
+
+    def add(self, book: Book):
+        """Добавляет книгу в конец столбцов."""
+        if self._row_of is not None:
+            self._row_of[book.id] = self.size
+        if self.size and book.id <= self.ids[-1]:
+            self.ordered = False
+        self.ids.append(book.id)
+        if self.books is not None:
+            self.books.append(book)
+        for field, column in self._columns.items():
+            column.append(field, getattr(book, field))
+        self._alive.append(1)
+        self.size += 1
+
+    def remove(self, book_id: int):
+        """Отмечает строку книги удаленной."""
+        row = self._row(book_id)
+        del self._row_of[book_id]
+        for column in self._columns.values():
+            column.move(row, None)
+        self._alive[row] = 0
+        self.dead += 1
+        if self.books is not None:
+            self.books[row] = None
+
+    def update(self, book_id: int, field: str, value):
+        """Изменяет значение поля книги."""
+        column = self._columns[field]
+        column.move(self._row(book_id), column.code(field, value))
+
+    # Оценка и порядок выполнения
+
+    def _leaf_codes(self, predicate: Predicate) -> List[int]:
+        """Возвращает коды значений поля, удовлетворяющих простому условию."""
+        column = self._columns[predicate.field]
+        if isinstance(predicate, In):
+            codes = {column.lookup.get(_key(predicate.field, value)) for value in predicate.values}
+            codes.discard(None)
+            return sorted(codes)
+        return [code for code, value in enumerate(column.values)
+                if column.counts[code] and (predicate.low is None or value >= predicate.low)
+                and (predicate.high is None or value <= predicate.high)]
+
+    def estimate(self, predicate: Predicate) -> int:
+        """Оценивает количество подходящих книг (для простых условий - точно)."""
+        if isinstance(predicate, (In, Range)):
+            counts = self._columns[predicate.field].counts
+            return sum(counts[code] for code in self._leaf_codes(predicate))
+        if isinstance(predicate, And):
+            return min((self.estimate(part) for part in predicate.parts), default=len(self))
+        if isinstance(predicate, Or):
+            return min(len(self), sum(self.estimate(part) for part in predicate.parts))
+        if isinstance(predicate, Not):
+            part = predicate.part
+            if isinstance(part, (In, Range)):
+                return len(self) - self.estimate(part)
+            return len(self)
+        raise TypeError(f"Неизвестное условие: {predicate!r}")
+
+    def plan(self, predicate: Predicate) -> List[Tuple[Predicate, int]]:
+        """
+        Возвращает порядок выполнения условий И: от самого избирательного к наименее.
+
+        Для других условий план состоит из самого условия.
+        """
+        parts = predicate.parts if isinstance(predicate, And) else [predicate]
+        return sorted(((part, self.estimate(part)) for part in parts), key=lambda item: item[1])
+
+    # Маски
+
+    def mask(self, predicate: Optional[Predicate]):
+        """Возвращает маску строк, удовлетворяющих условию (None - все книги)."""
+        if predicate is None:
+            return self._full()
+        if isinstance(predicate, (In, Range)):
+            return self._leaf_mask(predicate.field, self._leaf_codes(predicate))
+        if isinstance(predicate, And):
+            result = None
+            for part, estimate in self.plan(predicate):
+                if estimate == 0:
+                    return self._empty()
+                part_mask = self.mask(part)
+                result = part_mask if result is None else self._and(result, part_mask)
+                if not self._any(result):
+                    return result
+            return self._full() if result is None else result
+        if isinstance(predicate, Or):
+            result = self._empty()
+            for part in predicate.parts:
+                result = self._or(result, self.mask(part))
+            return result
+        if isinstance(predicate, Not):
+            return self._not(self.mask(predicate.part))
+        raise TypeError(f"Неизвестное условие: {predicate!r}")
+
+    def _full(self):
+        """Маска всех книг (без удаленных строк)."""
+        if self.uses_numpy:
+            return numpy.frombuffer(self._alive, dtype=bool).copy()
+        return bytes(self._alive)
+
+    def _empty(self):
+        return numpy.zeros(self.size, dtype=bool) if self.uses_numpy else bytes(self.size)
+
+    def _any(self, mask) -> bool:
+        return bool(mask.any()) if self.uses_numpy else 1 in mask
+
+    def _and(self, left, right):
+        if self.uses_numpy:
+            return left & right
+        return (int.from_bytes(left, "little") & int.from_bytes(right, "little")).to_bytes(self.size, "little")
+
+    def _or(self, left, right):
+        if self.uses_numpy:
+            return left | right
+        return (int.from_bytes(left, "little") | int.from_bytes(right, "little")).to_bytes(self.size, "little")
+
+    def _not(self, mask):
+        """Дополнение маски до всех книг: в маске не бывает удаленных строк."""
+        if self.uses_numpy:
+            return ~mask & numpy.frombuffer(self._alive, dtype=bool)
+        return (int.from_bytes(self._alive, "little") ^ int.from_bytes(mask, "little")).to_bytes(self.size, "little")
+
+    def _leaf_mask(self, field: str, codes: Sequence[int]):
+        """Маска строк, в которых код поля входит в codes."""
+        column = self._columns[field]
+        if self.uses_numpy:
+            table = numpy.zeros(len(column.values), dtype=bool)
+            table[list(codes)] = True
+            mask = table[numpy.frombuffer(column.codes, dtype=f"u{column.codes.itemsize}")]
+            return mask & numpy.frombuffer(self._alive, dtype=bool) if self.dead else mask
+        if len(codes) == 1:
+            return self._code_mask(field, codes[0])
+        if field != "title" and len(column.values) <= SMALL_GROUPS:
+            mask = self._empty()
+            for code in codes:
+                mask = self._or(mask, self._code_mask(field, code))
+            return mask
+        mask = bytearray(self.size)
+        self._code_rows(column)
+        for code in codes:
+            for row in column.live_rows(code, self._alive):
+                mask[row] = 1
+        return mask
+
+    def _code_rows(self, column: _Column) -> List[array]:
+        """Номера строк по кодам поля; строятся под _build_lock, так как запросы выполняются параллельно."""
+        if column.rows is None:
+            with self._build_lock:
+                column.code_rows(self._alive)
+        return column.rows
+
+    def _code_mask(self, field: str, code: int) -> bytearray:
+        """
+        Маска строк с заданным кодом поля.
+
+        Для полей с небольшим количеством значений (статус) маска кэшируется
+        и далее изменяется на месте вместе со столбцом.
+        """
+        column = self._columns[field]
+        mask = column.masks.get(code)
+        if mask is not None:
+            return mask
+        mask = bytearray(self.size)
+        self._code_rows(column)
+        for row in column.live_rows(code, self._alive):
+            mask[row] = 1
+        if field != "title" and len(column.values) <= SMALL_GROUPS:
+            with self._build_lock:
+                mask = column.masks.setdefault(code, mask)
+        return mask
+
+    def _dense(self, mask) -> bool:
+        return mask.count(1) * DENSE > self.size
+
+    def _rows(self, mask) -> Iterable[int]:
+        """Номера строк, входящих в редкую маску."""
+        find = mask.find
+        row = find(1)
+        while row != -1:
+            yield row
+            row = find(1, row + 1)
+
+    # Результаты
+
+    def count(self, predicate: Optional[Predicate] = None) -> int:
+        """Возвращает количество книг, удовлетворяющих условию."""
+        mask = self.mask(predicate)
+        return int(numpy.count_nonzero(mask)) if self.uses_numpy else mask.count(1)
+
+    def select(self, predicate: Optional[Predicate] = None) -> List[int]:
+        """Возвращает ID книг, удовлетворяющих условию, в порядке возрастания."""
+        mask = self.mask(predicate)
+        if self.uses_numpy:
+            ids = numpy.frombuffer(self.ids, dtype=numpy.int64)[mask]
+            return (ids if self.ordered else numpy.sort(ids)).tolist()
+        if self._dense(mask):
+            ids = list(compress(self.ids, mask))
+        else:
+            ids = list(map(self.ids.__getitem__, self._rows(mask)))
+        if not self.ordered:
+            ids.sort()
+        return ids
+
+    def select_books(self, predicate: Optional[Predicate] = None) -> List[Book]:
+        """Возвращает книги, удовлетворяющие условию, в порядке ID (только для keep_books=True)."""
+        mask = self.mask(predicate)
+        if self.uses_numpy:
+            books = [self.books[row] for row in numpy.flatnonzero(mask).tolist()]
+        elif self._dense(mask):
+            books = list(compress(self.books, mask))
+        else:
+            books = list(map(self.books.__getitem__, self._rows(mask)))
+        if not self.ordered:
+            books.sort(key=lambda book: book.id)
+        return books
+
+    def count_by(self, aggregate: str, predicate: Optional[Predicate] = None) -> Dict:
+        """
+        Возвращает количество подходящих книг по группам.
+
+        Аргументы:
+            aggregate (str): "status", "author", "year" или "decade" (год, округленный до десятилетия).
+            predicate (Predicate, optional): Условие отбора книг.
+
+        Возвращает словарь "значение -> количество" без пустых групп, упорядоченный по значению.
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Неизвестная группировка: {aggregate}")
+        field = "year" if aggregate == "decade" else aggregate
+        column = self._columns[field]
+        counts = self._group_counts(field, predicate)
+
+        groups: Dict = Counter()
+        for code, count in enumerate(counts):
+            if count:
+                value = column.values[code]
+                groups[value // 10 * 10 if aggregate == "decade" else value] += count
+        return dict(sorted(groups.items(), key=lambda item: _key(field, item[0])))
+
+    def _group_counts(self, field: str, predicate: Optional[Predicate]) -> List[int]:
+        """Количество подходящих строк для каждого кода поля."""
+        column = self._columns[field]
+        if predicate is None:
+            return list(column.counts)
+        mask = self.mask(predicate)
+        if self.uses_numpy:
+            codes = numpy.frombuffer(column.codes, dtype=f"u{column.codes.itemsize}")
+            return numpy.bincount(codes[mask], minlength=len(column.values)).tolist()
+        counts = [0] * len(column.values)
+        if self._dense(mask):
+            for code, count in Counter(compress(column.codes, mask)).items():
+                counts[code] = count
+        else:
+            codes = column.codes
+            for row in self._rows(mask):
+                counts[codes[row]] += 1
+        return counts
@@ -0,0 +1,74 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class RWLock:
+    """
+    Блокировка "много читателей или один писатель" для потоков одного процесса.
+
+    Писатели имеют приоритет: пока писатель ждет, новые читатели не
+    допускаются, поэтому постоянный поток чтения не задерживает запись
+    бесконечно. Блокировка повторно входимая: поток-писатель может снова
+    взять блокировку записи или чтения, поток-читатель - снова взять
+    блокировку чтения (даже если ждет писатель). Получить блокировку
+    записи, удерживая только блокировку чтения, нельзя: это привело бы
+    к взаимной блокировке двух таких потоков.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._writers_waiting = 0
+
+    def held(self) -> bool:
+        """Удерживает ли текущий поток блокировку (чтения или записи)."""
+        thread = threading.get_ident()
+        return self._writer == thread or thread in self._readers
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Удерживает блокировку чтения на время блока with."""
+        thread = threading.get_ident()
+        if self._writer == thread:
+            yield
+            return
+        with self._condition:
+            if thread not in self._readers:
+                while self._writer is not None or self._writers_waiting:
+                    self._condition.wait()
+            self._readers[thread] = self._readers.get(thread, 0) + 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                count = self._readers.pop(thread) - 1
+                if count:
+                    self._readers[thread] = count
+                elif not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Удерживает исключающую блокировку записи на время блока with."""
+        thread = threading.get_ident()
+        if self._writer == thread:
+            yield
+            return
+        with self._condition:
+            if thread in self._readers:
+                raise RuntimeError("Нельзя получить блокировку записи, удерживая блокировку чтения.")
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = thread
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = None
+                self._condition.notify_all()
@@ -0,0 +1,174 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .book import Book
+from .fuzzy import bounded_distance, fold, max_typos, trigrams
+
+
+TOKEN_RE = re.compile(r"\w+")
+INDEXED_FIELDS = ("title", "author")
+MATCH_MODES = ("exact", "token", "prefix", "substring", "fuzzy")
+
+
+def normalize(text: str) -> str:
+    """Приводит текст к единому виду для поиска без учета регистра."""
+    return str(text).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на нормализованные слова."""
+    return TOKEN_RE.findall(normalize(text))
+
+
+def _add_trigrams(grams: Dict[str, Set[str]], token: str):
+    """Добавляет слово в индекс триграмм поля."""
+    for gram in trigrams(fold(token)):
+        grams.setdefault(gram, set()).add(token)
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс по словам названий и авторов книг.
+
+    Для каждого поля хранится словарь "слово -> множество ID книг" и
+    отсортированный массив слов, по которому двоичным поиском находятся
+    слова с заданным префиксом. Поиск подстроки просматривает только
+    словарь слов, а не все книги.
+
+    Для нечеткого поиска при первом обращении строится индекс триграмм
+    слов словаря ("триграмма -> множество слов"); кандидаты отбираются по
+    количеству общих триграмм и проверяются ограниченным расстоянием Левенштейна.
+    Индекс триграмм строится под _build_lock и публикуется целиком, поэтому
+    первые нечеткие запросы из нескольких потоков не видят его частично заполненным.
+    """
+
+    def __init__(self, books: Iterable[Book] = ()):
+        """
+        Строит индекс по переданным книгам.
+
+        Аргументы:
+            books (Iterable[Book], optional): Начальный набор книг.
+        """
+        self._postings: Dict[str, Dict[str, Set[int]]] = {field: {} for field in INDEXED_FIELDS}
+        self._vocabulary: Dict[str, List[str]] = {field: [] for field in INDEXED_FIELDS}
+        self._trigrams: Optional[Dict[str, Dict[str, Set[str]]]] = None
+        self._build_lock = threading.Lock()
+        for book in books:
+            self.add(book)
+
+    def add(self, book: Book):
+        """Добавляет книгу в индекс."""
+        for field in INDEXED_FIELDS:
+            postings = self._postings[field]
+            for token in set(tokenize(getattr(book, field))):
+                ids = postings.get(token)
+                if ids is None:
+                    ids = postings[token] = set()
+                    insort(self._vocabulary[field], token)
+                    if self._trigrams is not None:
+                        _add_trigrams(self._trigrams[field], token)
+                ids.add(book.id)
+
+    def remove(self, book: Book):
+        """Удаляет книгу из индекса."""
+        for field in INDEXED_FIELDS:
+            postings = self._postings[field]
+            for token in set(tokenize(getattr(book, field))):
+                ids = postings.get(token)
+                if ids is None:
+                    continue
+                ids.discard(book.id)
+                if not ids:
+                    del postings[token]
+                    vocabulary = self._vocabulary[field]
+                    del vocabulary[bisect_left(vocabulary, token)]
+                    if self._trigrams is not None:
+                        self._remove_trigrams(field, token)
+
+    def _remove_trigrams(self, field: str, token: str):
+        grams = self._trigrams[field]
+        for gram in trigrams(fold(token)):
+            tokens = grams.get(gram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del grams[gram]
+
+    def _fuzzy_tokens(self, field: str, query: str) -> Iterable[Tuple[str, float]]:
+        """Слова словаря, отличающиеся от слова запроса не более чем на max_typos опечаток."""
+        if self._trigrams is None:
+            with self._build_lock:
+                if self._trigrams is None:
+                    built = {name: {} for name in INDEXED_FIELDS}
+                    for name in INDEXED_FIELDS:
+                        for token in self._vocabulary[name]:
+                            _add_trigrams(built[name], token)
+                    self._trigrams = built
+        query = fold(query)
+        limit = max_typos(len(query))
+        query_grams = trigrams(query)
+        # Одна опечатка затрагивает не более трех триграмм.
+        required = max(1, len(query_grams) - 3 * limit)
+        shared: Dict[str, int] = {}
+        grams = self._trigrams[field]
+        for gram in query_grams:
+            for token in grams.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        for token, count in shared.items():
+            if count < required:
+                continue
+            folded = fold(token)
+            distance = bounded_distance(query, folded, limit)
+            if distance is not None:
+                yield token, 1.0 - distance / max(len(query), len(folded))
+
+    def _matching_tokens(self, field: str, query: str, mode: str) -> Iterable[Tuple[str, float]]:
+        """Возвращает слова индекса, подходящие под слово запроса, вместе с весом совпадения."""
+        if mode in ("exact", "token"):
+            if query in self._postings[field]:
+                yield query, 1.0
+            return
+        if mode == "fuzzy":
+            yield from self._fuzzy_tokens(field, query)
+            return
+        vocabulary = self._vocabulary[field]
+        if mode == "prefix":
+            position = bisect_left(vocabulary, query)
+            while position < len(vocabulary) and vocabulary[position].startswith(query):
+                token = vocabulary[position]
+                yield token, len(query) / len(token)
+                position += 1
+        elif mode == "substring":
+            for token in vocabulary:
+                if query in token:
+                    weight = len(query) / len(token)
+                    yield token, weight if token.startswith(query) else weight / 2
+
+    def search(self, field: str, value: str, mode: str) -> Optional[Dict[int, float]]:
+        """
+        Ищет книги, в поле которых есть совпадение с каждым словом запроса.
+
+        Возвращает словарь "ID книги -> релевантность". Пустой словарь
+        означает отсутствие совпадений, None - что в запросе нет слов.
+        """
+        scores: Dict[int, float] = {}
+        query_tokens = tokenize(value)
+        if not query_tokens:
+            return None
+        postings = self._postings[field]
+        for number, query in enumerate(query_tokens):
+            token_scores: Dict[int, float] = {}
+            for token, weight in self._matching_tokens(field, query, mode):
+                for book_id in postings[token]:
+                    if token_scores.get(book_id, 0.0) < weight:
+                        token_scores[book_id] = weight
+            if number == 0:
+                scores = token_scores
+            else:
+                scores = {book_id: score + token_scores[book_id]
+                          for book_id, score in scores.items() if book_id in token_scores}
+            if not scores:
+                break
+        return scores
@@ -0,0 +1,204 @@
+"""
+Асинхронный сервер, обслуживающий одну библиотеку по локальному сокету.
+
+Протокол - JSON Lines: клиент отправляет по одному запросу в строке,
+сервер отвечает одной строкой {"ok": true, "result": ...} или
+{"ok": false, "error": "..."} в том же порядке.
+
+Запросы:
+    {"op": "add", "title": ..., "author": ..., "year": ...}
+    {"op": "remove", "id": ...}
+    {"op": "status", "id": ..., "status": ...}
+    {"op": "get", "id": ...}
+    {"op": "search", "mode": "exact", "criteria": {"author": ...}, "limit": 20}
+    {"op": "list", "offset": 0, "limit": 20, "sort_by": "title"}
+    {"op": "changes", "since": 0, "limit": 100}  (если у библиотеки есть файл ленты изменений)
+
+Чтение выполняется сразу из памяти. Изменения передаются единственной
+задаче-писателю, которая применяет все накопившиеся запросы и сохраняет
+их одной записью в отдельном потоке, после чего отвечает клиентам.
+
+Запуск: python -m library.server --data-file library.json --port 8765
+"""
+import argparse
+import asyncio
+import json
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from .library import Library
+
+
+STREAM_LIMIT = 1 << 24
+WRITE_OPS = ("add", "remove", "status")
+READ_OPS = ("get", "search", "list", "changes")
+_TYPE_NAMES = {str: "строкой", int: "целым числом"}
+
+
+def _field(request: Dict, name: str, kind: type):
+    """Возвращает поле запроса, проверив его тип (TypeError, если тип другой)."""
+    value = request.get(name)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise TypeError(f"поле {name} должно быть {_TYPE_NAMES[kind]}")
+    return value
+
+
+class LibraryServer:
+    """
+    Сервер библиотеки на asyncio.
+
+    Атрибуты:
+        library (Library): Обслуживаемая библиотека.
+        max_batch (int): Максимальное количество изменений в одной записи на диск.
+    """
+
+    def __init__(self, library: Library, max_batch: int = 1000):
+        """
+        Аргументы:
+            library (Library): Библиотека, которая целиком находится в памяти сервера.
+            max_batch (int, optional): Максимальное количество изменений в одной записи на диск.
+        """
+        self.library = library
+        self.max_batch = max_batch
+        self._writes: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, unix_path: Optional[str] = None):
+        """Запускает прием соединений по TCP или Unix-сокету."""
+        self._writes = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+        if unix_path:
+            self._server = await asyncio.start_unix_server(self._handle_client, path=unix_path, limit=STREAM_LIMIT)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, host, port, limit=STREAM_LIMIT)
+
+    @property
+    def address(self):
+        """Адрес, на котором сервер принимает соединения."""
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        """Обслуживает клиентов до отмены задачи."""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """Останавливает сервер и дожидается сохранения принятых изменений."""
+        self._server.close()
+        await self._server.wait_closed()
+        await self._writes.join()
+        self._writer_task.cancel()
+        self.library.close()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Читает запросы клиента и отправляет ответы."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.dispatch(line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, line: bytes) -> Dict:
+        """Выполняет один запрос и возвращает ответ."""
+        try:
+            request = json.loads(line)
+            op = request["op"]
+        except (ValueError, KeyError, TypeError):
+            return {"ok": False, "error": "Некорректный запрос."}
+        if op in READ_OPS:
+            try:
+                return {"ok": True, "result": self._read(request)}
+            except (TypeError, ValueError, AttributeError) as error:
+                return {"ok": False, "error": f"Некорректный запрос: {error}"}
+        if op in WRITE_OPS:
+            future = asyncio.get_running_loop().create_future()
+            await self._writes.put((request, future))
+            return await future
+        return {"ok": False, "error": f"Неизвестная операция: {op}"}
+
+    def _read(self, request: Dict):
+        """Выполняет запрос на чтение из памяти."""
+        op = request["op"]
+        if op == "get":
+            try:
+                return self.library.get_book_by_id(request["id"]).to_dict()
+            except KeyError:
+                return None
+        if op == "changes":
+            return list(islice(self.library.changes.read(request.get("since", 0)), request.get("limit")))
+        if op == "search":
+            books = self.library.search_books(mode=request.get("mode", "exact"), **request.get("criteria", {}))
+            return [book.to_dict() for book in books[:request.get("limit")]]
+        return self.library.display_books(request.get("offset", 0), request.get("limit"), request.get("sort_by"))
+
+    def _apply(self, request: Dict) -> Optional[str]:
+        """Применяет изменение к библиотеке в памяти и возвращает ошибку, если она есть."""
+        op = request["op"]
+        if op == "add":
+            return self.library.add_book(_field(request, "title", str), _field(request, "author", str),
+                                         _field(request, "year", int))
+        if op == "remove":
+            return self.library.remove_book(_field(request, "id", int))
+        return self.library.update_status(_field(request, "id", int), _field(request, "status", str))
+
+    async def _writer(self):
+        """
+        Единственная задача, изменяющая библиотеку: применяет изменения пакетами и сохраняет их.
+
+        Ошибка в запросе или при сохранении возвращается клиентам и не останавливает задачу.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[Dict, asyncio.Future]] = [await self._writes.get()]
+            while len(batch) < self.max_batch and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+
+            responses = []
+            try:
+                with self.library.batch(flush=False):
+                    for request, _ in batch:
+                        try:
+                            error = self._apply(request)
+                        except Exception as invalid:
+                            error = f"Некорректный запрос: {invalid}"
+                        responses.append({"ok": False, "error": error} if error else {"ok": True, "result": None})
+                await loop.run_in_executor(None, self.library.flush)
+            except Exception as error:
+                responses = [{"ok": False, "error": f"Ошибка сохранения: {error}"}] * len(batch)
+
+            for (_, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+                self._writes.task_done()
+
+
+async def _main(args: argparse.Namespace):
+    server = LibraryServer(Library(args.data_file, storage_mode=args.storage_mode, change_feed=args.change_feed))
+    await server.start(args.host, args.port, args.unix)
+    print(f"Сервер библиотеки слушает {args.unix or server.address}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сервер библиотеки (JSON Lines по TCP или Unix-сокету).")
+    parser.add_argument("--data-file", default="library.json")
+    parser.add_argument("--storage-mode", default="json", choices=["json", "journal", "sqlite", "binary"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Путь к Unix-сокету вместо TCP.")
+    parser.add_argument("--change-feed", help="Файл ленты изменений (запрос \"changes\").")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,193 @@
+"""
+Каталог, разделенный на несколько библиотек (шардов).
+
+Каждый шард - обычная Library со своим файлом (например, отдельный филиал).
+Глобальный ID книги однозначно задает шард и ID книги внутри него:
+
+    глобальный ID = (локальный ID - 1) * количество шардов + номер шарда + 1
+
+Поэтому ID уникальны без общего счетчика, а изменение по ID
+направляется в нужный шард без загрузки остальных. Существующие файлы
+филиалов с пересекающимися локальными ID используются без изменений.
+Количество шардов и их порядок после заполнения менять нельзя.
+"""
+import heapq
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .book import Book
+from .library import Library
+from .sorted_index import SORT_KEYS
+
+
+_worker_libraries: Dict[str, Library] = {}
+
+
+def _in_worker(function: Callable, data_file: str, options: Dict, *args):
+    """Выполняет function(библиотека, *args) в процессе пула; шард загружается один раз на процесс."""
+    library = _worker_libraries.get(data_file)
+    if library is None:
+        library = _worker_libraries[data_file] = Library(data_file, shared=True, **options)
+    return function(library, *args)
+
+
+def _search(library: Library, mode: str, criteria: Dict) -> List[Tuple[float, Dict]]:
+    return [(score, book.to_dict()) for score, book in library.search_ranked(mode, **criteria)]
+
+
+def _first_books(library: Library, count: Optional[int], sort_by: str, descending: bool) -> List[Dict]:
+    return [book.to_dict() for book in library.iter_books(0, count, sort_by, descending)]
+
+
+class ShardedLibrary:
+    """
+    Фасад над несколькими библиотеками-шардами.
+
+    Атрибуты:
+        names (List[str]): Имена шардов (филиалов) в порядке номеров.
+        files (List[str]): Файлы шардов.
+        parallel (bool): Поиск и просмотр выполняются в процессах (по одному на шард).
+    """
+
+    def __init__(self, shards: Union[Mapping[str, str], Sequence[str]], parallel: bool = False, **options):
+        """
+        Аргументы:
+            shards (Mapping[str, str] | Sequence[str]): Словарь "имя филиала -> файл" или
+                список файлов (тогда имена - номера шардов).
+            parallel (bool, optional): Выполнять поиск и просмотр в пуле процессов. Шарды
+                при этом открываются с shared=True, чтобы процессы видели изменения друг друга.
+            options: Дополнительные аргументы Library (storage_mode, layout, lazy, ...).
+
+        Шарды загружаются при первом обращении.
+        """
+        if isinstance(shards, Mapping):
+            self.names = list(shards)
+            self.files = list(shards.values())
+        else:
+            self.files = list(shards)
+            self.names = [str(number) for number in range(len(self.files))]
+        if not self.files:
+            raise ValueError("Нужен хотя бы один шард.")
+        self.parallel = parallel
+        self.options = options
+        if parallel:
+            options["shared"] = True
+        self._shards: List[Optional[Library]] = [None] * len(self.files)
+        self._executors: Optional[List[ProcessPoolExecutor]] = None
+
+    def shard(self, shard: Union[int, str]) -> Library:
+        """Возвращает библиотеку шарда по номеру или имени, загружая её при первом обращении."""
+        number = self.names.index(shard) if isinstance(shard, str) else shard
+        library = self._shards[number]
+        if library is None:
+            library = self._shards[number] = Library(self.files[number], **self.options)
+        return library
+
+    def global_id(self, shard: int, local_id: int) -> int:
+        """Преобразует ID книги в шарде в глобальный ID."""
+        return (local_id - 1) * len(self.files) + shard + 1
+
+    def locate(self, book_id: int) -> Tuple[int, int]:
+        """Возвращает (номер шарда, ID книги в шарде) для глобального ID."""
+        local, shard = divmod(book_id - 1, len(self.files))
+        return shard, local + 1
+
+    def _global_book(self, shard: int, book: Union[Book, Dict]) -> Book:
+        """Копия книги шарда с глобальным ID."""
+        data = book if isinstance(book, dict) else book.to_dict()
+        return Book(self.global_id(shard, data["id"]), data["title"], data["author"], data["year"], data["status"])
+
+    def _route(self, title: str, author: str, branch: Optional[str]) -> int:
+        """Номер шарда для новой книги: по имени филиала или по хешу названия и автора."""
+        if branch is not None:
+            if branch not in self.names:
+                raise ValueError(f"Неизвестный филиал: {branch}")
+            return self.names.index(branch)
+        key = f"{title.casefold()}\0{author.casefold()}".encode("utf-8")
+        return zlib.crc32(key) % len(self.files)
+
+    def add_book(self, title: str, author: str, year: int, status: str = "в наличии",
+                 branch: Optional[str] = None) -> Optional[str]:
+        """
+        Добавляет книгу в шард филиала branch или, если филиал не указан, в шард,
+        выбранный по хешу названия и автора (тогда дубликаты попадают в один шард).
+        """
+        return self.shard(self._route(title, author, branch)).add_book(title, author, year, status)
+
+    def _target(self, book_id: int) -> Tuple[int, int]:
+        """Шард и локальный ID; некорректный ID передается первому шарду как есть для проверки."""
+        if isinstance(book_id, int) and book_id >= 1:
+            return self.locate(book_id)
+        return 0, book_id
+
+    def get_book_by_id(self, book_id: int) -> Book:
+        """Возвращает копию книги с глобальным ID (KeyError, если книги нет)."""
+        shard, local_id = self._target(book_id)
+        return self._global_book(shard, self.shard(shard).get_book_by_id(local_id))
+
+    def remove_book(self, book_id: int) -> Optional[str]:
+        """Удаляет книгу по глобальному ID."""
+        shard, local_id = self._target(book_id)
+        return self.shard(shard).remove_book(local_id)
+
+    def update_status(self, book_id: int, new_status: str) -> Optional[str]:
+        """Обновляет статус книги по глобальному ID."""
+        shard, local_id = self._target(book_id)
+        return self.shard(shard).update_status(local_id, new_status)
+
+    def _fan_out(self, function: Callable, *args) -> List:
+        """Выполняет function(библиотека, *args) для каждого шарда и возвращает результаты по номерам шардов."""
+        if not self.parallel:
+            return [function(self.shard(shard), *args) for shard in range(len(self.files))]
+        if self._executors is None:
+            self._executors = [ProcessPoolExecutor(max_workers=1) for _ in self.files]
+        options = {key: value for key, value in self.options.items() if key != "shared"}
+        futures = [executor.submit(_in_worker, function, data_file, options, *args)
+                   for executor, data_file in zip(self._executors, self.files)]
+        return [future.result() for future in futures]
+
+    def search_books(self, mode: str = "exact", **criteria) -> List[Book]:
+        """
+        Ищет книги во всех шардах (см. Library.search_books) и объединяет результаты.
+
+        В режиме "exact" книги упорядочены по глобальному ID, в остальных - по убыванию релевантности.
+        """
+        per_shard = self._fan_out(_search, mode, criteria)
+        ranked = [[(-score, self._global_book(shard, book)) for score, book in results]
+                  for shard, results in enumerate(per_shard)]
+        merged = heapq.merge(*ranked, key=lambda item: (item[0], item[1].id))
+        return [book for _, book in merged]
+
+    def iter_books(self, offset: int = 0, limit: Optional[int] = None, sort_by: Optional[str] = None,
+                   descending: bool = False) -> Iterator[Book]:
+        """
+        Возвращает страницу книг всех шардов, упорядоченных по полю sort_by (по умолчанию - по глобальному ID).
+
+        Из каждого шарда берутся только первые offset + limit книг.
+        """
+        sort_by = sort_by or "id"
+        count = None if limit is None else offset + limit
+        per_shard = self._fan_out(_first_books, count, sort_by, descending)
+        key = SORT_KEYS[sort_by]
+        books = [[self._global_book(shard, book) for book in results] for shard, results in enumerate(per_shard)]
+        merged = heapq.merge(*books, key=lambda book: (key(book), book.id), reverse=descending)
+        for number, book in enumerate(merged):
+            if count is not None and number >= count:
+                return
+            if number >= offset:
+                yield book
+
+    def display_books(self, offset: int = 0, limit: Optional[int] = None, sort_by: Optional[str] = None) -> List[Dict]:
+        """Возвращает страницу книг всех шардов в виде словарей."""
+        return [book.to_dict() for book in self.iter_books(offset, limit, sort_by)]
+
+    def close(self):
+        """Закрывает загруженные шарды и останавливает процессы."""
+        for library in self._shards:
+            if library is not None:
+                library.close()
+        if self._executors is not None:
+            for executor in self._executors:
+                executor.shutdown()
+            self._executors = None
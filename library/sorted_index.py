@@ -0,0 +1,57 @@
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from .book import Book
+
+
+SORT_KEYS: Dict[str, Callable[[Book], Any]] = {
+    "id": lambda book: book.id,
+    "title": lambda book: book.title.casefold(),
+    "author": lambda book: book.author.casefold(),
+    "year": lambda book: book.year,
+}
+
+
+class SortedIndex:
+    """
+    Отсортированный по полю книги список пар (ключ, ID).
+
+    Поддерживается при добавлении и удалении книг, поэтому страница
+    отсортированного списка выдается без повторной сортировки каталога.
+    """
+
+    def __init__(self, field: str, books: Iterable[Book] = ()):
+        """
+        Строит индекс по полю.
+
+        Аргументы:
+            field (str): Поле сортировки: "id", "title", "author" или "year".
+            books (Iterable[Book], optional): Начальный набор книг.
+        """
+        if field not in SORT_KEYS:
+            raise ValueError(f"Сортировка по полю {field} не поддерживается.")
+        self.field = field
+        self._key = SORT_KEYS[field]
+        self._entries: List[Tuple[Any, int]] = sorted((self._key(book), book.id) for book in books)
+
+    def add(self, book: Book):
+        """Добавляет книгу в индекс."""
+        insort(self._entries, (self._key(book), book.id))
+
+    def remove(self, book: Book):
+        """Удаляет книгу из индекса."""
+        entry = (self._key(book), book.id)
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def ids(self, offset: int = 0, limit: int = None, descending: bool = False) -> Iterator[int]:
+        """Возвращает ID книг страницы в порядке сортировки."""
+        count = len(self._entries)
+        stop = count if limit is None else min(count, offset + limit)
+        if descending:
+            for position in range(count - 1 - offset, count - 1 - stop, -1):
+                yield self._entries[position][1]
+        else:
+            for position in range(offset, stop):
+                yield self._entries[position][1]
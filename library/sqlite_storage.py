@@ -0,0 +1,126 @@
+import sqlite3
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .book import Book
+from .storage import Storage
+from .streaming import iter_books
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    title_lower TEXT NOT NULL,
+    author_lower TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS books_title ON books (title_lower);
+CREATE INDEX IF NOT EXISTS books_author ON books (author_lower);
+CREATE INDEX IF NOT EXISTS books_year ON books (year);
+CREATE INDEX IF NOT EXISTS books_status ON books (status);
+"""
+
+INSERT_SQL = ("INSERT OR REPLACE INTO books (id, title, author, year, status, title_lower, author_lower) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?)")
+DELETE_SQL = "DELETE FROM books WHERE id = ?"
+STATUS_SQL = "UPDATE books SET status = ? WHERE id = ?"
+SEARCH_COLUMNS = {"id": "id", "title": "title_lower", "author": "author_lower", "year": "year", "status": "status"}
+
+
+def _row(book: Book) -> tuple:
+    """Преобразует книгу в строку таблицы books."""
+    return book.id, book.title, book.author, book.year, book.status, book.title.lower(), book.author.lower()
+
+
+class SqliteStorage(Storage):
+    """
+    Хранение книг в базе SQLite (режим WAL).
+
+    Каждый вызов commit выполняется одной транзакцией, поэтому изменение
+    одной книги записывает одну строку, а не весь каталог. Запросы
+    параметризованы и кэшируются модулем sqlite3 как подготовленные.
+    """
+
+    def __init__(self, db_file: str):
+        """
+        Открывает (или создает) базу данных.
+
+        Аргументы:
+            db_file (str): Путь к файлу базы SQLite.
+        """
+        self.db_file = db_file
+        self._connection = sqlite3.connect(db_file, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def load(self) -> Iterator[Book]:
+        cursor = self._connection.execute("SELECT id, title, author, year, status FROM books ORDER BY id")
+        for row in cursor:
+            yield Book(*row)
+
+    def needs_books(self, count: int) -> bool:
+        return False
+
+    def commit(self, ops: List[Dict], books: Callable[[], Iterable[Book]]):
+        with self._connection:
+            for op in ops:
+                if op["op"] == "add":
+                    self._connection.execute(INSERT_SQL, _row(Book.from_dict(op["book"])))
+                elif op["op"] == "remove":
+                    self._connection.execute(DELETE_SQL, (op["id"],))
+                elif op["op"] == "status":
+                    self._connection.execute(STATUS_SQL, (op["status"], op["id"]))
+
+    def save(self, books: Iterable[Book]):
+        with self._connection:
+            self._connection.execute("DELETE FROM books")
+            self._connection.executemany(INSERT_SQL, (_row(book) for book in books))
+
+    def compact(self, books: Iterable[Book]):
+        self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def search(self, criteria: Dict[str, str]) -> Optional[List[int]]:
+        """Выполняет поиск на стороне SQLite по индексированным столбцам."""
+        conditions = []
+        params = []
+        for key, value in criteria.items():
+            if key not in SEARCH_COLUMNS:
+                return None
+            value = str(value).lower()
+            if key in ("id", "year"):
+                if not value.isdigit() or str(int(value)) != value:
+                    return []
+                value = int(value)
+            conditions.append(f"{SEARCH_COLUMNS[key]} = ?")
+            params.append(value)
+        sql = "SELECT id FROM books WHERE " + " AND ".join(conditions) + " ORDER BY id"
+        return [row[0] for row in self._connection.execute(sql, params)]
+
+    def close(self):
+        self._connection.close()
+
+
+def migrate_json_to_sqlite(json_file: str, db_file: str) -> int:
+    """
+    Переносит книги из JSON-файла библиотеки в базу SQLite одной транзакцией.
+
+    Возвращает количество перенесенных книг.
+    """
+    storage = SqliteStorage(db_file)
+    try:
+        with storage._connection:
+            cursor = storage._connection.executemany(INSERT_SQL, (_row(book) for book in iter_books(json_file)))
+        return cursor.rowcount
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Использование: python -m library.sqlite_storage <library.json> <library.db>")
+        sys.exit(1)
+    print(f"Перенесено книг: {migrate_json_to_sqlite(sys.argv[1], sys.argv[2])}")
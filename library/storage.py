@@ -0,0 +1,176 @@
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, MutableMapping, Optional, Tuple
+
+from .book import Book
+from .journal import Journal
+from .locking import file_signature
+from .metrics import metrics
+from .streaming import LazyBooks, iter_books
+
+
+class Storage:
+    """
+    Интерфейс хранилища книг библиотеки.
+
+    Изменения передаются хранилищу в виде операций - словарей вида
+    {"op": "add", "book": {...}}, {"op": "remove", "id": ...} и
+    {"op": "status", "id": ..., "status": ...}.
+    """
+
+    def load(self) -> Iterator[Book]:
+        """Последовательно возвращает сохраненные книги."""
+        raise NotImplementedError
+
+    def open_lazy(self) -> MutableMapping[int, Book]:
+        """Возвращает словарь "ID -> книга" (LazyBooks), читающий книги по мере обращения."""
+        raise ValueError(f"{type(self).__name__} не поддерживает ленивую загрузку.")
+
+    def replay(self) -> Iterator[Dict]:
+        """Возвращает операции, которые нужно применить к загруженным книгам."""
+        return iter(())
+
+    def position(self) -> Optional[Tuple]:
+        """
+        Возвращает положение конца записанных данных для changes_since
+        или None, если хранилище не умеет возвращать только новые операции.
+        """
+        return None
+
+    def changes_since(self, position: Optional[Tuple]) -> Optional[List[Dict]]:
+        """
+        Возвращает операции, записанные после положения position (см. position),
+        или None, если их нельзя получить без чтения всех книг.
+        """
+        return None
+
+    def commit(self, ops: List[Dict], books: Callable[[], Iterable[Book]]):
+        """
+        Сохраняет операции.
+
+        Аргументы:
+            ops (List[Dict]): Операции в порядке выполнения.
+            books (Callable[[], Iterable[Book]]): Возвращает все книги библиотеки
+                (для хранилищ, которые перезаписывают данные целиком); вызывается,
+                только если needs_books(len(ops)) вернул True.
+        """
+        raise NotImplementedError
+
+    def needs_books(self, count: int) -> bool:
+        """Понадобятся ли commit все книги библиотеки для сохранения count операций."""
+        return True
+
+    def save(self, books: Iterable[Book]):
+        """Перезаписывает хранилище переданными книгами."""
+        raise NotImplementedError
+
+    def compact(self, books: Iterable[Book]):
+        """Сжимает накопленные изменения в снимок."""
+        self.save(books)
+
+    def search(self, criteria: Dict[str, str]) -> Optional[List[int]]:
+        """
+        Ищет ID книг с точным совпадением полей без учета регистра.
+
+        Возвращает None, если хранилище не умеет выполнять поиск.
+        """
+        return None
+
+    def close(self):
+        """Освобождает ресурсы хранилища."""
+
+
+class JsonStorage(Storage):
+    """Хранение всех книг в JSON-файле, который перезаписывается при каждом изменении."""
+
+    def __init__(self, data_file: str, durable: bool = False):
+        """
+        Аргументы:
+            data_file (str): Путь к JSON-файлу.
+            durable (bool, optional): Выполнять fsync файла перед заменой.
+        """
+        self.data_file = data_file
+        self.durable = durable
+
+    def load(self) -> Iterator[Book]:
+        try:
+            yield from iter_books(self.data_file)
+        except FileNotFoundError:
+            return
+
+    def open_lazy(self) -> MutableMapping[int, Book]:
+        return LazyBooks(self.data_file)
+
+    def commit(self, ops: List[Dict], books: Callable[[], Iterable[Book]]):
+        self.save(books())
+
+    def save(self, books: Iterable[Book]):
+        """Атомарно перезаписывает файл: запись во временный файл и переименование."""
+        tmp_file = self.data_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump([book.to_dict() for book in books], file, ensure_ascii=False, indent=4)
+            if self.durable:
+                file.flush()
+                os.fsync(file.fileno())
+        if metrics.enabled:
+            metrics.increment("bytes_written_total", os.path.getsize(tmp_file), target="snapshot")
+        os.replace(tmp_file, self.data_file)
+
+
+class JournalStorage(JsonStorage):
+    """Снимок в JSON-файле и журнал изменений <data_file>.journal (см. Journal)."""
+
+    def __init__(self, data_file: str, fsync: str = "batch", compact_every: int = 1000):
+        """
+        Аргументы:
+            data_file (str): Путь к JSON-файлу снимка.
+            fsync (str, optional): Режим fsync журнала ("always", "batch", "never").
+            compact_every (int, optional): Количество записей журнала, после которого
+                журнал сжимается в снимок.
+        """
+        super().__init__(data_file, durable=True)
+        self.compact_every = compact_every
+        self.journal = Journal(data_file + ".journal", fsync=fsync)
+
+    def replay(self) -> Iterator[Dict]:
+        return self.journal.replay()
+
+    def position(self) -> Optional[Tuple]:
+        return file_signature(self.data_file), self.journal.size()
+
+    def changes_since(self, position: Optional[Tuple]) -> Optional[List[Dict]]:
+        # Новые операции есть только в хвосте журнала, пока снимок не перезаписан сжатием.
+        if position is None or position[0] != file_signature(self.data_file):
+            return None
+        return self.journal.read_from(position[1])
+
+    def needs_books(self, count: int) -> bool:
+        return self.journal.count + count >= self.compact_every
+
+    def commit(self, ops: List[Dict], books: Callable[[], Iterable[Book]]):
+        for op in ops:
+            self.journal.append(op)
+        if self.journal.count >= self.compact_every:
+            self.compact(books())
+
+    def compact(self, books: Iterable[Book]):
+        self.save(books)
+        self.journal.reset()
+
+    def close(self):
+        self.journal.close()
+
+
+def create_storage(data_file: str, storage_mode: str, fsync: str = "batch", compact_every: int = 1000) -> Storage:
+    """Создает хранилище для режима "json", "journal", "sqlite" или "binary"."""
+    if storage_mode == "json":
+        return JsonStorage(data_file)
+    if storage_mode == "journal":
+        return JournalStorage(data_file, fsync=fsync, compact_every=compact_every)
+    if storage_mode == "sqlite":
+        from .sqlite_storage import SqliteStorage
+        return SqliteStorage(data_file)
+    if storage_mode == "binary":
+        from .binary import BinaryStorage
+        return BinaryStorage(data_file)
+    raise ValueError(f"Неизвестный режим хранения: {storage_mode}")
@@ -0,0 +1,200 @@
+import io
+import json
+import re
+import threading
+from array import array
+from typing import Dict, Iterator, MutableMapping, Optional, Set, TextIO, Tuple
+
+from .book import Book
+
+
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, int, Dict]]:
+    """
+    Последовательно разбирает JSON-массив верхнего уровня, не читая файл целиком.
+
+    Возвращает кортежи (начало, конец, элемент), где начало и конец - смещения
+    элемента в символах потока. Если поток открыт в кодировке latin-1,
+    смещения совпадают со смещениями в байтах файла.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    base = 0
+    pos = 0
+    eof = False
+    state = "start"
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Неожиданный конец JSON-массива.")
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer, base, pos = buffer[pos:] + chunk, base + pos, 0
+            continue
+
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                raise ValueError("Файл данных должен содержать JSON-массив.")
+            pos += 1
+            state = "first"
+        elif state == "separator":
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Ожидалась запятая в позиции {base + pos}.")
+            pos += 1
+            state = "item"
+        else:
+            if state == "first" and char == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                item, end = None, len(buffer)
+            if end == len(buffer) and not eof:
+                chunk = stream.read(chunk_size)
+                eof = not chunk
+                buffer, base, pos = buffer[pos:] + chunk, base + pos, 0
+                continue
+            if item is None:
+                raise ValueError(f"Некорректный элемент JSON-массива в позиции {base + pos}.")
+            yield base + pos, base + end, item
+            pos = end
+            state = "separator"
+
+
+def iter_books(data_file: str) -> Iterator[Book]:
+    """Последовательно читает книги из JSON-файла библиотеки."""
+    with open(data_file, "r", encoding="utf-8") as file:
+        for _, _, data in iter_json_array(file):
+            yield Book.from_dict(data)
+
+
+class LazyBooks(MutableMapping):
+    """
+    Словарь "ID -> книга", читающий записи из JSON-файла по мере обращения.
+
+    При открытии файл просматривается один раз, и для каждой записи
+    запоминаются только ID и положение в файле. Объект Book создается
+    при первом обращении к книге и далее хранится в памяти, поэтому
+    изменения книг не теряются. Файл остается открытым: если его заменит
+    новый снимок (сохранение или другой процесс), книги читаются из
+    того файла, к которому относятся запомненные смещения.
+    """
+
+    def __init__(self, data_file: str):
+        """
+        Просматривает файл и запоминает положение записей.
+
+        Аргументы:
+            data_file (str): Путь к JSON-файлу библиотеки.
+        """
+        self.data_file = data_file
+        self._ids = array("q")
+        self._offsets = array("q")
+        self._lengths = array("q")
+        self._order: Optional[array] = None
+        self._loaded: Dict[int, Book] = {}
+        self._added: Dict[int, None] = {}
+        self._deleted: Set[int] = set()
+        self._file = None
+        self._file_lock = threading.Lock()
+        ordered = True
+        previous_id = None
+        try:
+            self._file = open(data_file, "rb")
+        except FileNotFoundError:
+            pass
+        else:
+            stream = io.TextIOWrapper(self._file, encoding="latin-1")
+            try:
+                for start, end, data in iter_json_array(stream):
+                    book_id = data["id"]
+                    if previous_id is not None and book_id <= previous_id:
+                        ordered = False
+                    previous_id = book_id
+                    self._ids.append(book_id)
+                    self._offsets.append(start)
+                    self._lengths.append(end - start)
+            finally:
+                stream.detach()
+        if not ordered:
+            self._order = array("q", sorted(range(len(self._ids)), key=self._ids.__getitem__))
+
+    @property
+    def max_id(self) -> int:
+        """Наибольший ID среди книг (0, если книг нет)."""
+        return max(max(self._ids, default=0), max(self._added, default=0))
+
+    def _row(self, book_id: int) -> Optional[int]:
+        """Возвращает номер записи в файле или None."""
+        low, high = 0, len(self._ids)
+        while low < high:
+            middle = (low + high) // 2
+            row = middle if self._order is None else self._order[middle]
+            if self._ids[row] < book_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(self._ids):
+            return None
+        row = low if self._order is None else self._order[low]
+        return row if self._ids[row] == book_id else None
+
+    def _read(self, row: int) -> Book:
+        """Читает и разбирает запись файла."""
+        with self._file_lock:
+            if self._file is None:
+                self._file = open(self.data_file, "rb")
+            self._file.seek(self._offsets[row])
+            data = self._file.read(self._lengths[row])
+        return Book.from_dict(json.loads(data))
+
+    def __getitem__(self, book_id: int) -> Book:
+        book = self._loaded.get(book_id)
+        if book is not None:
+            return book
+        row = None if book_id in self._deleted else self._row(book_id)
+        if row is None:
+            raise KeyError(book_id)
+        book = self._loaded[book_id] = self._read(row)
+        return book
+
+    def __setitem__(self, book_id: int, book: Book):
+        if book_id not in self._loaded and (book_id in self._deleted or self._row(book_id) is None):
+            self._added[book_id] = None
+        self._loaded[book_id] = book
+
+    def __delitem__(self, book_id: int):
+        if book_id not in self:
+            raise KeyError(book_id)
+        self._loaded.pop(book_id, None)
+        if book_id in self._added:
+            del self._added[book_id]
+        else:
+            self._deleted.add(book_id)
+
+    def __contains__(self, book_id) -> bool:
+        if book_id in self._loaded or book_id in self._added:
+            return True
+        return book_id not in self._deleted and self._row(book_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        for book_id in self._ids:
+            if book_id not in self._deleted:
+                yield book_id
+        yield from list(self._added)
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._deleted) + len(self._added)
+
+    def close(self):
+        """Закрывает файл данных."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,75 @@
+import csv
+import json
+import os
+from typing import Dict, Iterable, Iterator
+
+from validators import InvalidRow
+from .book import Book
+
+
+FIELDS = ["id", "title", "author", "year", "status"]
+
+
+def _file_format(path: str) -> str:
+    """Определяет формат файла по расширению: "csv" или "jsonl"."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Неподдерживаемый формат файла: {path} (ожидается .csv или .jsonl)")
+
+
+def _parse_year(value):
+    """Преобразует год в число, если он записан цифрами."""
+    if isinstance(value, str):
+        value = value.strip()
+        return int(value) if value.isdigit() else value
+    return value
+
+
+def _parse_json(line: str):
+    """Разбирает строку JSON Lines; если это не JSON-объект, возвращает InvalidRow("json")."""
+    try:
+        row = json.loads(line)
+    except json.JSONDecodeError:
+        return InvalidRow("json")
+    return row if isinstance(row, dict) else InvalidRow("json")
+
+
+def read_rows(path: str) -> Iterator[Dict]:
+    """
+    Последовательно читает строки с данными книг из файла CSV или JSON Lines.
+
+    Каждая строка - словарь с ключами title, author, year и необязательным status.
+    Вместо строки JSON Lines, которая не является JSON-объектом, возвращается
+    InvalidRow("json"), чтобы импорт сообщил об ошибке строки и продолжился.
+    """
+    file_format = _file_format(path)
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        rows = csv.DictReader(file) if file_format == "csv" else (_parse_json(line) for line in file if line.strip())
+        for row in rows:
+            if isinstance(row, dict) and "year" in row:
+                row["year"] = _parse_year(row["year"])
+            yield row
+
+
+def write_books(path: str, books: Iterable[Book]) -> int:
+    """
+    Последовательно записывает книги в файл CSV или JSON Lines.
+
+    Возвращает количество записанных книг.
+    """
+    file_format = _file_format(path)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS) if file_format == "csv" else None
+        if writer:
+            writer.writeheader()
+        for book in books:
+            if writer:
+                writer.writerow(book.to_dict())
+            else:
+                file.write(json.dumps(book.to_dict(), ensure_ascii=False) + "\n")
+            count += 1
+    return count
@@ -1,17 +1,18 @@
-from library.library import Library
-from handlers import (handle_add_book, handle_remove_book, handle_search_books, handle_display_books,
-                      handle_update_status)
+import argparse
+import sys
+from contextlib import ExitStack, closing
 
 
-def main():
-    library = Library("library.json")
-
+def run_interactive(library):
+    from handlers import (handle_add_book, handle_remove_book, handle_search_books, handle_display_books,
+                          handle_update_status, handle_loans)
     commands = {
         "1": handle_add_book,
         "2": handle_remove_book,
         "3": handle_search_books,
         "4": handle_display_books,
         "5": handle_update_status,
+        "7": handle_loans,
     }
 
     while True:
@@ -22,6 +23,7 @@ def main():
         print("4. Показать все книги")
         print("5. Изменить статус книги")
         print("6. Выход")
+        print("7. Выдачи и просроченные книги")
 
         command = input("Введите номер команды: ").strip()
 
@@ -34,5 +36,71 @@ def main():
             print("Неверная команда. Попробуйте снова.")
 
 
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Управление библиотекой книг. Без команды запускается меню.")
+    parser.add_argument("--data-file", default="library.json", help="Файл библиотеки (по умолчанию library.json).")
+    # Режимы из library.library.PERSISTENCE_MODES; модуль не импортируется, чтобы не замедлять запуск.
+    parser.add_argument("--persistence", choices=("immediate", "debounced", "on_exit"), default="debounced",
+                        help="Когда сохранять изменения: сразу, в фоне с небольшой задержкой (по умолчанию) "
+                             "или при выходе.")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Собирать метрики и сохранить их при выходе (.prom - формат Prometheus, иначе JSON).")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="Профилировать сеанс (cProfile и tracemalloc) и сохранить отчеты в каталог.")
+    subparsers = parser.add_subparsers(dest="command")
+    import_parser = subparsers.add_parser("import", help="Импортировать книги из файла .csv или .jsonl.")
+    import_parser.add_argument("path")
+    export_parser = subparsers.add_parser("export", help="Экспортировать книги в файл .csv или .jsonl.")
+    export_parser.add_argument("path")
+
+    search_parser = subparsers.add_parser("search", help="Найти книги и вывести их строками JSON.")
+    search_parser.add_argument("--title")
+    search_parser.add_argument("--author")
+    search_parser.add_argument("--year")
+    search_parser.add_argument("--mode", choices=("exact", "token", "prefix", "substring", "fuzzy"),
+                               default="exact", help="Режим сравнения названия и автора (по умолчанию exact).")
+    search_parser.add_argument("--limit", type=int, help="Максимальное количество книг.")
+    get_parser = subparsers.add_parser("get", help="Вывести книгу по ID.")
+    get_parser.add_argument("id", type=int)
+    status_parser = subparsers.add_parser("status", help="Изменить статус книги, например: status 5 выдана.")
+    status_parser.add_argument("id", type=int)
+    status_parser.add_argument("status", choices=("в наличии", "выдана"))
+    status_parser.add_argument("--patron", help="Читатель, которому выдается книга (для статуса 'выдана').")
+    subparsers.add_parser("script", help="Выполнить команды search, get и status из stdin, по одной в строке; "
+                                         "изменения сохраняются одной записью.")
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    with ExitStack() as stack:
+        if args.profile:
+            from library.metrics import profile_session
+            stack.enter_context(profile_session(args.profile))
+        if args.metrics:
+            from library.metrics import metrics, write_metrics
+            metrics.enable()
+            stack.callback(write_metrics, args.metrics)
+
+        if args.command in ("search", "get", "status", "script"):
+            import commands
+            if args.command == "script":
+                return commands.run_script(args, parser)
+            return commands.SCRIPT_COMMANDS[args.command](args)
+
+        from library.library import Library
+        library = stack.enter_context(closing(Library(args.data_file, persistence=args.persistence)))
+        if args.command == "import":
+            from handlers import handle_import
+            handle_import(library, args.path)
+        elif args.command == "export":
+            from handlers import handle_export
+            handle_export(library, args.path)
+        else:
+            run_interactive(library)
+    return 0
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+from library.binary import HEADER, MAGIC, MappedBooks, Snapshot, binary_to_json, json_to_binary, write_snapshot
+from library.book import Book
+from library.library import Library
+from library.streaming import iter_books
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    """
+    Набор тестов для двоичного снимка библиотеки.
+    """
+
+    def setUp(self):
+        """
+        Создает временный каталог и набор книг.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "library.bin")
+        self.books = [
+            Book(3, "Идиот", "Федор Достоевский", 1869, "выдана"),
+            Book(1, "Война и мир", "Лев Толстой", 1869, "в наличии"),
+            Book(2, "Анна Каренина", "Лев Толстой", 1877, "в наличии"),
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """
+        Проверяет запись и чтение снимка, в том числе с разреженными ID.
+        """
+        for books in (self.books, self.books + [Book(1000, "Бесы", "Федор Достоевский", 1872, "в наличии")]):
+            write_snapshot(self.path, books)
+            snapshot = Snapshot(self.path)
+            try:
+                self.assertEqual([book.to_dict() for book in snapshot],
+                                 [book.to_dict() for book in sorted(books, key=lambda book: book.id)])
+                self.assertEqual(snapshot.get(3).title, "Идиот")
+                self.assertIsNone(snapshot.get(4))
+                self.assertIsNone(snapshot.get(0))
+            finally:
+                snapshot.close()
+
+    def test_rejects_other_files_and_versions(self):
+        """
+        Проверяет проверку сигнатуры и версии формата.
+        """
+        with open(self.path, "wb") as file:
+            file.write(b"[]")
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+        with open(self.path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, 99, 0, 0, 0, 0, 0, *[HEADER.size] * 5))
+        with self.assertRaisesRegex(ValueError, "версия"):
+            Snapshot(self.path)
+
+    def test_conversion(self):
+        """
+        Проверяет преобразование JSON -> двоичный снимок -> JSON.
+        """
+        json_file = os.path.join(self.tmp_dir.name, "library.json")
+        library = Library(json_file)
+        library.books = self.books
+        library.save_books()
+
+        self.assertEqual(json_to_binary(json_file, self.path), 3)
+        copy = os.path.join(self.tmp_dir.name, "copy.json")
+        self.assertEqual(binary_to_json(self.path, copy), 3)
+        self.assertEqual([book.to_dict() for book in iter_books(copy)],
+                         [book.to_dict() for book in sorted(self.books, key=lambda book: book.id)])
+
+    def test_library_binary_storage(self):
+        """
+        Проверяет работу библиотеки с двоичным снимком, в том числе с ленивой загрузкой.
+        """
+        library = Library(self.path, storage_mode="binary")
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.add_book("Идиот", "Федор Достоевский", 1869)
+
+        with mock.patch.object(MappedBooks, "__iter__", side_effect=AssertionError("просмотр всех книг")):
+            lazy = Library(self.path, storage_mode="binary", lazy=True)
+        self.assertEqual(lazy.get_book_by_id(2).author, "Федор Достоевский")
+        lazy.update_status(1, "выдана")
+        lazy.remove_book(2)
+        lazy.add_book("Бесы", "Федор Достоевский", 1872)
+        lazy.close()
+
+        reloaded = Library(self.path, storage_mode="binary")
+        self.assertEqual([(book.id, book.status) for book in reloaded.books], [(1, "выдана"), (3, "в наличии")])
+        with open(self.path, "rb") as file:
+            self.assertEqual(struct.unpack_from("<4sH", file.read(6)), (MAGIC, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from library.library import Library
+from library.storage import JsonStorage
+from library.transfer import read_rows, write_books
+
+
+class CountingStorage(JsonStorage):
+    """
+    Хранилище, подсчитывающее количество сохранений.
+    """
+
+    def __init__(self, data_file: str):
+        super().__init__(data_file)
+        self.commits = 0
+
+    def commit(self, ops, books):
+        self.commits += 1
+        super().commit(ops, books)
+
+
+class TestBulkOperations(unittest.TestCase):
+    """
+    Набор тестов для пакетных операций библиотеки и импорта/экспорта.
+    """
+
+    def setUp(self):
+        """
+        Создает библиотеку во временном каталоге с хранилищем, подсчитывающим сохранения.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+        self.storage = CountingStorage(self.data_file)
+        self.library = Library(self.data_file, storage=self.storage)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_add_books_saves_once(self):
+        """
+        Проверяет, что пакетное добавление сохраняет библиотеку один раз и сообщает об ошибках строк.
+        """
+        errors = self.library.add_books([
+            {"title": "Война и мир", "author": "Лев Толстой", "year": 1869},
+            {"title": "ВОЙНА И МИР", "author": "лев толстой", "year": 1869},
+            {"title": "Анна Каренина", "author": "Лев Толстой", "year": 1877, "status": "выдана"},
+            {"title": "Без автора", "year": 1900},
+        ])
+        self.assertEqual(errors, [(2, "Книга с таким названием и автором уже существует в библиотеке."),
+                                  (4, "Отсутствует обязательное поле (title, author или year).")])
+        self.assertEqual(self.storage.commits, 1)
+        self.assertEqual([book.status for book in Library(self.data_file).books], ["в наличии", "выдана"])
+
+    def test_add_books_in_chunks(self):
+        """
+        Проверяет номера строк с ошибками и поиск дубликатов между частями при пакетной проверке.
+        """
+        with mock.patch("library.library.ITER_CHUNK", 2):
+            errors = self.library.add_books(iter([
+                {"title": "Война и мир", "author": "Лев Толстой", "year": 1869},
+                {"title": "Идиот", "author": "Федор Достоевский", "year": 1869},
+                {"title": "война и мир", "author": "Лев Толстой", "year": 1869},
+                {"title": "Бесы", "author": "Федор Достоевский 2", "year": 1872},
+                {"title": "Бесы", "author": "Федор Достоевский", "year": 1872},
+            ]))
+        self.assertEqual(errors, [(3, "Книга с таким названием и автором уже существует в библиотеке."),
+                                  (4, "Имя автора не должно содержать цифры.")])
+        self.assertEqual([book.id for book in self.library.books], [1, 2, 3])
+        self.assertEqual(self.storage.commits, 1)
+
+    def test_remove_and_update_in_bulk(self):
+        """
+        Проверяет пакетное удаление и обновление статусов.
+        """
+        self.library.add_books({"title": f"Книга {number}", "author": "Автор", "year": 2000} for number in range(5))
+        errors = self.library.update_statuses({1: "выдана", 2: "выдана", 99: "выдана", 3: "потеряна"})
+        self.assertEqual([book_id for book_id, _ in errors], [99, 3])
+        errors = self.library.remove_books([4, 5, 5])
+        self.assertEqual(errors, [(5, "Книги с заданным ID не существует.")])
+        self.assertEqual(self.storage.commits, 3)
+        reloaded = Library(self.data_file)
+        self.assertEqual([(book.id, book.status) for book in reloaded.books],
+                         [(1, "выдана"), (2, "выдана"), (3, "в наличии")])
+
+    def test_csv_and_jsonl_round_trip(self):
+        """
+        Проверяет экспорт и повторный импорт книг через CSV и JSON Lines.
+        """
+        self.library.add_books([
+            {"title": "Война и мир", "author": "Лев Толстой", "year": 1869},
+            {"title": "Анна Каренина", "author": "Лев Толстой", "year": 1877, "status": "выдана"},
+        ])
+        for name in ("books.csv", "books.jsonl"):
+            path = os.path.join(self.tmp_dir.name, name)
+            self.assertEqual(write_books(path, self.library.books), 2)
+            target = Library(os.path.join(self.tmp_dir.name, name + ".json"))
+            self.assertEqual(target.add_books(read_rows(path)), [])
+            self.assertEqual([book.to_dict() for book in target.books],
+                             [book.to_dict() for book in self.library.books])
+        with self.assertRaises(ValueError):
+            list(read_rows(os.path.join(self.tmp_dir.name, "books.xml")))
+
+    def test_import_rows_with_empty_values(self):
+        """
+        Проверяет, что короткие строки CSV и null или числа в JSON Lines дают ошибку строки, а не исключение.
+        """
+        csv_path = os.path.join(self.tmp_dir.name, "books.csv")
+        with open(csv_path, "w", encoding="utf-8") as file:
+            file.write("title,author,year\nВойна и мир,Лев Толстой,1869\nАнна Каренина\n")
+        jsonl_path = os.path.join(self.tmp_dir.name, "books.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as file:
+            file.write('{"title": "Воскресение", "author": null, "year": 1899}\n'
+                       '{"title": 1984, "author": "Джордж Оруэлл", "year": 1949}\n'
+                       '{"title": "Детство", "author": "Лев Толстой", "year": 1852}\n')
+        missing = "Все поля (название, автор, год) должны быть заполнены."
+        self.assertEqual(self.library.add_books(read_rows(csv_path)), [(2, missing)])
+        self.assertEqual(self.library.add_books(read_rows(jsonl_path)),
+                         [(1, missing), (2, "Название книги и имя автора должны быть строками.")])
+        self.assertEqual([book.title for book in Library(self.data_file).books], ["Война и мир", "Детство"])
+
+    def test_import_invalid_json_lines(self):
+        """
+        Проверяет, что некорректный JSON и строки, не являющиеся объектами, дают ошибки строк, а импорт продолжается.
+        """
+        path = os.path.join(self.tmp_dir.name, "books.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('{"title": "Война и мир", "author": "Лев Толстой"\n'
+                       '[1, 2]\n'
+                       '5\n'
+                       '{"title": "Детство", "author": "Лев Толстой", "year": "1852"}\n')
+        invalid = "Запись не является корректным JSON-объектом книги."
+        self.assertEqual(self.library.add_books(read_rows(path)), [(1, invalid), (2, invalid), (3, invalid)])
+        self.assertEqual(self.library.add_books([["Идиот", "Федор Достоевский", 1869]]),
+                         [(1, "Название книги и имя автора должны быть строками.")])
+        self.assertEqual([book.title for book in Library(self.data_file).books], ["Детство"])
+
+
+if __name__ == "__main__":
+    unittest.main()
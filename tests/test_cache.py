@@ -0,0 +1,81 @@
+import unittest
+
+from library.book import Book
+from library.cache import QueryCache
+from library.library import Library
+
+
+class TestQueryCache(unittest.TestCase):
+    """
+    Набор тестов для кэша результатов поиска.
+    """
+
+    def setUp(self):
+        """
+        Создает библиотеку с несколькими книгами.
+        """
+        self.library = Library("../test_library.json")
+        self.library.books = [
+            Book(1, "Война и мир", "Лев Толстой", 1869),
+            Book(2, "Анна Каренина", "Лев Толстой", 1877),
+            Book(3, "Идиот", "Федор Достоевский", 1869),
+        ]
+
+    def test_repeated_search_hits_cache(self):
+        """
+        Проверяет попадание в кэш для запроса, отличающегося только регистром.
+        """
+        first = self.library.search_books(author="Лев Толстой")
+        second = self.library.search_books(author="лев толстой")
+        self.assertEqual([book.id for book in second], [book.id for book in first])
+        self.assertEqual(self.library.cache.stats()["hits"], 1)
+        self.assertEqual(self.library.cache.stats()["misses"], 1)
+
+        second.clear()
+        self.assertEqual(len(self.library.search_books(author="Лев Толстой")), 2)
+
+    def test_status_change_keeps_author_queries(self):
+        """
+        Проверяет, что смена статуса сбрасывает только запросы по статусу.
+        """
+        self.library.search_books(author="Лев Толстой")
+        self.assertEqual(len(self.library.search_books(status="в наличии")), 3)
+        self.library.update_status(1, "выдана")
+
+        self.assertEqual(len(self.library.search_books(status="в наличии")), 2)
+        self.library.search_books(author="Лев Толстой")
+        self.assertEqual(self.library.cache.stats()["hits"], 1)
+
+    def test_add_and_remove_invalidate(self):
+        """
+        Проверяет, что добавление и удаление книг делают устаревшими все результаты.
+        """
+        self.assertEqual(len(self.library.search_books(mode="token", author="толстой")), 2)
+        self.library.add_book("Детство", "Лев Толстой", 1852)
+        self.assertEqual(len(self.library.search_books(mode="token", author="толстой")), 3)
+        self.assertEqual([book.id for book in self.library.search_books(year=1869)], [1, 3])
+        self.library.remove_book(3)
+        self.assertEqual([book.id for book in self.library.search_books(year=1869)], [1])
+        self.assertEqual(self.library.cache.stats()["hits"], 0)
+
+    def test_lru_and_ttl(self):
+        """
+        Проверяет вытеснение давно использованных записей и истечение времени жизни.
+        """
+        now = [0.0]
+        cache = QueryCache(max_entries=2, max_result=2, ttl=10, clock=lambda: now[0])
+        for number in range(3):
+            cache.put(QueryCache.key("exact", {"year": number}), number, 1)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(QueryCache.key("exact", {"year": 0})))
+        self.assertEqual(cache.get(QueryCache.key("exact", {"year": 2})), 2)
+
+        cache.put(QueryCache.key("exact", {"year": 5}), "большой результат", 3)
+        self.assertIsNone(cache.get(QueryCache.key("exact", {"year": 5})))
+        now[0] = 11
+        self.assertIsNone(cache.get(QueryCache.key("exact", {"year": 2})))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 3, "hit_rate": 0.25, "entries": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
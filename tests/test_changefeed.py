@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from library.changefeed import ChangeFeed, read_changes
+from library.library import Library
+
+
+class TestChangeFeed(unittest.TestCase):
+    """
+    Набор тестов для ленты изменений библиотеки.
+    """
+
+    def setUp(self):
+        """
+        Создает библиотеку во временном каталоге с файлом ленты изменений.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+        self.feed_file = self.data_file + ".changes"
+        self.library = Library(self.data_file, change_feed=self.feed_file)
+
+    def tearDown(self):
+        self.library.close()
+        self.tmp_dir.cleanup()
+
+    def test_subscribers_receive_saved_changes(self):
+        """
+        Проверяет, что подписчики получают события после сохранения, по порядку номеров.
+        """
+        events = []
+        unsubscribe = self.library.changes.subscribe(events.append)
+        with self.library.batch():
+            self.library.add_book("Война и мир", "Лев Толстой", 1869)
+            self.library.update_status(1, "выдана")
+            self.assertEqual(events, [])
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.remove_book(1)
+
+        self.assertEqual([(event["seq"], event["op"]) for event in events], [(1, "add"), (2, "status"), (3, "remove")])
+        self.assertEqual(events[0]["book"]["title"], "Война и мир")
+        unsubscribe()
+        self.library.add_book("Идиот", "Федор Достоевский", 1869)
+        self.assertEqual(len(events), 3)
+
+    def test_resume_from_sequence(self):
+        """
+        Проверяет чтение событий с заданного номера и продолжение нумерации после перезапуска.
+        """
+        self.library.add_books({"title": f"Книга {number}", "author": "Автор", "year": 2000} for number in range(5))
+        self.library.close()
+        self.assertEqual([event["book"]["id"] for event in read_changes(self.feed_file, since=3)], [4, 5])
+
+        self.library = Library(self.data_file, change_feed=self.feed_file)
+        self.library.remove_book(2)
+        self.assertEqual(list(self.library.changes.read(5)), [{"seq": 6, "op": "remove", "id": 2}])
+
+    def test_torn_tail_is_skipped_and_repaired(self):
+        """
+        Проверяет, что недописанное событие не читается и отбрасывается при следующей записи.
+        """
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.changes.close()
+        with open(self.feed_file, "ab") as file:
+            file.write(b'{"seq": 2, "op": "rem')
+        self.assertEqual([event["seq"] for event in read_changes(self.feed_file)], [1])
+
+        self.library.remove_book(1)
+        self.assertEqual([event["op"] for event in read_changes(self.feed_file)], ["add", "remove"])
+
+    def test_shared_writers_continue_sequence(self):
+        """
+        Проверяет, что библиотеки разных процессов продолжают общую нумерацию событий.
+        """
+        first = Library(self.data_file, shared=True, change_feed=self.feed_file)
+        second = Library(self.data_file, shared=True, change_feed=self.feed_file)
+        first.add_book("Война и мир", "Лев Толстой", 1869)
+        second.add_book("Идиот", "Федор Достоевский", 1869)
+        first.update_status(2, "выдана")
+        self.assertEqual([(event["seq"], event["op"]) for event in read_changes(self.feed_file)],
+                         [(1, "add"), (2, "add"), (3, "status")])
+        first.close()
+        second.close()
+
+    def test_unpublished_changes_recovered_on_open(self):
+        """
+        Проверяет, что сохраненные, но не опубликованные из-за сбоя изменения публикуются при следующем открытии.
+        """
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        with mock.patch.object(ChangeFeed, "publish", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                with self.library.batch():
+                    self.library.add_book("Идиот", "Федор Достоевский", 1869)
+                    self.library.update_status(2, "выдана")
+        self.assertEqual([event["seq"] for event in read_changes(self.feed_file)], [1])
+
+        with open(self.feed_file, "a", encoding="utf-8") as file:
+            file.write('{"seq": 2, "op": "add", "book": {"id": 2, "title": "Идиот", "author": "Федор Достоевский", '
+                       '"year": 1869, "status": "в наличии"}}\n')
+        reopened = Library(self.data_file, change_feed=self.feed_file)
+        self.assertEqual([(event["seq"], event["op"]) for event in read_changes(self.feed_file)],
+                         [(1, "add"), (2, "add"), (3, "status")])
+        self.assertFalse(reopened.changes.pending)
+        reopened.close()
+
+        reopened.changes.prepare([{"op": "remove", "id": 1}])
+        reopened = Library(self.data_file, change_feed=self.feed_file)
+        self.assertEqual(reopened.changes.sequence, 3)
+        self.assertFalse(reopened.changes.pending)
+        reopened.close()
+
+    def test_feed_without_file(self):
+        """
+        Проверяет ленту без файла: события получают только подписчики.
+        """
+        feed = ChangeFeed()
+        events = []
+        feed.subscribe(events.append)
+        feed.publish([{"op": "remove", "id": 1}])
+        self.assertEqual(events, [{"seq": 1, "op": "remove", "id": 1}])
+        with self.assertRaises(ValueError):
+            list(feed.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
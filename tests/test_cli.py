@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+import main
+from library.library import Library
+
+
+class TestCommands(unittest.TestCase):
+    """
+    Набор тестов для неинтерактивных команд main.py.
+    """
+
+    def setUp(self):
+        """
+        Создает библиотеку из трех книг во временном каталоге.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+        library = Library(self.data_file)
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        library.add_book("Идиот", "Федор Достоевский", 1869)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_main(self, *args, stdin=""):
+        """Выполняет main.py с аргументами и возвращает (код завершения, stdout, stderr)."""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        original_stdin = sys.stdin
+        sys.stdin = io.StringIO(stdin)
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                code = main.main(["--data-file", self.data_file, *args])
+        finally:
+            sys.stdin = original_stdin
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_search_and_get(self):
+        """
+        Проверяет вывод найденных книг строками JSON.
+        """
+        code, output, _ = self.run_main("search", "--author", "лев толстой", "--limit", "1")
+        self.assertEqual(code, 0)
+        self.assertEqual([json.loads(line)["title"] for line in output.splitlines()], ["Война и мир"])
+
+        _, output, _ = self.run_main("search", "--mode", "prefix", "--title", "иди")
+        self.assertEqual(json.loads(output)["id"], 3)
+        self.assertEqual(self.run_main("search")[0], 2)
+
+        code, output, _ = self.run_main("get", "2")
+        self.assertEqual((code, json.loads(output)["title"]), (0, "Анна Каренина"))
+        self.assertEqual(self.run_main("get", "9")[0], 1)
+        with mock.patch.object(Library, "close", autospec=True, side_effect=Library.close) as close:
+            self.run_main("get", "1")
+        close.assert_called_once()
+
+    def test_status(self):
+        """
+        Проверяет изменение статуса и выдачу книги читателю.
+        """
+        self.assertEqual(self.run_main("status", "1", "выдана"), (0, "", ""))
+        self.assertEqual(Library(self.data_file).get_book_by_id(1).status, "выдана")
+
+        self.assertEqual(self.run_main("status", "2", "выдана", "--patron", "Иванов")[0], 0)
+        self.assertEqual([loan.book_id for loan in Library(self.data_file).loans_of("Иванов")], [2])
+        code, _, error = self.run_main("status", "3", "в наличии", "--patron", "Иванов")
+        self.assertEqual(code, 2)
+        self.assertIn("--patron", error)
+        self.assertEqual(Library(self.data_file).get_book_by_id(3).status, "в наличии")
+        self.assertEqual(Library(self.data_file).loans_of("Иванов", history=True)[0].book_id, 2)
+        code, _, error = self.run_main("status", "7", "выдана")
+        self.assertEqual(code, 1)
+        self.assertIn("Книги с заданным ID не существует.", error)
+
+    def test_script(self):
+        """
+        Проверяет выполнение команд из stdin с сохранением изменений и отчетом об ошибках.
+        """
+        script = "# отметить возвраты\nstatus 1 выдана\nstatus 3 выдана\nunknown\nstatus 1 'в наличии'\nget 1\n"
+        code, output, error = self.run_main("script", stdin=script)
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(output)["status"], "в наличии")
+        self.assertIn("Строка 4", error)
+        self.assertEqual([book.status for book in Library(self.data_file).books], ["в наличии", "в наличии", "выдана"])
+
+
+    def test_menu_exit_number(self):
+        """
+        Проверяет, что выход из меню остается командой 6, а выдачи получили номер 7.
+        """
+        code, output, _ = self.run_main(stdin="6\n")
+        self.assertEqual(code, 0)
+        self.assertIn("6. Выход", output)
+        self.assertIn("7. Выдачи и просроченные книги", output)
+        self.assertTrue(output.rstrip().endswith("Выход из программы."))
+
+
+if __name__ == '__main__':
+    unittest.main()
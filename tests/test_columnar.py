@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from library.book import Book
+from library.columnar import ColumnarBooks
+from library.library import Library
+
+
+class TestColumnarBooks(unittest.TestCase):
+    """
+    Набор тестов для компактного хранения книг по столбцам.
+    """
+
+    def setUp(self):
+        """
+        Создает библиотеку со столбцовым хранением во временном каталоге.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+        self.library = Library(self.data_file, layout="columnar")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_book_has_no_dict(self):
+        """
+        Проверяет, что у объекта Book нет словаря атрибутов.
+        """
+        self.assertFalse(hasattr(Book(1, "Заголовок", "Автор", 2020), "__dict__"))
+
+    def test_views_are_book_compatible(self):
+        """
+        Проверяет, что представления книг ведут себя как Book.
+        """
+        store = ColumnarBooks([Book(5, "Идиот", "Фёдор Достоевский", 1869), Book(2, "Бесы", "Фёдор Достоевский", 1872)])
+        self.assertEqual(list(store), [2, 5])
+        self.assertEqual(store[5].to_dict(), Book(5, "Идиот", "Фёдор Достоевский", 1869).to_dict())
+        self.assertIs(store[2].author, store[5].author)
+        view = store[5]
+        del store[2]
+        view.status = "выдана"
+        self.assertEqual(store[5].status, "выдана")
+        self.assertNotIn(2, store)
+
+    def test_library_operations(self):
+        """
+        Проверяет работу библиотеки со столбцовым хранением и повторную загрузку.
+        """
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        self.library.add_book("Вишнёвый сад", "Антон Чехов", 1904)
+        self.assertIsNone(self.library.update_status(2, "выдана"))
+        self.assertIsNone(self.library.remove_book(1))
+        results = self.library.search_books(mode="prefix", author="толст")
+        self.assertEqual([book.title for book in results], ["Анна Каренина"])
+        self.assertEqual(results[0].status, "выдана")
+
+        reloaded = Library(self.data_file, layout="columnar")
+        self.assertEqual([book.to_dict() for book in reloaded.books],
+                         [book.to_dict() for book in self.library.books])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import unittest
+
+from library.fsck import check, main, repair
+from library.library import Library
+
+
+def book(book_id, title, author="Лев Толстой", year=1869, status="в наличии"):
+    return {"id": book_id, "title": title, "author": author, "year": year, "status": status}
+
+
+class TestFsck(unittest.TestCase):
+    """
+    Набор тестов для проверки и восстановления файла библиотеки.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, records, text=None):
+        with open(self.data_file, "w", encoding="utf-8") as file:
+            file.write(text if text is not None else json.dumps(records, ensure_ascii=False, indent=4))
+
+    def broken_file(self):
+        """Файл с повторяющимся ID, пропуском ID, лишним статусом, отсутствующим полем и повтором книги."""
+        records = [
+            book(1, "Война и мир"),
+            book(2, "Анна Каренина", status="утеряна"),
+            book(2, "Детство"),
+            {"id": 5, "title": "Отрочество", "author": "Лев Толстой"},
+            book(6, "Юность", year=3000),
+            book(7, "война и мир"),
+        ]
+        self.write(records)
+
+    def test_reports_problems(self):
+        """
+        Проверяет обнаружение ошибок записей, повторов и пропусков ID.
+        """
+        self.broken_file()
+        report = check(self.data_file)
+        self.assertEqual(report.problems, [(1, 2, "status"), (2, 2, "duplicate_id"), (3, 5, "missing_field"),
+                                           (4, 6, "year"), (5, 7, "duplicate")])
+        self.assertEqual(report.gaps, [(3, 4)])
+        self.assertEqual((report.records, report.max_id), (6, 7))
+        self.assertIn("запись 3, ID 2: Книга с таким ID уже встречалась в файле.", list(report.messages()))
+
+        self.write([], text='[\n    {"id": 1, "title": "Идиот", "author": "Федор Достоевский", "year": 1869, '
+                            '"status": "в наличии"},\n    {"id": 2, "title": \n]')
+        self.assertEqual(check(self.data_file).problems, [(1, 0, "json")])
+        self.write([], text="")
+        with self.assertRaises(ValueError):
+            check(self.data_file)
+
+    def test_only_changed_chunks_are_checked_again(self):
+        """
+        Проверяет, что повторная проверка разбирает только измененный фрагмент файла.
+        """
+        records = [book(number, f"Книга {number}", year=1900) for number in range(1, 3501)]
+        self.write(records)
+        first = check(self.data_file)
+        self.assertTrue(first.ok)
+        self.assertEqual((first.chunks, first.reused), (4, 0))
+
+        records[2500]["status"] = "выдана"
+        records[2501]["title"] = "Книга #2502"
+        self.write(records)
+        second = check(self.data_file)
+        self.assertEqual((second.chunks, second.reused), (4, 3))
+        self.assertEqual(second.problems, [(2501, 2502, "invalid_chars")])
+
+    def test_repair(self):
+        """
+        Проверяет исправление файла: новые ID для повторов, статусы, удаление неполных записей и перенумерацию.
+        """
+        self.broken_file()
+        report, removed = repair(self.data_file)
+        self.assertFalse(report.ok)
+        self.assertEqual(removed, 1)
+        books = Library(self.data_file).books
+        self.assertEqual([(item.id, item.status) for item in books],
+                         [(1, "в наличии"), (2, "в наличии"), (8, "в наличии"), (6, "в наличии"), (7, "в наличии")])
+        self.assertEqual(check(self.data_file, use_cache=False).problems, [(3, 6, "year"), (4, 7, "duplicate")])
+
+        repair(self.data_file, renumber=True)
+        self.assertEqual([item.id for item in Library(self.data_file).books], [1, 2, 3, 4, 5])
+        self.assertEqual(check(self.data_file).gaps, [])
+        self.assertEqual(main([self.data_file]), 1)
+
+    def test_repair_is_seen_by_shared_library(self):
+        """
+        Проверяет, что библиотека с shared=True перечитывает исправленный файл и не перезаписывает его старыми данными.
+        """
+        self.write([book(1, "Война и мир"), book(2, "Анна Каренина", status="утеряна"), book(2, "Детство")])
+        library = Library(self.data_file, shared=True)
+        repair(self.data_file)
+        self.assertIsNone(library.add_book("Воскресение", "Лев Толстой", 1899))
+        expected = [(1, "в наличии"), (2, "в наличии"), (3, "в наличии"), (4, "в наличии")]
+        self.assertEqual([(item.id, item.status) for item in library.books], expected)
+        self.assertEqual([(item.id, item.status) for item in Library(self.data_file).books], expected)
+        self.assertTrue(check(self.data_file, use_cache=False).ok)
+        library.close()
+
+if __name__ == '__main__':
+    unittest.main()
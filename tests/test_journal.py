@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from library.library import Library
+
+
+class TestJournal(unittest.TestCase):
+    """
+    Набор тестов для режима хранения с журналом изменений.
+    """
+
+    def setUp(self):
+        """
+        Создает временный каталог для файлов библиотеки.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_mutations_are_replayed(self):
+        """
+        Проверяет, что изменения восстанавливаются из журнала при повторной загрузке.
+        """
+        library = Library(self.data_file, storage_mode="journal")
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        library.update_status(1, "выдана")
+        library.remove_book(2)
+        library.close()
+        self.assertFalse(os.path.exists(self.data_file))
+
+        reloaded = Library(self.data_file, storage_mode="journal")
+        self.assertEqual([book.to_dict() for book in reloaded.books], [book.to_dict() for book in library.books])
+        self.assertEqual(reloaded.books[0].status, "выдана")
+
+    def test_compaction(self):
+        """
+        Проверяет сжатие журнала в снимок после заданного количества записей.
+        """
+        library = Library(self.data_file, storage_mode="journal", compact_every=2)
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        self.assertTrue(os.path.exists(self.data_file))
+        self.assertEqual(os.path.getsize(self.data_file + ".journal"), 0)
+        library.update_status(2, "выдана")
+        library.close()
+
+        reloaded = Library(self.data_file, storage_mode="journal")
+        self.assertEqual(len(reloaded.books), 2)
+        self.assertEqual(reloaded.get_book_by_id(2).status, "выдана")
+
+    def test_torn_write_is_discarded(self):
+        """
+        Проверяет, что недописанная запись журнала отбрасывается при загрузке.
+        """
+        library = Library(self.data_file, storage_mode="journal")
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.close()
+        with open(self.data_file + ".journal", "ab") as file:
+            file.write(b'{"op": "remove", "i')
+
+        reloaded = Library(self.data_file, storage_mode="journal")
+        self.assertEqual(len(reloaded.books), 1)
+        reloaded.add_book("Анна Каренина", "Лев Толстой", 1877)
+        reloaded.close()
+        self.assertEqual(len(Library(self.data_file, storage_mode="journal").books), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -124,6 +124,27 @@ class TestLibrary(unittest.TestCase):
         error = self.library.remove_book(999)
         self.assertEqual(error, "Книги с заданным ID не существует.")
 
+    def test_duplicate_book_case_insensitive(self):
+        """
+        Проверяет, что дубликаты по названию и автору ищутся без учета регистра.
+        """
+        self.library.add_book("Название книги", "Имя автора", 2024)
+        error = self.library.add_book("НАЗВАНИЕ КНИГИ", "имя автора", 2020)
+        self.assertEqual(error, "Книга с таким названием и автором уже существует в библиотеке.")
+        self.library.remove_book(self.library.books[0].id)
+        self.assertIsNone(self.library.add_book("НАЗВАНИЕ КНИГИ", "имя автора", 2020))
+
+    def test_ids_are_not_reused(self):
+        """
+        Проверяет, что ID удаленной книги не выдается повторно.
+        """
+        self.library.add_book("Первая книга", "Имя автора", 2020)
+        self.library.add_book("Вторая книга", "Имя автора", 2021)
+        self.library.remove_book(2)
+        self.library.add_book("Третья книга", "Имя автора", 2022)
+        self.assertEqual([book.id for book in self.library.books], [1, 3])
+        self.assertEqual(self.library.get_book_by_id(3).title, "Третья книга")
+
     def test_search_books(self):
         """
         Тестирует поиск книги по заданным критериям.
@@ -186,6 +207,25 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(len(books), 1)
         self.assertEqual(books[0]["title"], "Название книги")
 
+    def test_display_books_pages(self):
+        """
+        Проверяет постраничный вывод книг и сортировку по полям.
+        """
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        self.library.add_book("Бесы", "Фёдор Достоевский", 1872)
+        self.assertEqual([book["id"] for book in self.library.display_books()], [1, 2, 3])
+        self.assertEqual([book["id"] for book in self.library.display_books(1, 1)], [2])
+        self.assertEqual([book["title"] for book in self.library.display_books(sort_by="title")],
+                         ["Анна Каренина", "Бесы", "Война и мир"])
+        self.library.remove_book(3)
+        self.library.add_book("Детство", "Лев Толстой", 1852)
+        self.assertEqual([book.year for book in self.library.iter_books(sort_by="year", limit=2)], [1852, 1869])
+        self.assertEqual([book.year for book in self.library.iter_books(sort_by="year", descending=True)],
+                         [1877, 1869, 1852])
+        with self.assertRaises(ValueError):
+            list(self.library.iter_books(sort_by="status"))
+
 
 if __name__ == "__main__":
     unittest.main()
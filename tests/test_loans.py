@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from library.library import Library
+from library.loans import Loans
+
+
+class TestLoans(unittest.TestCase):
+    """
+    Набор тестов для выдачи книг читателям.
+    """
+
+    def setUp(self):
+        """
+        Создает библиотеку из трех книг во временном каталоге.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+        self.library = Library(self.data_file)
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.add_book("Идиот", "Федор Достоевский", 1869)
+        self.library.add_book("Бесы", "Федор Достоевский", 1872)
+
+    def tearDown(self):
+        self.library.close()
+        self.tmp_dir.cleanup()
+
+    def test_file_created_only_on_checkout(self):
+        """
+        Проверяет, что журнал выдач не создается, пока книги не выдаются.
+        """
+        self.library.update_status(1, "выдана")
+        self.library.update_status(1, "в наличии")
+        self.assertEqual(self.library.overdue(), [])
+        self.assertFalse(os.path.exists(self.library.loans_file))
+
+        self.assertIsNone(self.library.checkout(1, "Иванов"))
+        self.assertTrue(os.path.exists(self.library.loans_file))
+
+    def test_checkout_and_return_keep_status(self):
+        """
+        Проверяет согласованность статуса книги с выдачами, в том числе через update_status.
+        """
+        self.assertEqual(self.library.checkout(1, " "), "Укажите читателя.")
+        self.assertIsNone(self.library.checkout(1, "Иванов"))
+        self.assertEqual(self.library.get_book_by_id(1).status, "выдана")
+        self.assertEqual(self.library.checkout(1, "Петров"), "Книга уже выдана.")
+        self.assertEqual(self.library.return_book(2), "Книга не выдана.")
+
+        self.assertIsNone(self.library.return_book(1))
+        self.assertEqual(self.library.get_book_by_id(1).status, "в наличии")
+        self.assertEqual(self.library.loans_of("Иванов"), [])
+
+        self.library.checkout(2, "Иванов")
+        self.library.update_status(2, "в наличии")
+        self.library.checkout(3, "Иванов")
+        self.library.remove_book(3)
+        self.assertIsNone(self.library.loans.get(2))
+        self.assertEqual([(loan.book_id, loan.returned is not None) for loan in self.library.loans_of("Иванов", True)],
+                         [(1, True), (2, True), (3, True)])
+
+    def test_overdue_and_patron_index(self):
+        """
+        Проверяет поиск просроченных выдач по сроку и выдач читателя, в том числе после перезагрузки.
+        """
+        self.library.checkout(1, "Иванов", due=date(2024, 3, 1))
+        self.library.checkout(2, "Петров", due=date(2024, 2, 1))
+        self.library.checkout(3, "Иванов", due=date(2024, 5, 1))
+
+        self.assertEqual([loan.book_id for loan in self.library.overdue(date(2024, 4, 1))], [2, 1])
+        self.assertEqual([loan.book_id for loan in self.library.overdue(date(2024, 3, 1))], [2])
+        self.library.return_book(2)
+        self.assertEqual([loan.book_id for loan in self.library.overdue(date(2024, 4, 1))], [1])
+
+        reloaded = Library(self.data_file)
+        self.assertEqual([loan.book_id for loan in reloaded.loans_of("Иванов")], [1, 3])
+        self.assertEqual([loan.book_id for loan in reloaded.overdue(date(2025, 1, 1))], [1, 3])
+        self.assertEqual(reloaded.loans_of("Петров", history=True)[0].to_dict()["due"], "2024-02-01")
+        reloaded.close()
+
+    def test_deferred_loans_saved_with_status(self):
+        """
+        Проверяет, что при отложенном сохранении выдача записывается вместе со статусом книги,
+        а выдачи книг в наличии не учитываются.
+        """
+        library = Library(self.data_file, persistence="on_exit")
+        self.assertIsNone(library.checkout(1, "Иванов", due=date(2024, 3, 1)))
+        self.assertEqual([loan.book_id for loan in library.loans_of("Иванов")], [1])
+        self.assertFalse(os.path.exists(library.loans_file))
+        crashed = Library(self.data_file)
+        self.assertEqual(crashed.get_book_by_id(1).status, "в наличии")
+        self.assertEqual(crashed.loans_of("Иванов"), [])
+
+        library.close()
+        reloaded = Library(self.data_file)
+        self.assertEqual(reloaded.get_book_by_id(1).status, "выдана")
+        self.assertEqual([loan.book_id for loan in reloaded.overdue(date(2024, 4, 1))], [1])
+
+        reloaded.loans.checkout(2, "Иванов", due=date(2024, 3, 1))
+        self.assertEqual([loan.book_id for loan in reloaded.loans_of("Иванов")], [1])
+        self.assertEqual([loan.book_id for loan in reloaded.overdue(date(2024, 4, 1))], [1])
+        self.assertIsNone(reloaded.return_book(1))
+        self.assertEqual(reloaded.overdue(date(2024, 4, 1)), [])
+        reloaded.close()
+        crashed.close()
+
+    def test_other_writer_is_seen(self):
+        """
+        Проверяет, что выдачи, дописанные другим экземпляром, подгружаются из журнала.
+        """
+        first = Loans(os.path.join(self.tmp_dir.name, "shared.loans"))
+        second = Loans(first.path)
+        first.checkout(7, "Иванов", due=date(2024, 1, 10))
+        self.assertEqual(second.get(7).patron, "Иванов")
+        second.check_in(7)
+        self.assertIsNone(first.get(7))
+        self.assertEqual(list(first.overdue(date(2024, 2, 1))), [])
+        first.close()
+        second.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+
+from library.library import Library
+from library.metrics import metrics, profile_session, write_metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Набор тестов для сбора метрик и профилирования.
+    """
+
+    def setUp(self):
+        """
+        Создает библиотеку во временном каталоге и очищает метрики.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+        self.library = Library(self.data_file)
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+        self.tmp_dir.cleanup()
+
+    def test_disabled_collects_nothing(self):
+        """
+        Проверяет, что при выключенном сборе метрики не накапливаются.
+        """
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.assertEqual(metrics.snapshot(), {"counters": {}, "histograms": {}})
+
+    def test_calls_bytes_and_search_sizes(self):
+        """
+        Проверяет подсчет вызовов, записанных байтов и размеров результатов поиска.
+        """
+        metrics.enable()
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        written = os.path.getsize(self.data_file)
+        self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        written += os.path.getsize(self.data_file)
+        self.library.search_books(mode="token", author="толстой")
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"]['calls_total{operation="add_book"}'], 2)
+        self.assertEqual(snapshot["counters"]['bytes_written_total{target="snapshot"}'], written)
+        search_sizes = snapshot["histograms"]['search_results{mode="token"}']
+        self.assertEqual((search_sizes["count"], search_sizes["sum"]), (1, 2))
+        self.assertEqual(snapshot["histograms"]['duration_seconds{operation="add_book"}']["buckets"]["+Inf"], 2)
+
+    def test_export_formats(self):
+        """
+        Проверяет экспорт метрик в JSON и в текстовый формат Prometheus.
+        """
+        metrics.enable()
+        self.assertEqual(self.library.remove_book(1), "Библиотека пуста.")
+        metrics.disable()
+
+        prometheus = metrics.to_prometheus()
+        self.assertIn('library_calls_total{operation="remove_book"} 1', prometheus)
+        self.assertIn('library_duration_seconds_bucket{operation="remove_book",le="+Inf"} 1', prometheus)
+        self.assertIn('library_duration_seconds_count{operation="remove_book"} 1', prometheus)
+
+        json_path = os.path.join(self.tmp_dir.name, "metrics.json")
+        write_metrics(json_path)
+        with open(json_path, "r", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), metrics.snapshot())
+
+    def test_profile_session_writes_reports(self):
+        """
+        Проверяет, что профилирование сеанса создает отчеты.
+        """
+        reports = os.path.join(self.tmp_dir.name, "profile")
+        with profile_session(reports):
+            self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.assertEqual(sorted(os.listdir(reports)), ["memory.txt", "profile.pstats", "profile.txt"])
+
+
+if __name__ == '__main__':
+    unittest.main()
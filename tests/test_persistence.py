@@ -0,0 +1,147 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from library.library import Library
+from library.storage import JsonStorage
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FailingStorage(JsonStorage):
+    """
+    Хранилище, в котором первая запись изменений завершается ошибкой.
+    """
+
+    def __init__(self, data_file: str):
+        super().__init__(data_file)
+        self.fail = True
+
+    def commit(self, ops, books):
+        if self.fail:
+            self.fail = False
+            raise OSError("диск недоступен")
+        super().commit(ops, books)
+
+
+class TestPersistence(unittest.TestCase):
+    """
+    Набор тестов для режимов отложенного сохранения библиотеки.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def stored_titles(self):
+        with open(self.data_file, encoding="utf-8") as file:
+            return [book["title"] for book in json.load(file)]
+
+    def test_on_exit_writes_only_on_flush(self):
+        """
+        Проверяет, что режим "on_exit" не пишет на диск до flush и не пишет без изменений.
+        """
+        library = Library(self.data_file, persistence="on_exit")
+        library.flush()
+        self.assertFalse(os.path.exists(self.data_file))
+
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.update_status(1, "выдана")
+        self.assertTrue(library.dirty)
+        self.assertFalse(os.path.exists(self.data_file))
+        library.close()
+        self.assertFalse(library.dirty)
+        self.assertEqual(self.stored_titles(), ["Война и мир"])
+
+    def test_debounced_flushes_in_background(self):
+        """
+        Проверяет сохранение в фоне после задержки и сразу после flush_every изменений.
+        """
+        library = Library(self.data_file, persistence="debounced", flush_delay=0.05, flush_every=3)
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.assertFalse(os.path.exists(self.data_file))
+        deadline = time.monotonic() + 5
+        while library.dirty and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.stored_titles(), ["Война и мир"])
+
+        library.add_books({"title": f"Книга {number}", "author": "Автор", "year": 2000} for number in range(3))
+        self.assertFalse(library.dirty)
+        self.assertEqual(len(self.stored_titles()), 4)
+        library.close()
+
+    def test_failed_flush_keeps_changes(self):
+        """
+        Проверяет, что изменения и выдачи, которые не удалось записать, остаются в очереди до следующего flush.
+        """
+        library = Library(self.data_file, storage=FailingStorage(self.data_file), persistence="on_exit")
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.checkout(1, "Иванов")
+        with self.assertRaises(OSError):
+            library.flush()
+        self.assertTrue(library.dirty)
+        self.assertFalse(os.path.exists(library.loans_file))
+        library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        library.close()
+        self.assertFalse(library.dirty)
+        self.assertEqual(self.stored_titles(), ["Война и мир", "Анна Каренина"])
+        reloaded = Library(self.data_file)
+        self.assertEqual(reloaded.get_book_by_id(1).status, "выдана")
+        self.assertEqual([loan.book_id for loan in reloaded.loans_of("Иванов")], [1])
+        reloaded.close()
+
+    def test_shared_requires_immediate(self):
+        """
+        Проверяет, что отложенное сохранение нельзя совместить с shared=True.
+        """
+        with self.assertRaises(ValueError):
+            Library(self.data_file, shared=True, persistence="debounced")
+        with self.assertRaises(ValueError):
+            Library(self.data_file, persistence="later")
+
+    def test_exit_saves_dropped_library(self):
+        """
+        Проверяет, что при выходе сохраняются изменения библиотеки, на которую не осталось ссылок.
+        """
+        code = (
+            "import gc, sys\n"
+            f"sys.path.insert(0, {ROOT!r})\n"
+            "from library.library import Library\n"
+            f"Library({self.data_file!r}, persistence='on_exit').add_book('Война и мир', 'Лев Толстой', 1869)\n"
+            "gc.collect()\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True, timeout=30)
+        self.assertEqual(self.stored_titles(), ["Война и мир"])
+
+    def test_sigterm_saves_pending_changes(self):
+        """
+        Проверяет сохранение несохраненных изменений при завершении процесса по SIGTERM.
+        """
+        code = (
+            "import sys, time\n"
+            f"sys.path.insert(0, {ROOT!r})\n"
+            "from library.library import Library\n"
+            f"library = Library({self.data_file!r}, persistence='on_exit')\n"
+            "library.add_book('Война и мир', 'Лев Толстой', 1869)\n"
+            "print('ready', flush=True)\n"
+            "time.sleep(30)\n"
+        )
+        process = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE)
+        self.assertEqual(process.stdout.readline().strip(), b"ready")
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=10)
+        process.stdout.close()
+        self.assertEqual(self.stored_titles(), ["Война и мир"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import unittest
+
+from library.book import Book
+from library.library import Library
+from library.query import Columns, Eq, In, Range, numpy
+
+
+BOOKS = [
+    Book(1, "Война и мир", "Лев Толстой", 1869, "в наличии"),
+    Book(2, "Анна Каренина", "Лев Толстой", 1877, "выдана"),
+    Book(3, "Преступление и наказание", "Федор Достоевский", 1866, "в наличии"),
+    Book(4, "Идиот", "Федор Достоевский", 1869, "выдана"),
+    Book(5, "Мастер и Маргарита", "Михаил Булгаков", 1967, "в наличии"),
+    Book(6, "Отцы и дети", "Иван Тургенев", 1862, "в наличии"),
+]
+
+
+class TestColumns(unittest.TestCase):
+    """
+    Набор тестов для выполнения запросов по столбцам (маски - строки байтов).
+    """
+    use_numpy = False
+
+    def setUp(self):
+        """
+        Создает снимок тестовых книг.
+        """
+        self.columns = Columns(BOOKS, use_numpy=self.use_numpy, keep_books=True)
+
+    def test_filters(self):
+        """
+        Проверяет равенство, списки значений, диапазоны и их сочетания.
+        """
+        self.assertEqual(self.columns.select(Eq("author", "лев толстой")), [1, 2])
+        self.assertEqual(self.columns.select(In("status", ["выдана", "списана"])), [2, 4])
+        self.assertEqual(self.columns.select(Range("year", 1866, 1869)), [1, 3, 4])
+        self.assertEqual(self.columns.select(Range("year", low=1900)), [5])
+        self.assertEqual(self.columns.select(Range("year", 1860, 1870) & Eq("status", "в наличии")), [1, 3, 6])
+        self.assertEqual(self.columns.select(Eq("author", "Михаил Булгаков") | Eq("year", 1877)), [2, 5])
+        self.assertEqual(self.columns.select(~Eq("status", "в наличии") & ~Eq("author", "Лев Толстой")), [4])
+        self.assertEqual(self.columns.select(Eq("title", "Нет такой")), [])
+        self.assertEqual(self.columns.count(), 6)
+
+    def test_plan_starts_with_most_selective(self):
+        """
+        Проверяет, что условия И выполняются начиная с самого избирательного.
+        """
+        plan = self.columns.plan(Eq("status", "в наличии") & Range("year", 1860, 1870) & Eq("title", "Идиот"))
+        self.assertEqual([estimate for _, estimate in plan], [1, 4, 4])
+        self.assertEqual(repr(plan[0][0]), "Eq('title', 'Идиот')")
+
+    def test_count_by(self):
+        """
+        Проверяет агрегаты по статусу, автору и десятилетию.
+        """
+        self.assertEqual(self.columns.count_by("status"), {"в наличии": 4, "выдана": 2})
+        self.assertEqual(self.columns.count_by("decade"), {1860: 4, 1870: 1, 1960: 1})
+        self.assertEqual(self.columns.count_by("author", Range("year", high=1869)),
+                         {"Иван Тургенев": 1, "Лев Толстой": 1, "Федор Достоевский": 2})
+        with self.assertRaises(ValueError):
+            self.columns.count_by("title")
+        with self.assertRaises(ValueError):
+            Eq("publisher", "АСТ")
+
+    def test_changes_in_place(self):
+        """
+        Проверяет, что добавление, удаление и изменение статуса дают тот же результат, что и новый снимок.
+        """
+        where = Eq("status", "выдана") | Eq("author", "Иван Тургенев")
+        self.assertEqual(self.columns.select(where), [2, 4, 6])
+        self.columns.update(1, "status", "выдана")
+        self.columns.update(4, "status", "списана")
+        self.columns.remove(6)
+        self.columns.add(Book(7, "Бесы", "Федор Достоевский", 1872, "выдана"))
+        books = [Book(1, "Война и мир", "Лев Толстой", 1869, "выдана"), BOOKS[1], BOOKS[2],
+                 Book(4, "Идиот", "Федор Достоевский", 1869, "списана"), BOOKS[4],
+                 Book(7, "Бесы", "Федор Достоевский", 1872, "выдана")]
+        fresh = Columns(books, use_numpy=self.use_numpy)
+        for predicate in (where, ~Eq("status", "выдана"), Range("year", 1860, 1875) & ~Eq("author", "Лев Толстой"),
+                          In("status", ["выдана", "списана"]), None):
+            self.assertEqual(self.columns.select(predicate), fresh.select(predicate))
+            self.assertEqual(self.columns.count(predicate), fresh.count(predicate))
+            self.assertEqual([book.id for book in self.columns.select_books(predicate)], fresh.select(predicate))
+        self.assertEqual(self.columns.count_by("status"), fresh.count_by("status"))
+        self.assertEqual(self.columns.count_by("decade", ~Eq("status", "выдана")),
+                         fresh.count_by("decade", ~Eq("status", "выдана")))
+
+    def test_changes_before_first_query(self):
+        """
+        Проверяет, что удаленные до первого запроса книги не попадают в результат,
+        а многократные изменения одной книги не искажают его.
+        """
+        self.columns.remove(2)
+        self.columns.update(1, "author", "Иван Тургенев")
+        self.assertEqual(self.columns.select(Eq("author", "лев толстой")), [])
+        self.assertEqual(self.columns.select(In("author", ["Лев Толстой", "Иван Тургенев"])), [1, 6])
+        for _ in range(10):
+            self.columns.update(3, "year", 1877)
+            self.columns.update(3, "year", 1866)
+            self.assertEqual(self.columns.select(In("year", [1866, 1877])), [3])
+        self.columns.remove(3)
+        self.assertEqual(self.columns.select(In("year", [1866, 1877, 1869])), [1, 4])
+
+
+@unittest.skipIf(numpy is None, "NumPy не установлен")
+class TestColumnsNumpy(TestColumns):
+    """
+    Те же тесты для масок NumPy.
+    """
+    use_numpy = True
+
+
+class TestLibraryQuery(unittest.TestCase):
+    """
+    Набор тестов для запросов через Library.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.library = Library(os.path.join(self.tmp_dir.name, "library.json"))
+        self.library.books = [Book(book.id, book.title, book.author, book.year, book.status) for book in BOOKS]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_query_follows_changes(self):
+        """
+        Проверяет, что запросы учитывают изменения книг после построения столбцов.
+        """
+        self.assertEqual([book.id for book in self.library.query(Eq("status", "выдана"))], [2, 4])
+        columns = self.library._columns
+        self.library.update_status(1, "выдана")
+        self.library.remove_book(2)
+        self.library.add_book("Бесы", "Федор Достоевский", 1872, "выдана")
+        self.assertEqual([book.id for book in self.library.query(Eq("status", "выдана"))], [1, 4, 7])
+        self.assertIs(self.library._columns, columns)
+        self.assertEqual(self.library.count_by("author", Eq("status", "выдана")),
+                         {"Лев Толстой": 1, "Федор Достоевский": 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from library.library import Library
+from library.query import Eq
+from library.rwlock import RWLock
+from library.sqlite_storage import SqliteStorage
+
+
+class SlowSqliteStorage(SqliteStorage):
+    """
+    Хранилище SQLite, которое сообщает о начале записи и записывает изменения с задержкой.
+    """
+
+    def __init__(self, db_file: str):
+        super().__init__(db_file)
+        self.writing = threading.Event()
+
+    def commit(self, ops, books):
+        self.writing.set()
+        time.sleep(0.2)
+        super().commit(ops, books)
+
+
+class TestRWLock(unittest.TestCase):
+    """
+    Набор тестов для блокировки "много читателей или один писатель".
+    """
+
+    def test_readers_run_in_parallel(self):
+        """
+        Проверяет, что несколько потоков одновременно находятся под блокировкой чтения.
+        """
+        lock = RWLock()
+        barrier = threading.Barrier(4, timeout=5)
+        errors = []
+
+        def read():
+            with lock.read():
+                try:
+                    barrier.wait()
+                except threading.BrokenBarrierError as error:
+                    errors.append(error)
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_writer_is_exclusive_and_preferred(self):
+        """
+        Проверяет, что писатель ждет читателей, а новые читатели ждут ожидающего писателя.
+        """
+        lock = RWLock()
+        events = []
+        reading = threading.Event()
+        release = threading.Event()
+
+        def first_reader():
+            with lock.read():
+                reading.set()
+                release.wait(5)
+                events.append("первый читатель")
+
+        def write():
+            with lock.write():
+                events.append("писатель")
+
+        def second_reader():
+            with lock.read():
+                events.append("второй читатель")
+
+        threads = [threading.Thread(target=first_reader)]
+        threads[0].start()
+        reading.wait(5)
+        threads.append(threading.Thread(target=write))
+        threads[1].start()
+        while not lock._writers_waiting:
+            time.sleep(0.001)
+        threads.append(threading.Thread(target=second_reader))
+        threads[2].start()
+        time.sleep(0.05)
+        self.assertEqual(events, [])
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(events, ["первый читатель", "писатель", "второй читатель"])
+
+    def test_reentrancy(self):
+        """
+        Проверяет повторный вход и запрет получения записи под блокировкой чтения.
+        """
+        lock = RWLock()
+        with lock.write():
+            with lock.write(), lock.read():
+                self.assertTrue(lock.held())
+        with lock.read():
+            with lock.read():
+                self.assertTrue(lock.held())
+            with self.assertRaises(RuntimeError):
+                with lock.write():
+                    pass
+        self.assertFalse(lock.held())
+
+
+class TestThreadSafeLibrary(unittest.TestCase):
+    """
+    Нагрузочный тест библиотеки, используемой из нескольких потоков.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+        self.tmp_dir.cleanup()
+
+    def test_concurrent_writers_and_readers(self):
+        """
+        Проверяет, что при одновременной записи и чтении не теряются изменения и не повторяются ID.
+        """
+        library = Library(self.data_file, storage_mode="journal")
+        writers, books_per_writer = 6, 100
+        authors = ["Лев Толстой", "Антон Чехов", "Иван Бунин", "Федор Достоевский", "Николай Гоголь", "Иван Тургенев"]
+        errors = []
+        stop = threading.Event()
+
+        def write(number):
+            try:
+                for index in range(books_per_writer):
+                    self.assertIsNone(library.add_book(f"Книга {number}-{index}", authors[number], 2000))
+                    if index % 10 == 0:
+                        book = library.search_books(title=f"Книга {number}-{index}")[0]
+                        library.update_status(book.id, "выдана")
+            except Exception as error:
+                errors.append(error)
+
+        def read():
+            try:
+                while not stop.is_set():
+                    library.search_books("prefix", author="иван")
+                    ids = [book.id for book in library.iter_books(sort_by="id")]
+                    self.assertEqual(ids, sorted(set(ids)))
+                    library.count_by("status")
+            except Exception as error:
+                errors.append(error)
+
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        threads = [threading.Thread(target=write, args=(number,)) for number in range(writers)]
+        for thread in readers + threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+        self.assertEqual(errors, [])
+
+        total = writers * books_per_writer
+        expected = {book.id: book.status for book in library.books}
+        self.assertEqual(sorted(expected), list(range(1, total + 1)))
+        self.assertEqual(list(expected.values()).count("выдана"), total // 10)
+        library.close()
+        reloaded = Library(self.data_file, storage_mode="journal")
+        self.assertEqual({book.id: book.status for book in reloaded.books}, expected)
+
+    def test_concurrent_queries_build_columns_once(self):
+        """
+        Проверяет, что одновременные запросы не видят частично построенные столбцы и маски.
+        """
+        library = Library(self.data_file, storage_mode="journal", persistence="on_exit")
+        with library.batch():
+            for number in range(3000):
+                library.add_book(f"Книга {number}", "Лев Толстой" if number % 2 else "Антон Чехов",
+                                 1869 if number % 3 else 1870)
+        where = Eq("author", "Лев Толстой") & Eq("year", 1869)
+        expected = len(library.query(where))
+        errors = []
+
+        def query():
+            try:
+                self.assertEqual(len(library.query(where)), expected)
+            except Exception as error:
+                errors.append(error)
+
+        for _ in range(20):
+            library.update_status(1, "выдана")
+            library.update_status(1, "в наличии")
+            library.query(Eq("status", "выдана"))
+            threads = [threading.Thread(target=query) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+                time.sleep(0.0005)
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        library.close()
+
+
+    def test_concurrent_first_fuzzy_searches(self):
+        """
+        Проверяет, что первые нечеткие запросы из нескольких потоков не видят частично построенный индекс триграмм.
+        """
+        library = Library(self.data_file, persistence="on_exit", cache_size=0)
+        with library.batch():
+            for number in range(2000):
+                library.add_book(f"Повесть {number} слово{number}", "Лев Толстой" if number % 2 else "Антон Чехов",
+                                 1900)
+        expected = len(library.search_books("fuzzy", author="толстй"))
+        errors = []
+
+        def search():
+            try:
+                self.assertEqual(len(library.search_books("fuzzy", author="толстй")), expected)
+            except Exception as error:
+                errors.append(error)
+
+        for _ in range(5):
+            library._index._trigrams = None
+            threads = [threading.Thread(target=search) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        library.close()
+
+    def test_search_during_commit_uses_memory(self):
+        """
+        Проверяет, что поиск во время записи в SQLite не обращается к базе без этой записи
+        и не кэширует результат.
+        """
+        db_file = os.path.join(self.tmp_dir.name, "library.db")
+        storage = SlowSqliteStorage(db_file)
+        library = Library(db_file, storage=storage)
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        storage.writing.clear()
+
+        remover = threading.Thread(target=library.remove_book, args=(1,))
+        remover.start()
+        storage.writing.wait(5)
+        self.assertEqual([book.id for book in library.search_books(author="Лев Толстой")], [2])
+        remover.join()
+        storage.writing.clear()
+
+        adder = threading.Thread(target=library.add_book, args=("Воскресение", "Лев Толстой", 1899))
+        adder.start()
+        storage.writing.wait(5)
+        self.assertEqual([book.id for book in library.search_books(author="Лев Толстой")], [2, 3])
+        adder.join()
+        self.assertEqual([book.id for book in library.search_books(author="Лев Толстой")], [2, 3])
+        library.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+from library.book import Book
+from library.library import Library
+
+
+class TestSearchIndex(unittest.TestCase):
+    """
+    Набор тестов для поиска книг по инвертированному индексу.
+    """
+
+    def setUp(self):
+        """
+        Создает библиотеку с несколькими книгами без чтения файла.
+        """
+        self.library = Library("../test_library.json")
+        self.library.books = [
+            Book(1, "Война и мир", "Лев Толстой", 1869),
+            Book(2, "Анна Каренина", "Лев Толстой", 1877),
+            Book(3, "Детство", "Алексей Толстой", 1922),
+            Book(4, "Мир приключений", "Иван Иванов", 1950, "выдана"),
+        ]
+
+    def test_exact_mode_is_default(self):
+        """
+        Проверяет, что по умолчанию значение поля сравнивается целиком.
+        """
+        self.assertEqual(self.library.search_books(author="толст"), [])
+        results = self.library.search_books(author="лев толстой")
+        self.assertEqual([book.id for book in results], [1, 2])
+
+    def test_prefix_mode(self):
+        """
+        Проверяет поиск по началу слова.
+        """
+        results = self.library.search_books(mode="prefix", author="толст")
+        self.assertEqual([book.id for book in results], [1, 2, 3])
+        results = self.library.search_books(mode="prefix", author="тол лев")
+        self.assertEqual([book.id for book in results], [1, 2])
+
+    def test_token_and_substring_modes(self):
+        """
+        Проверяет поиск по словам и по подстроке с ранжированием результатов.
+        """
+        results = self.library.search_books(mode="token", title="мир")
+        self.assertEqual([book.id for book in results], [1, 4])
+        results = self.library.search_books(mode="substring", title="ар")
+        self.assertEqual([book.id for book in results], [2])
+        results = self.library.search_books(mode="substring", title="ир")
+        self.assertEqual({book.id for book in results}, {1, 4})
+
+    def test_criteria_are_combined(self):
+        """
+        Проверяет совместное использование критериев по разным полям.
+        """
+        results = self.library.search_books(mode="prefix", author="толст", year="1922")
+        self.assertEqual([book.id for book in results], [3])
+        results = self.library.search_books(mode="prefix", title="мир", status="выдана")
+        self.assertEqual([book.id for book in results], [4])
+
+    def test_index_follows_mutations(self):
+        """
+        Проверяет, что индекс обновляется при добавлении и удалении книг.
+        """
+        self.library.remove_book(3)
+        self.assertEqual([book.id for book in self.library.search_books(mode="prefix", author="алекс")], [])
+        self.library.add_book("Хождение по мукам", "Алексей Толстой", 1941)
+        results = self.library.search_books(mode="prefix", author="алекс")
+        self.assertEqual([book.title for book in results], ["Хождение по мукам"])
+
+    def test_fuzzy_mode(self):
+        """
+        Проверяет поиск с опечатками, ранжирование по сходству и замену "ё" на "е".
+        """
+        self.library.books = self.library.books + [
+            Book(5, "Идиот", "Федор Достоевкий", 1869),
+            Book(6, "Ёлка", "Федор Достоевский", 1848),
+        ]
+        results = self.library.search_books(mode="fuzzy", author="Достоевский")
+        self.assertEqual([book.id for book in results], [6, 5])
+        self.assertEqual([book.id for book in self.library.search_books(mode="fuzzy", title="елка")], [6])
+        self.assertEqual([book.id for book in self.library.search_books(mode="fuzzy", author="лев толстй")], [1, 2])
+        self.assertEqual(self.library.search_books(mode="fuzzy", author="Пушкин"), [])
+
+    def test_fuzzy_index_follows_mutations(self):
+        """
+        Проверяет, что индекс триграмм обновляется после первого нечеткого поиска.
+        """
+        self.assertEqual(self.library.search_books(mode="fuzzy", title="приключенй"), [self.library.get_book_by_id(4)])
+        self.library.remove_book(4)
+        self.library.add_book("Приключения Тома Сойера", "Марк Твен", 1876)
+        self.assertEqual([book.title for book in self.library.search_books(mode="fuzzy", title="приключения")],
+                         ["Приключения Тома Сойера"])
+
+    def test_unknown_mode(self):
+        """
+        Проверяет ошибку при неизвестном режиме поиска.
+        """
+        with self.assertRaises(ValueError):
+            self.library.search_books(mode="regex", title="мир")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from library.library import Library
+from library.server import LibraryServer
+from library.storage import JsonStorage
+
+
+class CountingStorage(JsonStorage):
+    """
+    Хранилище, подсчитывающее количество сохранений.
+    """
+
+    def __init__(self, data_file: str):
+        super().__init__(data_file)
+        self.commits = 0
+        self.delay = 0
+        self.writing = threading.Event()
+        self.fail = False
+
+    def commit(self, ops, books):
+        self.commits += 1
+        self.writing.set()
+        if self.fail:
+            self.fail = False
+            raise RuntimeError("диск недоступен")
+        time.sleep(self.delay)
+        super().commit(ops, books)
+
+
+class TestLibraryServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Набор тестов для асинхронного сервера библиотеки.
+    """
+
+    async def asyncSetUp(self):
+        """
+        Запускает сервер на свободном порту с библиотекой во временном каталоге.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+        self.storage = CountingStorage(self.data_file)
+        self.server = LibraryServer(Library(self.data_file, storage=self.storage))
+        await self.server.start("127.0.0.1", 0)
+        self.reader, self.writer = await asyncio.open_connection(*self.server.address[:2])
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.server.stop()
+        self.tmp_dir.cleanup()
+
+    async def request(self, **request):
+        """Отправляет запрос и возвращает ответ сервера."""
+        self.writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def test_read_and_write_requests(self):
+        """
+        Проверяет добавление, поиск, изменение статуса и список книг через сервер.
+        """
+        self.assertEqual(await self.request(op="add", title="Война и мир", author="Лев Толстой", year=1869),
+                         {"ok": True, "result": None})
+        response = await self.request(op="add", title="Война и мир", author="Лев Толстой", year=1869)
+        self.assertFalse(response["ok"])
+        await self.request(op="add", title="Анна Каренина", author="Лев Толстой", year=1877)
+        self.assertEqual((await self.request(op="status", id=2, status="выдана"))["ok"], True)
+
+        response = await self.request(op="search", mode="prefix", criteria={"title": "анна"})
+        self.assertEqual([book["status"] for book in response["result"]], ["выдана"])
+        response = await self.request(op="list", sort_by="title", limit=1)
+        self.assertEqual([book["id"] for book in response["result"]], [2])
+        self.assertEqual((await self.request(op="get", id=5))["result"], None)
+        self.assertFalse((await self.request(op="drop"))["ok"])
+        self.assertEqual(len(Library(self.data_file).books), 2)
+
+    async def test_concurrent_writes_are_coalesced(self):
+        """
+        Проверяет, что одновременные изменения сохраняются меньшим числом записей.
+        """
+        requests = [self.server.dispatch(json.dumps({"op": "add", "title": f"Книга {number}", "author": "Автор",
+                                                     "year": 2000}).encode("utf-8"))
+                    for number in range(50)]
+        responses = await asyncio.gather(*requests)
+        self.assertTrue(all(response["ok"] for response in responses))
+        self.assertLess(self.storage.commits, 50)
+        self.assertEqual(len(Library(self.data_file).books), 50)
+
+    async def test_reads_do_not_wait_for_disk(self):
+        """
+        Проверяет, что запрос на чтение выполняется, пока изменение записывается на диск.
+        """
+        await self.request(op="add", title="Война и мир", author="Лев Толстой", year=1869)
+        self.storage.delay = 1
+        self.storage.writing.clear()
+        write = asyncio.create_task(self.request(op="status", id=1, status="выдана"))
+        await asyncio.get_running_loop().run_in_executor(None, self.storage.writing.wait, 5)
+        start = time.perf_counter()
+        response = await self.server.dispatch(b'{"op": "get", "id": 1}')
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(response["result"]["status"], "выдана")
+        self.assertTrue((await write)["ok"])
+
+    async def test_invalid_requests_do_not_stop_writer(self):
+        """
+        Проверяет, что запрос с полями неверного типа и ошибка сохранения не останавливают запись.
+        """
+        response = await asyncio.wait_for(self.request(op="add", title=1, author="Лев Толстой", year=1869), 5)
+        self.assertEqual(response, {"ok": False, "error": "Некорректный запрос: поле title должно быть строкой"})
+        self.assertFalse((await asyncio.wait_for(self.request(op="status", id="1", status="выдана"), 5))["ok"])
+
+        self.storage.fail = True
+        response = await asyncio.wait_for(self.request(op="add", title="Идиот", author="Федор Достоевский",
+                                                       year=1869), 5)
+        self.assertEqual(response, {"ok": False, "error": "Ошибка сохранения: диск недоступен"})
+        response = await asyncio.wait_for(self.request(op="add", title="Бесы", author="Федор Достоевский",
+                                                       year=1872), 5)
+        self.assertTrue(response["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from library.book import Book
+from library.library import Library
+from library.sharded import ShardedLibrary
+
+
+class TestShardedLibrary(unittest.TestCase):
+    """
+    Набор тестов для каталога из нескольких библиотек-шардов.
+    """
+
+    def setUp(self):
+        """
+        Создает два файла филиалов с пересекающимися локальными ID.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.files = {name: os.path.join(self.tmp_dir.name, f"{name}.json") for name in ("центр", "север")}
+        center = Library(self.files["центр"])
+        center.add_book("Война и мир", "Лев Толстой", 1869)
+        center.add_book("Идиот", "Федор Достоевский", 1869)
+        north = Library(self.files["север"])
+        north.add_book("Анна Каренина", "Лев Толстой", 1877)
+        north.add_book("Бесы", "Федор Достоевский", 1872)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_global_ids_and_routing(self):
+        """
+        Проверяет уникальные глобальные ID и направление изменений в нужный шард.
+        """
+        library = ShardedLibrary(self.files)
+        self.assertEqual(library.get_book_by_id(3).title, "Идиот")
+        self.assertEqual(library._shards, [library.shard("центр"), None])
+        self.assertEqual([book.id for book in library.iter_books()], [1, 2, 3, 4])
+        self.assertEqual(library.get_book_by_id(2).title, "Анна Каренина")
+
+        self.assertIsNone(library.add_book("Отцы и дети", "Иван Тургенев", 1862, branch="север"))
+        self.assertEqual(library.get_book_by_id(6).title, "Отцы и дети")
+        self.assertIsNone(library.update_status(6, "выдана"))
+        self.assertIsNone(library.remove_book(1))
+        self.assertEqual(library.remove_book(1), "Книги с заданным ID не существует.")
+        self.assertEqual(library.remove_book("1"), "ID книги должен быть положительным числом.")
+        with self.assertRaises(KeyError):
+            library.get_book_by_id(1)
+        self.assertEqual([(book.id, book.status) for book in Library(self.files["север"]).books],
+                         [(1, "в наличии"), (2, "в наличии"), (3, "выдана")])
+
+    def test_hashed_routing_keeps_duplicates_in_one_shard(self):
+        """
+        Проверяет, что без филиала дубликат попадает в тот же шард и отклоняется.
+        """
+        library = ShardedLibrary([os.path.join(self.tmp_dir.name, f"{number}.json") for number in range(4)])
+        self.assertIsNone(library.add_book("Мастер и Маргарита", "Михаил Булгаков", 1967))
+        self.assertEqual(library.add_book("МАСТЕР И МАРГАРИТА", "михаил булгаков", 1967),
+                         "Книга с таким названием и автором уже существует в библиотеке.")
+
+    def test_search_and_listing_are_merged(self):
+        """
+        Проверяет объединение результатов поиска и страниц из всех шардов.
+        """
+        library = ShardedLibrary(self.files)
+        self.assertEqual([book.id for book in library.search_books(author="Лев Толстой")], [1, 2])
+        results = library.search_books(mode="fuzzy", author="Достоевкий")
+        self.assertEqual({book.title for book in results}, {"Идиот", "Бесы"})
+        self.assertEqual([book["title"] for book in library.display_books(1, 2, sort_by="title")],
+                         ["Бесы", "Война и мир"])
+        self.assertEqual([book.year for book in library.iter_books(0, 2, sort_by="year", descending=True)],
+                         [1877, 1872])
+
+    def test_parallel_search_sees_writes(self):
+        """
+        Проверяет поиск в пуле процессов, включая изменения, сделанные после запуска процессов.
+        """
+        library = ShardedLibrary(self.files, parallel=True)
+        try:
+            self.assertEqual([book.id for book in library.search_books(author="Лев Толстой")], [1, 2])
+            library.add_book("Детство", "Лев Толстой", 1852, branch="север")
+            self.assertEqual([book.id for book in library.search_books(author="Лев Толстой")], [1, 2, 6])
+            self.assertEqual(library.display_books(0, 1, sort_by="year"),
+                             [Book(6, "Детство", "Лев Толстой", 1852).to_dict()])
+        finally:
+            library.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from library.library import Library
+
+
+def add_books(data_file: str, prefix: str, count: int):
+    """Добавляет книги из отдельного процесса."""
+    library = Library(data_file, shared=True)
+    for number in range(count):
+        library.add_book(f"{prefix} {number}", "Автор", 2000)
+
+
+class TestSharedLibrary(unittest.TestCase):
+    """
+    Набор тестов для совместной работы нескольких процессов с одним файлом библиотеки.
+    """
+
+    def setUp(self):
+        """
+        Создает временный каталог для файлов библиотеки.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_changes_of_other_instance_are_merged(self):
+        """
+        Проверяет, что изменения другого экземпляра подгружаются перед записью и чтением.
+        """
+        first = Library(self.data_file, shared=True)
+        second = Library(self.data_file, shared=True)
+        first.add_book("Война и мир", "Лев Толстой", 1869)
+        self.assertIsNone(second.add_book("Анна Каренина", "Лев Толстой", 1877))
+        self.assertEqual([book.id for book in second.books], [1, 2])
+        self.assertEqual(second.add_book("Война и мир", "Лев Толстой", 1869),
+                         "Книга с таким названием и автором уже существует в библиотеке.")
+
+        self.assertTrue(first.refresh())
+        self.assertFalse(first.refresh())
+        self.assertEqual(len(first.books), 2)
+        first.update_status(2, "выдана")
+        self.assertEqual(second.get_book_by_id(2).status, "выдана")
+        first.remove_book(1)
+        self.assertEqual([book.id for book in second.search_books(author="Лев Толстой")], [2])
+        self.assertFalse(second.refresh())
+
+    def test_lazy_books_survive_rewrite_by_other_instance(self):
+        """
+        Проверяет, что ленивая загрузка читает книги после перезаписи файла другим экземпляром.
+        """
+        writer = Library(self.data_file, shared=True)
+        with writer.batch():
+            for number in range(30):
+                writer.add_book(f"Книга {number}", "Лев Толстой", 1869)
+        reader = Library(self.data_file, shared=True, lazy=True)
+        writer.update_status(1, "выдана")
+        writer.remove_book(2)
+        self.assertEqual(reader.get_book_by_id(20).title, "Книга 19")
+        self.assertEqual(reader.get_book_by_id(1).status, "выдана")
+        with self.assertRaises(KeyError):
+            reader.get_book_by_id(2)
+        reader.close()
+
+    def test_journal_tail_is_applied_without_full_read(self):
+        """
+        Проверяет, что в режиме журнала другой экземпляр применяет только новые записи журнала,
+        а после сжатия в снимок перечитывает хранилище целиком.
+        """
+        writer = Library(self.data_file, storage_mode="journal", shared=True, compact_every=5)
+        reader = Library(self.data_file, storage_mode="journal", shared=True, compact_every=5)
+        with mock.patch.object(Library, "_read_stored", side_effect=AssertionError("полное чтение")):
+            writer.add_book("Война и мир", "Лев Толстой", 1869)
+            writer.add_book("Анна Каренина", "Лев Толстой", 1877)
+            writer.update_status(1, "выдана")
+            self.assertEqual([(book.id, book.status) for book in reader.books], [])
+            self.assertTrue(reader.refresh())
+            self.assertEqual([(book.id, book.status) for book in reader.books], [(1, "выдана"), (2, "в наличии")])
+            self.assertIsNone(reader.add_book("Идиот", "Федор Достоевский", 1869))
+            self.assertEqual([book.id for book in writer.search_books(author="Федор Достоевский")], [3])
+        writer.remove_book(2)
+        writer.add_book("Бесы", "Федор Достоевский", 1872)
+        self.assertEqual([book.id for book in reader.books], [1, 2, 3])
+        self.assertTrue(reader.refresh())
+        self.assertEqual([book.id for book in reader.books], [1, 3, 4])
+        writer.close()
+        reader.close()
+
+    def test_concurrent_processes_do_not_lose_updates(self):
+        """
+        Проверяет, что одновременная запись из нескольких процессов не теряет книги.
+        """
+        processes = [multiprocessing.Process(target=add_books, args=(self.data_file, f"Книга {name}", 15))
+                     for name in "абвг"]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        books = Library(self.data_file).books
+        self.assertEqual(len(books), 60)
+        self.assertEqual(len({book.id for book in books}), 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from library.library import Library
+from library.sqlite_storage import migrate_json_to_sqlite
+
+
+class TestSqliteStorage(unittest.TestCase):
+    """
+    Набор тестов для хранения библиотеки в SQLite.
+    """
+
+    def setUp(self):
+        """
+        Создает библиотеку с базой SQLite во временном каталоге.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmp_dir.name, "library.db")
+        self.library = Library(self.db_file, storage_mode="sqlite")
+
+    def tearDown(self):
+        self.library.close()
+        self.tmp_dir.cleanup()
+
+    def test_mutations_are_persisted(self):
+        """
+        Проверяет, что изменения сохраняются построчно и восстанавливаются при загрузке.
+        """
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        self.library.update_status(1, "выдана")
+        self.library.remove_book(2)
+
+        reloaded = Library(self.db_file, storage_mode="sqlite")
+        self.assertEqual([book.to_dict() for book in reloaded.books],
+                         [{"id": 1, "title": "Война и мир", "author": "Лев Толстой", "year": 1869, "status": "выдана"}])
+        reloaded.close()
+        connection = sqlite3.connect(self.db_file)
+        self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        connection.close()
+
+    def test_search_is_pushed_down(self):
+        """
+        Проверяет точный поиск, выполняемый в SQLite.
+        """
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        self.assertEqual(self.library.storage.search({"author": "ЛЕВ ТОЛСТОЙ", "year": "1877"}), [2])
+        results = self.library.search_books(author="лев толстой")
+        self.assertEqual([book.id for book in results], [1, 2])
+        self.assertEqual(self.library.search_books(year="01869"), [])
+        results = self.library.search_books(mode="prefix", title="кар")
+        self.assertEqual([book.id for book in results], [2])
+
+    def test_migration_from_json(self):
+        """
+        Проверяет перенос книг из JSON-файла в базу SQLite.
+        """
+        json_file = os.path.join(self.tmp_dir.name, "library.json")
+        records = [
+            {"id": 1, "title": "Война и мир", "author": "Лев Толстой", "year": 1869, "status": "в наличии"},
+            {"id": 3, "title": "1984", "author": "Джордж Оруэлл", "year": 1949, "status": "выдана"},
+        ]
+        with open(json_file, "w", encoding="utf-8") as file:
+            json.dump(records, file, ensure_ascii=False)
+        db_file = os.path.join(self.tmp_dir.name, "migrated.db")
+        self.assertEqual(migrate_json_to_sqlite(json_file, db_file), 2)
+
+        library = Library(db_file, storage_mode="sqlite")
+        self.assertEqual([book.to_dict() for book in library.books], records)
+        library.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
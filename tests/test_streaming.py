@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from library.library import Library
+from library.streaming import LazyBooks, iter_json_array
+
+
+class TestStreaming(unittest.TestCase):
+    """
+    Набор тестов для потоковой и ленивой загрузки файла библиотеки.
+    """
+
+    def setUp(self):
+        """
+        Создает файл библиотеки из нескольких книг во временном каталоге.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "library.json")
+        self.records = [
+            {"id": 1, "title": "Война и мир", "author": "Лев Толстой", "year": 1869, "status": "в наличии"},
+            {"id": 3, "title": "1984", "author": "Джордж Оруэлл", "year": 1949, "status": "выдана"},
+            {"id": 2, "title": "Мастер и Маргарита", "author": "Михаил Булгаков", "year": 1967, "status": "в наличии"},
+        ]
+        with open(self.data_file, "w", encoding="utf-8") as file:
+            json.dump(self.records, file, ensure_ascii=False, indent=4)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_iter_json_array_small_chunks(self):
+        """
+        Проверяет разбор массива при чтении файла маленькими порциями.
+        """
+        with open(self.data_file, "r", encoding="utf-8") as file:
+            items = [item for _, _, item in iter_json_array(file, chunk_size=7)]
+        self.assertEqual(items, self.records)
+        self.assertEqual(list(iter_json_array(io.StringIO(" [ ] "))), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('[{"id": 1}, ')))
+
+    def test_lazy_books_reads_on_access(self):
+        """
+        Проверяет, что ленивое хранилище разбирает запись только при обращении.
+        """
+        books = LazyBooks(self.data_file)
+        self.assertEqual(len(books), 3)
+        self.assertEqual(books.max_id, 3)
+        self.assertEqual(books._loaded, {})
+        self.assertEqual(books[2].title, "Мастер и Маргарита")
+        self.assertEqual(list(books._loaded), [2])
+        self.assertNotIn(4, books)
+        books.close()
+
+    def test_lazy_library(self):
+        """
+        Проверяет операции библиотеки в ленивом режиме и сохранение изменений.
+        """
+        library = Library(self.data_file, lazy=True)
+        self.assertIsNone(library.update_status(1, "выдана"))
+        self.assertIsNone(library.remove_book(3))
+        self.assertEqual(library.add_book("Война и мир", "Лев Толстой", 1869),
+                         "Книга с таким названием и автором уже существует в библиотеке.")
+        self.assertIsNone(library.add_book("Анна Каренина", "Лев Толстой", 1877))
+        library.close()
+
+        reloaded = Library(self.data_file)
+        self.assertEqual([(book.id, book.status) for book in reloaded.books],
+                         [(1, "выдана"), (2, "в наличии"), (4, "в наличии")])
+
+
+if __name__ == "__main__":
+    unittest.main()
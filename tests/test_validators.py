@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+import validators
+from validators import ERROR_MESSAGES, BookValidator, current_year, validate_book_data
+
+
+class TestBookValidator(unittest.TestCase):
+    """
+    Набор тестов для проверки данных книг с кодами ошибок.
+    """
+
+    def setUp(self):
+        """
+        Создает проверку с одной существующей книгой.
+        """
+        self.validator = BookValidator()
+        self.validator.add("Война и мир", "Лев Толстой")
+
+    def test_error_codes(self):
+        """
+        Проверяет коды ошибок и соответствие сообщений validate_book_data.
+        """
+        cases = [
+            (("", " ", 0), "empty"),
+            (("Идиот", "", 1869), "missing"),
+            (("Идиот", "Федор Достоевский", 999), "year"),
+            (("Идиот", "Федор Достоевский", "1869"), "year"),
+            (("И", "Федор Достоевский", 1869), "title_length"),
+            (("Идиот", "Ф", 1869), "author_length"),
+            (("Идиот", "Федор Достоевский²", 1869), "author_digits"),
+            (("Идиот?", "Федор Достоевский", 1869), "invalid_chars"),
+            (("ВОЙНА И МИР", "лев толстой", 1869), "duplicate"),
+            (("Идиот", "Федор Достоевский", 1869), None),
+        ]
+        for (title, author, year), code in cases:
+            with self.subTest(title=title, author=author, year=year):
+                self.assertEqual(self.validator.check(title, author, year), code)
+                self.assertEqual(validate_book_data(title, author, year, self.validator.keys),
+                                 ERROR_MESSAGES[code] if code else None)
+        self.assertEqual(self.validator.check("Идиот", "Федор Достоевский", 1869, "списана"), "status")
+
+    def test_check_batch(self):
+        """
+        Проверяет пакетную проверку, включая дубликаты внутри пакета.
+        """
+        errors = self.validator.check_batch([
+            {"title": "Идиот", "author": "Федор Достоевский", "year": 1869},
+            {"title": "идиот", "author": "федор достоевский", "year": 1869},
+            {"title": "Война и мир", "author": "Лев Толстой", "year": 1869},
+            {"title": "Бесы", "year": 1872},
+            {"title": "Бесы", "author": "Федор Достоевский", "year": 1872, "status": "списана"},
+        ])
+        self.assertEqual(errors, [(2, "duplicate"), (3, "duplicate"), (4, "missing_field"), (5, "status")])
+        self.assertEqual(len(self.validator.keys), 1)
+
+    def test_current_year_is_cached(self):
+        """
+        Проверяет, что текущий год не вычисляется заново при каждой проверке.
+        """
+        current_year()
+        with mock.patch.object(validators, "datetime") as datetime_mock:
+            self.validator.check("Идиот", "Федор Достоевский", 1869)
+            datetime_mock.now.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
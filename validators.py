@@ -1,46 +1,181 @@
+import re
+import time
 from datetime import datetime
-from typing import List, Optional
-from library.book import Book
+from typing import Collection, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 
-def validate_book_data(title: str, author: str, year: int, books: List[Book]) -> Optional[str]:
+STATUSES = ("в наличии", "выдана")
+
+ERROR_MESSAGES: Dict[str, str] = {
+    "empty": "Укажите название книги, автора и год издания.",
+    "missing": "Все поля (название, автор, год) должны быть заполнены.",
+    "missing_field": "Отсутствует обязательное поле (title, author или year).",
+    "field_type": "Название книги и имя автора должны быть строками.",
+    "json": "Запись не является корректным JSON-объектом книги.",
+    "year": "Год издания должен быть 4-значным положительным числом и не превышать текущий год.",
+    "title_length": "Название книги должно содержать от 2 до 200 символов.",
+    "author_length": "Имя автора должно содержать от 2 до 100 символов.",
+    "author_digits": "Имя автора не должно содержать цифры.",
+    "invalid_chars": "Название книги или имя автора содержит недопустимые символы.",
+    "duplicate": "Книга с таким названием и автором уже существует в библиотеке.",
+    "status": "Статус книги должен быть 'в наличии' или 'выдана'.",
+    "patron": "Укажите читателя.",
+    "on_loan": "Книга уже выдана.",
+    "not_on_loan": "Книга не выдана.",
+}
+
+_INVALID_CHARS_RE = re.compile(r"[!@#$%^&*()_+=\[\]{}|;:'\",<>?/\\]")
+
+_current_year = 0
+_year_valid_until = 0.0
+
+
+def book_key(title: str, author: str) -> Tuple[str, str]:
+    """Возвращает ключ книги (название, автор) без учета регистра для поиска дубликатов."""
+    return title.casefold(), author.casefold()
+
+
+def current_year() -> int:
+    """Возвращает текущий год. Значение вычисляется заново только после наступления нового года."""
+    global _current_year, _year_valid_until
+    if time.time() >= _year_valid_until:
+        _current_year = datetime.now().year
+        _year_valid_until = datetime(_current_year + 1, 1, 1).timestamp()
+    return _current_year
+
+
+def check_book_data(title: str, author: str, year: int, existing_keys: Collection[Tuple[str, str]]) -> Optional[str]:
     """
-    Проверяет данные книги на корректность.
+    Проверяет данные книги и возвращает код ошибки из ERROR_MESSAGES или None.
 
-    Возвращает строку с описанием ошибки, если данные некорректны,
-    или None, если все проверки пройдены.
+    existing_keys - множество ключей book_key(...) книг, уже находящихся в библиотеке.
+    Значения None (например, из неполной строки импорта) считаются пустыми.
     """
-    if not title.strip() and not author.strip() and not year:
-        return "Укажите название книги, автора и год издания."
+    title_empty = title is None or isinstance(title, str) and not title.strip()
+    author_empty = author is None or isinstance(author, str) and not author.strip()
+    if title_empty and author_empty and not year:
+        return "empty"
 
-    if not title.strip() or not author.strip() or not year:
-        return "Все поля (название, автор, год) должны быть заполнены."
+    if title_empty or author_empty or not year:
+        return "missing"
 
-    current_year = datetime.now().year
+    if not isinstance(title, str) or not isinstance(author, str):
+        return "field_type"
 
-    if not isinstance(year, int) or year <= 0 or year < 1000 or year > current_year:
-        return "Год издания должен быть 4-значным положительным числом и не превышать текущий год."
+    if not isinstance(year, int) or year < 1000 or year > current_year():
+        return "year"
 
     if len(title) < 2 or len(title) > 200:
-        return "Название книги должно содержать от 2 до 200 символов."
+        return "title_length"
 
     if len(author) < 2 or len(author) > 100:
-        return "Имя автора должно содержать от 2 до 100 символов."
+        return "author_length"
 
-    if any(char.isdigit() for char in author):
-        return "Имя автора не должно содержать цифры."
+    if any(map(str.isdigit, author)):
+        return "author_digits"
 
-    invalid_chars = set("!@#$%^&*()_+=[]{}|;:'\",<>?/\\")
-    if any(char in invalid_chars for char in title) or any(char in invalid_chars for char in author):
-        return "Название книги или имя автора содержит недопустимые символы."
+    if _INVALID_CHARS_RE.search(title) or _INVALID_CHARS_RE.search(author):
+        return "invalid_chars"
 
-    if books:
-        if any(book.title.lower() == title.lower() and book.author.lower() == author.lower() for book in books):
-            return "Книга с таким названием и автором уже существует в библиотеке."
+    if book_key(title, author) in existing_keys:
+        return "duplicate"
 
     return None
 
 
+def validate_book_data(title: str, author: str, year: int, existing_keys: Collection[Tuple[str, str]]) -> Optional[str]:
+    """
+    Проверяет данные книги на корректность.
+
+    existing_keys - множество ключей book_key(...) книг, уже находящихся в библиотеке.
+
+    Возвращает строку с описанием ошибки, если данные некорректны,
+    или None, если все проверки пройдены.
+    """
+    code = check_book_data(title, author, year, existing_keys)
+    return ERROR_MESSAGES[code] if code else None
+
+
+class InvalidRow:
+    """
+    Строка импорта, которую не удалось разобрать; check_batch сообщает о ней кодом code.
+
+    Атрибуты:
+        code (str): Код ошибки из ERROR_MESSAGES.
+    """
+    __slots__ = ("code",)
+
+    def __init__(self, code: str):
+        self.code = code
+
+
+class BookValidator:
+    """
+    Проверка книг с поддерживаемым множеством ключей уже существующих книг.
+
+    Атрибуты:
+        keys (Set[Tuple[str, str]]): Ключи book_key(название, автор) существующих книг.
+    """
+
+    def __init__(self, keys: Optional[Set[Tuple[str, str]]] = None):
+        """
+        Аргументы:
+            keys (Set[Tuple[str, str]], optional): Ключи существующих книг; множество
+                используется напрямую, без копирования.
+        """
+        self.keys = keys if keys is not None else set()
+
+    def check(self, title: str, author: str, year: int, status: str = "в наличии") -> Optional[str]:
+        """Возвращает код ошибки из ERROR_MESSAGES или None."""
+        code = check_book_data(title, author, year, self.keys)
+        if code is None and status not in STATUSES:
+            return "status"
+        return code
+
+    def validate(self, title: str, author: str, year: int, status: str = "в наличии") -> Optional[str]:
+        """Возвращает описание ошибки или None."""
+        code = self.check(title, author, year, status)
+        return ERROR_MESSAGES[code] if code else None
+
+    def add(self, title: str, author: str):
+        """Запоминает ключ добавленной книги."""
+        self.keys.add(book_key(title, author))
+
+    def check_batch(self, rows: Iterable[Mapping]) -> List[Tuple[int, str]]:
+        """
+        Проверяет строки за один проход и возвращает пары (номер строки с 1, код ошибки).
+
+        Строки - словари с ключами title, author, year и необязательным status
+        или InvalidRow. Строка, которая не является словарем, получает код "field_type".
+        Дубликаты ищутся и среди существующих книг, и среди предыдущих строк;
+        множество keys при этом не изменяется.
+        """
+        errors = []
+        seen: Set[Tuple[str, str]] = set()
+        keys = self.keys
+        for number, row in enumerate(rows, start=1):
+            if not isinstance(row, Mapping):
+                errors.append((number, row.code if isinstance(row, InvalidRow) else "field_type"))
+                continue
+            try:
+                title, author, year = row["title"], row["author"], row["year"]
+            except KeyError:
+                errors.append((number, "missing_field"))
+                continue
+            code = check_book_data(title, author, year, ())
+            if code is None:
+                key = book_key(title, author)
+                if key in keys or key in seen:
+                    code = "duplicate"
+                elif (row.get("status") or "в наличии") not in STATUSES:
+                    code = "status"
+                else:
+                    seen.add(key)
+            if code:
+                errors.append((number, code))
+        return errors
+
+
 def validate_status(status: str) -> Optional[str]:
     """
     Проверяет статус книги на корректность.
@@ -48,20 +183,23 @@ def validate_status(status: str) -> Optional[str]:
     Возвращает строку с описанием ошибки, если данные некорректны,
     или None, если все проверки пройдены.
     """
-    if status not in ["в наличии", "выдана"]:
-        return "Статус книги должен быть 'в наличии' или 'выдана'."
+    if status not in STATUSES:
+        return ERROR_MESSAGES["status"]
 
     return None
 
 
-def validate_book_id(book_id: int, books: List[Book]) -> Optional[str]:
-    """Проверяет, что ID книги является числом, есть ли книги в библиотеке и наличие ID в библиотеке."""
+def validate_book_id(book_id: int, existing_ids: Collection[int]) -> Optional[str]:
+    """
+    Проверяет, что ID книги является числом, есть ли книги в библиотеке и наличие ID в библиотеке.
+
+    existing_ids - коллекция ID книг с быстрой проверкой вхождения (например, индекс id -> книга).
+    """
 
     if not isinstance(book_id, int):
         return "ID книги должен быть положительным числом."
-    if not books:
+    if not existing_ids:
         return "Библиотека пуста."
-    existing_ids = sorted(book.id for book in books)
     if book_id not in existing_ids:
         return "Книги с заданным ID не существует."
     return None
\ No newline at end of file